@@ -0,0 +1,13 @@
+#==========================
+# app/api/metrics_endpoints.py
+#==========================
+
+from flask import Blueprint, jsonify
+from app.utils.metrics.metrics import metrics
+
+metrics_routes = Blueprint('metrics', __name__)
+
+@metrics_routes.route('/metrics', methods=['GET'])
+def metrics_snapshot():
+    """Endpunkt für die internen Metriken (Zähler, Gauges, Histogramme) als JSON"""
+    return jsonify(metrics.snapshot())
@@ -0,0 +1,146 @@
+#==========================
+# app/core/home_view_cache.py
+#==========================
+
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.order_period import get_current_period
+from app.core.user_directory import user_directory
+from app.core.weekly_totals_service import WeeklyTotalsService
+from app.utils.db.database import call_after_commit, db_session
+from app.utils.logging.log_config import setup_logger
+from app.utils.message_blocks.home_view import create_home_view
+from app.utils.metrics.metrics import metrics
+from config.app_config import settings
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class _CachedView:
+    """Gerenderte Home-View mit dem Schlüssel, unter dem sie gebaut wurde."""
+    key: Tuple[str, Optional[datetime], str]
+    view: Dict[str, Any]
+    digest: str
+
+
+class HomeViewCache:
+    """
+    Cache für die App-Home-Ansicht, Schlüssel ist (Slack-ID, Bestellwoche, Datenstand).
+    - Der Datenstand wird bei jedem Aufruf aus der Datenbank gelesen (User und dessen
+      weekly_totals der Woche, eine Abfrage über den Primärschlüssel). Änderungen anderer
+      Worker oder durch /admin totals rebuild werden dadurch sofort sichtbar
+    - Solange sich der Schlüssel nicht ändert, werden die Blocks nicht neu gebaut
+    - views_publish wird übersprungen, wenn der Hash der Blocks dem zuletzt von diesem Prozess
+      veröffentlichten entspricht, aber höchstens HOME_VIEW_PUBLISH_TTL_SECONDS lang
+      (ein anderer Worker kann inzwischen eine andere View veröffentlicht haben)
+    - bump() verwirft nach eigenen Änderungen den lokalen Eintrag (nicht nötig für die Korrektheit)
+    - refresh_async() veröffentlicht die View nach einer Änderung im Hintergrund neu
+    """
+
+    def __init__(self, publish_ttl_seconds: float = settings.HOME_VIEW_PUBLISH_TTL_SECONDS):
+        self.publish_ttl_seconds = publish_ttl_seconds
+        self._lock = Lock()
+        self._entries: Dict[str, _CachedView] = {}
+        self._published: Dict[str, Tuple[str, float]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='home-view')
+
+    def bump(self, slack_id: str) -> None:
+        """Verwirft die gecachte View nach einer Änderung (Bestellung, Registrierung, Namensänderung)."""
+        with self._lock:
+            self._entries.pop(slack_id, None)
+
+    def render(self, slack_id: str, session: Optional[Session] = None) -> _CachedView:
+        """
+        Liefert die (ggf. gecachte) Home-View eines Users.
+        - session: Optional eine bereits offene Session; sonst wird eine eigene
+          (Lese-)Session für den Datenstand geöffnet.
+        """
+        if session is not None:
+            return self._render(session, slack_id)
+        # Lesezugriff ggf. über eine Replica; nach eigenen Änderungen des Users die Primärdatenbank
+        with db_session(readonly=True, user_id=slack_id) as own_session:
+            return self._render(own_session, slack_id)
+
+    def _render(self, session: Session, slack_id: str) -> _CachedView:
+        period = get_current_period()
+        user = user_directory.get(slack_id, session)
+        product_totals = (
+            WeeklyTotalsService(session).get_user_totals(period.start, user.user_id) if user else None
+        )
+        state = _digest({'user': user.name if user else None, 'totals': product_totals})
+        key = (slack_id, period.start, state)
+        with self._lock:
+            entry = self._entries.get(slack_id)
+        if entry is not None and entry.key == key:
+            metrics.increment('home_view.hit')
+            return entry
+
+        metrics.increment('home_view.miss')
+        if user:
+            # "Zuletzt aktualisiert" = Zeitpunkt, zu dem der geänderte Datenstand gebaut wurde
+            view = create_home_view(user, product_totals, updated_at=datetime.now())
+        else:
+            # Ohne User-Parameter für unregistrierte Ansicht
+            view = create_home_view()
+        entry = _CachedView(key=key, view=view, digest=_digest(view))
+        with self._lock:
+            self._entries[slack_id] = entry
+        return entry
+
+    def publish(self, client, slack_id: str, session: Optional[Session] = None) -> bool:
+        """
+        Veröffentlicht die Home-View eines Users, falls sie sich seit dem letzten
+        views_publish geändert hat. Gibt True zurück, wenn veröffentlicht wird.
+        Innerhalb eines Requests läuft views_publish erst nach dessen Commit.
+        """
+        entry = self.render(slack_id, session)
+        with self._lock:
+            published = self._published.get(slack_id)
+        unchanged = published is not None and published[0] == entry.digest and \
+            time.monotonic() - published[1] < self.publish_ttl_seconds
+        if unchanged:
+            metrics.increment('home_view.publish_skipped')
+            return False
+
+        def send():
+            client.views_publish(user_id=slack_id, view=entry.view)
+            with self._lock:
+                self._published[slack_id] = (entry.digest, time.monotonic())
+            metrics.increment('home_view.published')
+
+        call_after_commit(send)
+        return True
+
+    def refresh_async(self, client, slack_id: str) -> None:
+        """
+        Veröffentlicht die Home-View im Hintergrund neu, sofern der User sie schon einmal
+        geöffnet hat. Wird nach erfolgreichem add_order/remove_items aufgerufen; innerhalb
+        eines Requests erst nach dessen Commit, damit die neue Bestell-Version sichtbar ist.
+        """
+        with self._lock:
+            if slack_id not in self._published:
+                return
+        call_after_commit(lambda: self._executor.submit(self._refresh, client, slack_id))
+
+    def _refresh(self, client, slack_id: str) -> None:
+        try:
+            self.publish(client, slack_id)
+        except Exception as e:
+            logger.error(f"Error refreshing home view for {slack_id}: {str(e)}")
+
+
+def _digest(view: Dict[str, Any]) -> str:
+    """Stabiler Hash über die Blocks einer View."""
+    return hashlib.sha1(json.dumps(view, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+# Globale Instanz für die App-Home-Ansicht
+home_view_cache = HomeViewCache()
@@ -0,0 +1,95 @@
+#==========================
+# app/core/order_grammar.py
+#==========================
+
+import re
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.product_search import product_search
+from app.utils.constants.error_types import OrderError
+
+# Positionen werden durch Komma, Semikolon oder Zeilenumbruch getrennt
+_ITEM_SEPARATOR = re.compile(r'[,;\n]')
+
+# Eine Position: Menge vorne oder hinten, optional mit x-Multiplikator.
+# Erlaubt z.B. "vollkorn 2", "2 vollkorn", "2x vollkorn", "2 x vollkorn",
+# "vollkorn x2", "vollkorn 2x" und mehrteilige Namen wie "laugen stange 3".
+_ITEM_PATTERN = re.compile(
+    r'^(?:(?P<leading>\d+)\s*[x×*]?\s+)?'
+    r'(?P<name>.+?)'
+    r'(?:\s+(?:[x×*]\s*)?(?P<trailing>\d+)\s*[x×]?)?$',
+    re.IGNORECASE
+)
+
+FORMAT_HINT = "Verwende: [produkt] [anzahl] oder [anzahl]x [produkt]"
+
+
+def parse_items(text: str, session: Optional[Session] = None) -> List[Dict[str, Any]]:
+    """
+    Parst eine Liste von Positionen und löst alle Produktnamen (tippfehlertolerant) gegen
+    den ProductSearchIndex auf.
+    - text: z.B. "Vollkorn 2, 3x Laugen Stange"
+    - session: Optional eine offene Session (nur nötig, falls der Katalog neu geladen werden muss)
+    - Rückgabe: Liste von Dicts mit Produktname (wie im Katalog) und Menge;
+      mehrfach genannte Produkte werden zusammengefasst
+    Alle Fehler (Format, Menge, unbekanntes Produkt) werden gesammelt und gemeinsam als
+    OrderError gemeldet, damit der User alles mit einer Korrektur beheben kann.
+    """
+    quantities: Dict[str, int] = {}
+    errors: List[str] = []
+
+    for part in _ITEM_SEPARATOR.split(text or ''):
+        part = part.strip()
+        if not part:
+            continue
+
+        match = _ITEM_PATTERN.match(part)
+        if not match or (match.group('leading') and match.group('trailing')):
+            errors.append(f"Ungültiges Format bei: {part}. {FORMAT_HINT}")
+            continue
+        quantity_text = match.group('leading') or match.group('trailing')
+        if not quantity_text:
+            errors.append(f"Menge fehlt bei: {part}. {FORMAT_HINT}")
+            continue
+
+        name = match.group('name').strip()
+        quantity = int(quantity_text)
+        if quantity <= 0:
+            errors.append(f"Ungültige Menge für {name}: {quantity}")
+            continue
+
+        # Tippfehlertolerant auflösen ("brotchen" -> "Brötchen")
+        product_match = product_search.match(name, session)
+        product = product_match.product
+        if not product:
+            hint = f" Meintest du: {', '.join(product_match.suggestions)}?" if product_match.suggestions else ""
+            errors.append(f"Produkt {name} nicht gefunden.{hint}")
+            continue
+        quantities[product.name] = quantities.get(product.name, 0) + quantity
+
+    if errors:
+        raise OrderError("\n".join(errors))
+    if not quantities:
+        raise OrderError("Keine Produkte angegeben")
+
+    return [{'name': name, 'quantity': quantity} for name, quantity in quantities.items()]
+
+
+def strip_sub_command(text: str, sub_command: str) -> str:
+    """
+    Entfernt das Subkommando (z.B. 'add') vom Anfang des Command-Texts.
+    Wirft OrderError, wenn der Text nicht mit dem Subkommando beginnt.
+    """
+    text = (text or '').strip()
+    head, _, rest = text.partition(' ')
+    if head.lower() != sub_command:
+        raise OrderError(f"Ungültiges Format. Verwende: /order {sub_command} [produkt] [anzahl], ...")
+    return rest.strip()
+
+
+def format_items(items: List[Dict[str, Any]]) -> str:
+    """
+    Gibt Positionen in der kanonischen Schreibweise zurück (z.B. für gespeicherte Bestellungen).
+    Beispiel: [{'name': 'Vollkorn', 'quantity': 2}] -> "Vollkorn 2"
+    """
+    return ", ".join(f"{item['name']} {item['quantity']}" for item in items)
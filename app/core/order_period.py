@@ -0,0 +1,119 @@
+#==========================
+# app/core/order_period.py
+#==========================
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import and_
+from config.app_config import settings
+
+# Eine Bestellwoche läuft von Stichtag/Stichzeit (Standard: Mittwoch 10:00)
+# bis eine Minute vor dem nächsten Stichtag (Mittwoch 09:59).
+# Dieses Modul ist die einzige Stelle, an der dieses Zeitfenster berechnet wird.
+
+PERIOD_LENGTH = timedelta(days=7)
+
+
+@dataclass(frozen=True)
+class OrderPeriod:
+    """
+    Zeitfenster einer Bestellwoche.
+    - start: Beginn der Bestellwoche (inklusive)
+    - end: Letzte Minute der Bestellwoche (nur für die Anzeige, z.B. "Mittwoch 09:59")
+    - next_start: Beginn der folgenden Bestellwoche (exklusiv)
+    Abfragen nutzen immer das halboffene Intervall [start, next_start), siehe covers().
+    """
+    start: datetime
+    end: datetime
+
+    @property
+    def next_start(self) -> datetime:
+        return self.start + PERIOD_LENGTH
+
+    def contains(self, moment: datetime) -> bool:
+        """Prüft, ob ein Zeitpunkt in dieser Bestellwoche liegt."""
+        return self.start <= moment < self.next_start
+
+    def covers(self, column):
+        """
+        SQL-Bedingung für eine Datumsspalte in dieser Bestellwoche (start <= column < next_start).
+        Gleiche Grenzen wie contains(), damit auch Bestellungen in der letzten Minute vor dem
+        Stichzeitpunkt (z.B. 09:59:40) mitzählen.
+        """
+        return and_(column >= self.start, column < self.next_start)
+
+    def previous(self) -> 'OrderPeriod':
+        """Gibt die vorherige Bestellwoche zurück."""
+        return _period_starting_at(self.start - PERIOD_LENGTH)
+
+    def following(self) -> 'OrderPeriod':
+        """Gibt die nächste Bestellwoche zurück."""
+        return _period_starting_at(self.next_start)
+
+
+@lru_cache(maxsize=64)
+def _period_starting_at(start: datetime) -> OrderPeriod:
+    """Erzeugt (und memoisiert) die Bestellwoche, die zum gegebenen Stichzeitpunkt beginnt."""
+    return OrderPeriod(start=start, end=start + PERIOD_LENGTH - timedelta(minutes=1))
+
+
+def _compute_period_start(moment: datetime) -> datetime:
+    """
+    Berechnet den Beginn der Bestellwoche, in der der Zeitpunkt liegt.
+    Liegt der Zeitpunkt am Stichtag vor der Stichzeit, gehört er noch zur Vorwoche.
+    """
+    days_since_cutoff = (moment.weekday() - settings.ORDER_CUTOFF_WEEKDAY) % 7
+    start = (moment - timedelta(days=days_since_cutoff)).replace(
+        hour=settings.ORDER_CUTOFF_HOUR, minute=0, second=0, microsecond=0
+    )
+    if moment < start:
+        start -= PERIOD_LENGTH
+    return start
+
+
+# Zuletzt berechnete Bestellwoche; wird erst beim Überschreiten der Wochengrenze neu berechnet
+_current_period: Optional[OrderPeriod] = None
+
+
+def get_period_for(moment: datetime) -> OrderPeriod:
+    """
+    Gibt die Bestellwoche zurück, in der der übergebene Zeitpunkt liegt.
+    Nutzt die memoisierte aktuelle Woche, falls der Zeitpunkt hineinfällt.
+    """
+    current = _current_period
+    if current is not None and current.contains(moment):
+        return current
+    return _period_starting_at(_compute_period_start(moment))
+
+
+def get_current_period(now: Optional[datetime] = None) -> OrderPeriod:
+    """
+    Gibt die aktuelle Bestellwoche zurück.
+    Die Berechnung erfolgt höchstens einmal pro Wochengrenze, danach wird das
+    gespeicherte Ergebnis wiederverwendet.
+    Beispiel:
+        period = get_current_period()
+        period.covers(Order.order_date)
+    """
+    global _current_period
+    if now is not None:
+        # Expliziter Zeitpunkt (z.B. für Auswertungen): nicht als aktuelle Woche merken
+        return get_period_for(now)
+
+    now = datetime.now()
+    current = _current_period
+    if current is not None and current.contains(now):
+        return current
+    _current_period = get_period_for(now)
+    return _current_period
+
+
+def get_period(offset: int = 0) -> OrderPeriod:
+    """
+    Gibt eine Bestellwoche relativ zur aktuellen zurück.
+    - offset: 0 = aktuelle Woche, -1 = Vorwoche, 1 = nächste Woche
+    """
+    current = get_current_period()
+    return _period_starting_at(current.start + offset * PERIOD_LENGTH)
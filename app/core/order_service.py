@@ -4,8 +4,15 @@
 
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
-from app.models import Order, OrderItem, Product, User
+from app.models import Order, OrderItem, User
+from app.core.order_period import OrderPeriod, get_current_period, get_period_for
+from app.core.weekly_totals_service import WeeklyTotalsService
+from app.core.user_directory import user_directory
+from app.core.product_catalog import product_catalog
+from app.core.home_view_cache import home_view_cache
+from app.utils.db.database import run_after_commit
 from app.utils.constants.error_types import OrderError
 
 
@@ -19,46 +26,69 @@ class OrderService:
         # SQLAlchemy-Session für alle DB-Operationen
         self.session = session
 
-    def add_order(self, user_id: str, items: List[Dict[str, Any]]) -> Order:
+    def add_order(self, user_id: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Legt eine neue Bestellung für einen User an und fügt die bestellten Produkte hinzu.
         - user_id: Slack-ID des Users
         - items: Liste von Dicts mit Produktnamen und Mengen
+        - Rückgabe: Bestätigungsdaten (order_id, order_date, items mit Produktname und Menge)
         Ablauf:
-        1. User anhand Slack-ID suchen
-        2. Neue Order anlegen
-        3. Für jedes Produkt ein OrderItem anlegen
-        4. Order und Items in DB speichern
-        5. Gibt das Order-Objekt zurück
+        1. User anhand Slack-ID auflösen (über den UserDirectory-Cache)
+        2. Alle Produktnamen vorab über den ProductCatalog validieren
+        3. Order mit einem INSERT anlegen
+        4. Alle OrderItems mit einem einzigen mehrzeiligen INSERT anlegen
+        5. Wochensummen (weekly_totals) fortschreiben
+        6. Bestätigungsdaten zurückgeben (kein erneutes Laden der Order nötig)
         """
-        user = self.session.query(User).filter_by(slack_id=user_id).first()
+        user = user_directory.get(user_id, self.session)
         if not user:
             raise OrderError("Benutzer nicht gefunden")
 
-        # Order erstellen und zur Session hinzufügen
-        order = Order(user_id=user.user_id, order_date=datetime.now())
-        self.session.add(order)
-        # Session flushen um order_id zu generieren
-        self.session.flush()
-
+        # Alle Produkte vorab auflösen, bevor irgendetwas geschrieben wird
+        resolved = []
         for item in items:
-            product = self.session.query(Product).filter_by(
-                name=item['name'],
-                active=True
-            ).first()
+            product = product_catalog.resolve(item['name'], self.session)
             if not product:
                 raise OrderError(f"Produkt {item['name']} nicht gefunden")
+            resolved.append((product, item['quantity']))
+        if not resolved:
+            raise OrderError("Keine Produkte angegeben")
 
-            order_item = OrderItem(
-                order_id=order.order_id,
-                product_id=product.product_id,
-                quantity=item['quantity']
-            )
-            self.session.add(order_item)
+        # Order anlegen; die order_id kommt direkt aus dem INSERT
+        order_date = datetime.now()
+        result = self.session.execute(
+            insert(Order).values(user_id=user.user_id, order_date=order_date)
+        )
+        order_id = result.inserted_primary_key[0]
 
-        # Änderungen in der Session speichern
-        self.session.flush()
-        return order
+        # Alle Positionen in einem mehrzeiligen INSERT schreiben
+        self.session.execute(
+            insert(OrderItem).values([
+                {
+                    'order_id': order_id,
+                    'product_id': product.product_id,
+                    'quantity': quantity
+                }
+                for product, quantity in resolved
+            ])
+        )
+
+        # Wochensummen in derselben Transaktion fortschreiben
+        deltas: Dict[int, int] = {}
+        for product, quantity in resolved:
+            deltas[product.product_id] = deltas.get(product.product_id, 0) + quantity
+        WeeklyTotalsService(self.session).apply(get_period_for(order_date).start, user.user_id, deltas)
+        # Home-View des Users nach dem Commit als veraltet markieren
+        run_after_commit(self.session, lambda: home_view_cache.bump(user_id))
+
+        return {
+            'order_id': order_id,
+            'order_date': order_date,
+            'items': [
+                {'name': product.name, 'quantity': quantity}
+                for product, quantity in resolved
+            ]
+        }
 
     def get_user_orders(self, user_id: str) -> List[Order]:
         """
@@ -66,61 +96,42 @@ class OrderService:
         - user_id: Slack-ID
         - Rückgabe: Liste von Order-Objekten
         """
-        user = self.session.query(User).filter_by(slack_id=user_id).first()
+        user = user_directory.get(user_id, self.session)
         if not user:
             return []
         return self.session.query(Order).filter_by(user_id=user.user_id).all()
 
-    def remove_items_preview(self, user_id: str, items: List[Dict[str, Any]]) -> Tuple[Order, List[Dict[str, Any]], Dict[str, int]]:
+    def remove_items_preview(self, user_id: str, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
         """
         Erstellt eine Vorschau der Bestellung nach dem Entfernen von Produkten.
         - user_id: Slack-ID
         - items: Liste der zu entfernenden Produkte
-        - Rückgabe: (Order, entfernte Items, verbleibende Produkte)
+        - Rückgabe: (entfernte Items, verbleibende Produkte)
         Ablauf:
         1. User und aktuelle Woche bestimmen
-        2. Alle Bestellungen des Users in dieser Woche holen
-        3. Produkte aufsummieren
-        4. Entfernte Produkte simulieren (ohne DB-Änderung)
-        5. Fehler, falls zu viel entfernt werden soll
+        2. Aktuelle Summen des Users aus weekly_totals lesen
+        3. Entfernte Produkte simulieren (ohne DB-Änderung)
+        4. Fehler, falls zu viel entfernt werden soll
         """
-        user = self.session.query(User).filter_by(slack_id=user_id).first()
+        user = user_directory.get(user_id, self.session)
         if not user:
             raise OrderError("Benutzer nicht gefunden")
 
         # Zeitraum bestimmen (aktuelle Bestellwoche)
-        now = datetime.now()
-        current_weekday = now.weekday()
-        days_since_wednesday = (current_weekday - 2) % 7
-        last_wednesday = now - timedelta(days=days_since_wednesday)
-        period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-        if current_weekday == 2 and now.hour < 10:
-            period_start = period_start - timedelta(days=7)
-        period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
+        period = get_current_period()
 
-        # Alle Bestellungen im Zeitraum finden
-        orders = self.session.query(Order).filter(
-            Order.user_id == user.user_id,
-            Order.order_date.between(period_start, period_end)
-        ).all()
-        if not orders:
+        # Vorberechnete Summen der Woche statt aller Orders und Items
+        current_items = WeeklyTotalsService(self.session).get_user_totals(period.start, user.user_id)
+        if not current_items:
             raise OrderError("Keine aktive Bestellung gefunden")
 
-        # Alle Produkte über den gesamten Zeitraum summieren
-        current_items = {}
-        for order in orders:
-            for item in order.items:
-                name = item.product.name
-                if name in current_items:
-                    current_items[name] += item.quantity
-                else:
-                    current_items[name] = item.quantity
-
         # Vorschau der verbleibenden Produkte berechnen
         preview_items = current_items.copy()
         invalid_items = []
         for item in items:
-            name = item['name']
+            # Eingegebenen Namen auf den Produktnamen aus dem Katalog abbilden
+            product = product_catalog.resolve(item['name'], self.session)
+            name = product.name if product else item['name']
             if name not in preview_items:
                 invalid_items.append((name, 0, item['quantity']))
             elif preview_items[name] < item['quantity']:
@@ -135,7 +146,7 @@ class OrderService:
                 for name, current, requested in invalid_items
             ])
             raise OrderError(error_msg)
-        return orders[0], items, preview_items
+        return items, preview_items
 
     def remove_items(self, user_id: str, items: List[Dict[str, Any]]) -> Order:
         """
@@ -146,34 +157,25 @@ class OrderService:
         1. User und aktuelle Woche bestimmen
         2. Alle Bestellungen des Users in dieser Woche holen
         3. Für jedes Produkt die OrderItems suchen und Mengen anpassen/löschen
-        4. Änderungen werden in der DB gespeichert
+        4. Wochensummen (weekly_totals) anpassen; alles in derselben Transaktion
         5. Gibt die erste Order zurück (zur Bestätigung)
         """
-        user = self.session.query(User).filter_by(slack_id=user_id).first()
+        user = user_directory.get(user_id, self.session)
         if not user:
             raise OrderError("Benutzer nicht gefunden")
         # Zeitraum bestimmen (aktuelle Bestellwoche)
-        now = datetime.now()
-        current_weekday = now.weekday()
-        days_since_wednesday = (current_weekday - 2) % 7
-        last_wednesday = now - timedelta(days=days_since_wednesday)
-        period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-        if current_weekday == 2 and now.hour < 10:
-            period_start = period_start - timedelta(days=7)
-        period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
+        period = get_current_period()
         # Bestellungen im Zeitraum finden
         orders = self.session.query(Order).filter(
             Order.user_id == user.user_id,
-            Order.order_date.between(period_start, period_end)
+            period.covers(Order.order_date)
         ).all()
         if not orders:
             raise OrderError("Keine aktive Bestellung gefunden")
         # Für jedes zu entfernende Produkt
+        deltas: Dict[int, int] = {}
         for item in items:
-            product = self.session.query(Product).filter(
-                Product.name.ilike(item['name']),
-                Product.active == True
-            ).first()
+            product = product_catalog.resolve(item['name'], self.session)
             if not product:
                 raise OrderError(f"Produkt {item['name']} nicht gefunden")
             # Alle OrderItems für dieses Produkt in den Bestellungen finden
@@ -187,6 +189,7 @@ class OrderService:
             if total_quantity < item['quantity']:
                 raise OrderError(f"Nicht genügend {item['name']} zum Entfernen vorhanden")
             # Produkte entfernen/anpassen
+            deltas[product.product_id] = deltas.get(product.product_id, 0) - item['quantity']
             remaining = item['quantity']
             for order_item in order_items:
                 if remaining <= 0:
@@ -197,6 +200,10 @@ class OrderService:
                 else:
                     order_item.quantity -= remaining
                     remaining = 0
+        # Wochensummen in derselben Transaktion fortschreiben
+        WeeklyTotalsService(self.session).apply(period.start, user.user_id, deltas)
+        # Home-View des Users nach dem Commit als veraltet markieren
+        run_after_commit(self.session, lambda: home_view_cache.bump(user_id))
         return orders[0]  # Erste Bestellung für Bestätigung zurückgeben
 
     def _get_current_week_order(self, user_id: int) -> Optional[Order]:
@@ -205,18 +212,12 @@ class OrderService:
         - user_id: interne User-ID
         - Rückgabe: Order-Objekt oder None
         """
-        now = datetime.now()
-        current_weekday = now.weekday()
-        days_since_wednesday = (current_weekday - 2) % 7
-        last_wednesday = now - timedelta(days=days_since_wednesday)
-        period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-        if current_weekday == 2 and now.hour < 10:
-            period_start = period_start - timedelta(days=7)
-        period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
+        # Zeitraum bestimmen (aktuelle Bestellwoche)
+        period = get_current_period()
         return self.session.query(Order) \
             .filter(
             Order.user_id == user_id,
-            Order.order_date.between(period_start, period_end)
+            period.covers(Order.order_date)
         ) \
             .order_by(Order.order_date.desc()) \
             .first()
@@ -225,22 +226,23 @@ class OrderService:
         """
         Holt die aktuelle Bestellung eines Benutzers für den angegebenen Zeitraum.
         - user_slack_id: Slack-ID
-        - period_start, period_end: Zeitraum der Woche
+        - period_start, period_end: Zeitraum der Woche (period_end = letzte Minute, inklusive)
         - Rückgabe: Order-Objekt
         Ablauf:
-        1. User anhand Slack-ID suchen
+        1. User anhand Slack-ID auflösen (über den UserDirectory-Cache)
         2. Order im Zeitraum suchen (neueste zuerst)
         3. Fehler, falls keine Order gefunden
         4. Order-Objekt zurückgeben
         """
-        user = self.session.query(User).filter_by(slack_id=user_slack_id).first()
+        user = user_directory.get(user_slack_id, self.session)
         if not user:
             raise OrderError("Benutzer nicht gefunden")
         order = (
             self.session.query(Order)
             .filter(
                 Order.user_id == user.user_id,
-                Order.order_date.between(period_start, period_end)
+                Order.order_date >= period_start,
+                Order.order_date < period_end + timedelta(minutes=1)
             )
             .order_by(Order.order_date.desc())
             .first()
@@ -251,71 +253,69 @@ class OrderService:
         self.session.refresh(order)
         return order
 
-    def get_weekly_summary(self) -> List[Dict]:
+    def get_order_overview(self, user_id: str, period: Optional[OrderPeriod] = None) -> Optional[Dict[str, Any]]:
+        """
+        Liefert die Bestellübersicht eines Users als reine Daten (ohne ORM-Objekte),
+        damit die Session vor dem Senden der Slack-Nachricht geschlossen werden kann.
+        - user_id: Slack-ID
+        - period: Optional eine bestimmte Bestellwoche (Standard: aktuelle Woche)
+        - Rückgabe: Dict mit product_totals (Produktname -> Menge) und latest_order_date,
+          oder None, falls der User nicht existiert
+        """
+        user = user_directory.get(user_id, self.session)
+        if not user:
+            return None
+        period = period or get_current_period()
+
+        latest_order_date = self.session.execute(
+            select(func.max(Order.order_date)).where(
+                Order.user_id == user.user_id,
+                period.covers(Order.order_date)
+            )
+        ).scalar()
+        return {
+            'product_totals': WeeklyTotalsService(self.session).get_user_totals(period.start, user.user_id),
+            'latest_order_date': latest_order_date
+        }
+
+    def get_weekly_summary(self, period: Optional[OrderPeriod] = None) -> List[Dict]:
         """
         Holt alle Bestellungen der aktuellen Woche und fasst sie nach Produkt zusammen.
+        - period: Optional eine bestimmte Bestellwoche (Standard: aktuelle Woche)
         - Rückgabe: Liste von Dicts mit Produktname und Gesamtmenge
         Ablauf:
         1. Zeitraum der aktuellen Woche bestimmen (Mi 10:00 bis Mi 09:59)
-        2. Alle Orders im Zeitraum holen
-        3. Produkte und Mengen aufsummieren
+        2. Vorberechnete Summen pro (Produkt, User) aus weekly_totals lesen
+        3. Ergebnis Dict-basiert nach Produkt und User zusammenführen
         4. Rückgabe als Liste von Dicts
         """
-        now = datetime.now()
-        current_weekday = now.weekday()
-        days_since_wednesday = (current_weekday - 2) % 7
-        last_wednesday = now - timedelta(days=days_since_wednesday)
-        period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-        if current_weekday == 2 and now.hour < 10:  # Wenn Mittwoch vor 10 Uhr
-            period_start = period_start - timedelta(days=7)
-        period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
-
-        # Hole alle Bestellungen mit User-Informationen
-
-        orders = (
-            self.session.query(Order)
-            .filter(Order.order_date.between(period_start, period_end))
-            .distinct()
-            .all()
-        )
-
-        # Bestellungen nach Produkten und Usern zusammenfassen
+        # Zeitraum bestimmen (aktuelle Bestellwoche)
+        period = period or get_current_period()
 
-        product_totals = {}
-        user_orders = {}  # Dict für User-spezifische Bestellungen
+        # Vorberechnete Summen (Produkt, User, Menge) der Woche lesen
+        rows = WeeklyTotalsService(self.session).get_period_rows(period.start)
 
-        for order in orders:
-            user_name = order.user.name or "Unbekannt"
+        # Bestellungen nach Produkten und Usern zusammenfassen (Dict-basiert)
+        product_totals: Dict[str, int] = {}
+        user_orders: Dict[str, Dict[str, int]] = {}  # Produkt -> {User-Name: Menge}
 
-            for item in order.items:
-                name = item.product.name
-                # Produkt-Totale
-                if name in product_totals:
-                    product_totals[name] += item.quantity
-                else:
-                    product_totals[name] = item.quantity
+        for product_name, user_name, quantity in rows:
+            user_name = user_name or "Unbekannt"
+            quantity = int(quantity or 0)
+            product_totals[product_name] = product_totals.get(product_name, 0) + quantity
+            users = user_orders.setdefault(product_name, {})
+            users[user_name] = users.get(user_name, 0) + quantity
 
-                # User-spezifische Bestellungen
-                if name not in user_orders:
-                    user_orders[name] = []
-                if user_name not in [u['name'] for u in user_orders[name]]:
-                    user_orders[name].append({
-                        'name': user_name,
-                        'quantity': item.quantity
-                    })
-                else:
-                    # Addiere zur bestehenden Menge des Users
-                    for user_order in user_orders[name]:
-                        if user_order['name'] == user_name:
-                            user_order['quantity'] += item.quantity
-                            
         return [{
             'name': name,
             'quantity': quantity,
-            'users': sorted(user_orders[name], key=lambda x: x['name'])  # Sortiere User alphabetisch
+            'users': [
+                {'name': user_name, 'quantity': user_quantity}
+                for user_name, user_quantity in sorted(user_orders[name].items())  # Sortiere User alphabetisch
+            ]
         } for name, quantity in sorted(product_totals.items())]
 
-    def send_weekly_summary(self) -> None:
+    def send_weekly_summary(self) -> Tuple[List[User], List[Dict]]:
         """
         Sammelt alle User mit gets_orders=True und gibt sie zusammen mit der Wochenzusammenfassung zurück.
         Wird vom Handler genutzt, um die Wochenbestellung zu verschicken.
@@ -323,6 +323,6 @@ class OrderService:
         """
         users = self.session.query(User).filter_by(gets_orders=True).all()
         if not users:
-            return
+            return [], []
         summary = self.get_weekly_summary()
         return users, summary
@@ -0,0 +1,98 @@
+#==========================
+# app/core/outbox_service.py
+#==========================
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.order_period import get_current_period
+from app.models import OutboxMessage
+from app.utils.db.database import run_after_commit
+from app.utils.metrics.metrics import metrics
+from app.utils.slack.outbox import outbox_dispatcher
+
+
+class OutboxService:
+    """
+    Service-Klasse für die transaktionale Outbox.
+    Slack-Nachrichten werden in derselben Transaktion wie die zugehörige Änderung eingetragen
+    und erst nach dem Commit vom OutboxDispatcher zugestellt. Wird die Transaktion
+    zurückgerollt, entfällt auch die Nachricht.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def enqueue(self, method: str, channel: str, dedup_key: Optional[str] = None,
+                kind: Optional[str] = None, update_of: Optional[int] = None,
+                **kwargs: Any) -> Optional[OutboxMessage]:
+        """
+        Trägt eine Slack-Nachricht in die Outbox ein.
+        - method: WebClient-Methode (z.B. 'chat_postMessage', 'chat_update')
+        - channel: Ziel-Channel bzw. Slack-ID
+        - dedup_key: Optional; ist der Schlüssel schon eingetragen, wird nichts erneut angelegt
+        - kind: Optional die Art der Nachricht (für coalescing_target)
+        - update_of: Bei chat_update die message_id der ursprünglichen Nachricht; deren ts und
+          DM-Channel (aus der Slack-Antwort) setzt der Dispatcher beim Versand ein. Noch offene ältere
+          Updates derselben Nachricht entfallen.
+        - kwargs: Weitere Argumente des Aufrufs (text, blocks, ts, ...), müssen JSON-serialisierbar sein
+        - Rückgabe: Die eingetragene Nachricht oder None bei einem Duplikat
+        Beispiel:
+            OutboxService(session).enqueue('chat_postMessage', user_id, f"order:{order_id}", text="...", blocks=blocks)
+        """
+        if update_of is not None:
+            # Ältere, noch nicht zugestellte Updates derselben Nachricht sind überholt
+            superseded = self.session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.update_of == update_of, OutboxMessage.status == 'pending')
+                .values(status='superseded')
+            ).rowcount
+            if superseded:
+                metrics.increment('outbox.superseded', superseded)
+
+        message = OutboxMessage(
+            channel=channel,
+            method=method,
+            payload=json.dumps(kwargs),
+            dedup_key=dedup_key,
+            kind=kind,
+            update_of=update_of
+        )
+        if dedup_key is None:
+            self.session.add(message)
+        else:
+            # Savepoint, damit ein Duplikat nicht die ganze Transaktion (z.B. die Bestellung) abbricht
+            try:
+                with self.session.begin_nested():
+                    self.session.add(message)
+            except IntegrityError:
+                metrics.increment('outbox.deduplicated')
+                return None
+
+        metrics.increment('outbox.enqueued')
+        run_after_commit(self.session, outbox_dispatcher.wake)
+        return message
+
+    def coalescing_target(self, channel: str, kind: str, window_seconds: float) -> Optional[int]:
+        """
+        Sucht die Nachricht, die statt einer neuen Nachricht aktualisiert werden soll.
+        Das ist die ursprüngliche Nachricht der letzten Nachricht dieser Art im Channel, sofern diese
+        vor höchstens window_seconds in der aktuellen Bestellwoche eingetragen und nicht gescheitert ist.
+        - Rückgabe: message_id der ursprünglichen Nachricht (für enqueue(update_of=...)) oder None
+        """
+        last = self.session.execute(
+            select(OutboxMessage)
+            .where(OutboxMessage.channel == channel, OutboxMessage.kind == kind)
+            .order_by(OutboxMessage.message_id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        if last is None or last.status == 'failed':
+            return None
+        if last.created_at < datetime.now() - timedelta(seconds=window_seconds):
+            return None
+        if not get_current_period().contains(last.created_at):
+            return None
+        return last.update_of or last.message_id
@@ -0,0 +1,138 @@
+#==========================
+# app/core/product_catalog.py
+#==========================
+
+import re
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models import Product
+from app.utils.db.database import db_session
+from config.app_config import settings
+
+# Umlaute und ß werden für den Namensvergleich ausgeschrieben,
+# damit "Brötchen", "broetchen" und "BRÖTCHEN" dasselbe Produkt treffen.
+_UMLAUT_MAP = str.maketrans({
+    'ä': 'ae',
+    'ö': 'oe',
+    'ü': 'ue',
+    'ß': 'ss'
+})
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_product_name(name: str) -> str:
+    """
+    Normalisiert einen Produktnamen für den Vergleich:
+    casefold, Umlaute ausschreiben, Leerzeichen vereinheitlichen.
+    Beispiel: "  Vollkorn  Brötchen " -> "vollkorn broetchen"
+    """
+    folded = name.casefold().translate(_UMLAUT_MAP)
+    return _WHITESPACE.sub(' ', folded).strip()
+
+
+@dataclass(frozen=True)
+class CatalogProduct:
+    """
+    Von der Session losgelöste Kopie eines aktiven Produkts.
+    Hat die gleichen Attributnamen wie das Product-Modell (für die Message-Blocks).
+    """
+    product_id: int
+    name: str
+    description: Optional[str]
+
+
+@dataclass(frozen=True)
+class _CatalogSnapshot:
+    """Unveränderlicher Stand des Katalogs zu einer bestimmten Version."""
+    version: int
+    products: Tuple[CatalogProduct, ...]
+    by_name: Dict[str, CatalogProduct]
+    expires_at: float
+
+
+class ProductCatalog:
+    """
+    In-Memory-Katalog aller aktiven Produkte mit Index über den normalisierten Namen.
+    - Wird beim ersten Zugriff nach einer Invalidierung mit einer einzigen Abfrage geladen
+    - Jede Invalidierung erhöht die Version; Folgestrukturen (z.B. Suchindizes) können
+      daran erkennen, ob sie neu aufgebaut werden müssen
+    - ProductService invalidiert den Katalog bei jeder Produktänderung (nur im eigenen Prozess)
+    - Nach ttl_seconds wird neu geladen, damit Änderungen anderer Worker oder direkt per SQL
+      (z.B. Produkt deaktivieren) sichtbar werden; hat sich etwas geändert, steigt die Version
+    """
+
+    def __init__(self, ttl_seconds: float = settings.PRODUCT_CATALOG_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._snapshot: Optional[_CatalogSnapshot] = None
+        self._lock = Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Verwirft den geladenen Stand; der nächste Zugriff lädt neu."""
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def active_products(self, session: Optional[Session] = None) -> List[CatalogProduct]:
+        """Gibt alle aktiven Produkte zurück (ohne DB-Zugriff, solange der Katalog aktuell ist)."""
+        return list(self._get_snapshot(session).products)
+
+    def resolve(self, name: str, session: Optional[Session] = None) -> Optional[CatalogProduct]:
+        """
+        Löst einen (beliebig geschriebenen) Produktnamen in O(1) auf.
+        Gibt None zurück, wenn es kein aktives Produkt mit diesem Namen gibt.
+        """
+        return self._get_snapshot(session).by_name.get(normalize_product_name(name))
+
+    def _get_snapshot(self, session: Optional[Session]) -> _CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version and time.monotonic() < snapshot.expires_at:
+            return snapshot
+
+        version = self._version
+        if session is not None:
+            products = tuple(self._load(session))
+        else:
+            with db_session() as own_session:
+                products = tuple(self._load(own_session))
+
+        with self._lock:
+            # Zwischenzeitlich invalidiert: Ergebnis nur für diesen Aufruf verwenden
+            if self._version != version:
+                return self._snapshot_of(version, products)
+            previous = self._snapshot
+            if previous is not None and previous.products != products:
+                # Änderung durch einen anderen Worker oder direkt in der Datenbank
+                self._version += 1
+            snapshot = self._snapshot_of(self._version, products)
+            self._snapshot = snapshot
+        return snapshot
+
+    def _snapshot_of(self, version: int, products: Tuple[CatalogProduct, ...]) -> _CatalogSnapshot:
+        return _CatalogSnapshot(
+            version=version,
+            products=products,
+            by_name={normalize_product_name(p.name): p for p in products},
+            expires_at=time.monotonic() + self.ttl_seconds
+        )
+
+    @staticmethod
+    def _load(session: Session) -> List[CatalogProduct]:
+        rows = (
+            session.query(Product.product_id, Product.name, Product.description)
+            .filter(Product.active == True)
+            .order_by(Product.product_id)
+            .all()
+        )
+        return [CatalogProduct(product_id=row[0], name=row[1], description=row[2]) for row in rows]
+
+
+# Globale Instanz für das gesamte Projekt
+product_catalog = ProductCatalog()
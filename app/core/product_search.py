@@ -0,0 +1,198 @@
+#==========================
+# app/core/product_search.py
+#==========================
+
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.product_catalog import CatalogProduct, ProductCatalog, normalize_product_name, product_catalog
+
+
+def _search_key(name: str) -> str:
+    """Normalisierter Name ohne Leerzeichen ("Vollkorn Brot" und "vollkornbrot" sind gleich)."""
+    return normalize_product_name(name).replace(' ', '')
+
+
+def damerau_levenshtein(a: str, b: str) -> int:
+    """
+    Editierdistanz mit Einfügen, Löschen, Ersetzen und Vertauschen benachbarter Zeichen
+    (Variante "optimal string alignment").
+    Beispiel: damerau_levenshtein("vollkron", "vollkorn") -> 1
+    """
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+
+    # Drei Zeilen der DP-Matrix genügen; min() ist bewusst ausgeschrieben (spürbar schneller)
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] * (len(b) + 1)
+        for j, char_b in enumerate(b, 1):
+            best = previous[j - 1] + (char_a != char_b)     # Ersetzen
+            deletion = previous[j] + 1                      # Löschen
+            if deletion < best:
+                best = deletion
+            insertion = current[j - 1] + 1                  # Einfügen
+            if insertion < best:
+                best = insertion
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                transposition = previous_previous[j - 2] + 1  # Vertauschen
+                if transposition < best:
+                    best = transposition
+            current[j] = best
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+@dataclass
+class _BKNode:
+    key: str
+    products: List[CatalogProduct]
+    children: Dict[int, '_BKNode'] = field(default_factory=dict)
+
+
+class _BKTree:
+    """BK-Baum über den Suchschlüsseln der Produkte (Metrik: Damerau-Levenshtein)."""
+
+    def __init__(self):
+        self.root: Optional[_BKNode] = None
+
+    def add(self, key: str, product: CatalogProduct) -> None:
+        if self.root is None:
+            self.root = _BKNode(key, [product])
+            return
+        node = self.root
+        while True:
+            distance = damerau_levenshtein(key, node.key)
+            if distance == 0:
+                node.products.append(product)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(key, [product])
+                return
+            node = child
+
+    def search(self, key: str, max_distance: int) -> List[Tuple[int, CatalogProduct]]:
+        """Alle Produkte mit Distanz <= max_distance, sortiert nach Distanz."""
+        results: List[Tuple[int, CatalogProduct]] = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = damerau_levenshtein(key, node.key)
+            if distance <= max_distance:
+                results.extend((distance, product) for product in node.products)
+            # Dreiecksungleichung: nur Kinder im Bereich [d - max, d + max] können passen
+            for child_distance, child in node.children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        results.sort(key=lambda result: (result[0], result[1].name))
+        return results
+
+
+@dataclass(frozen=True)
+class ProductMatch:
+    """
+    Ergebnis einer Produktsuche.
+    - product: Eindeutig erkanntes Produkt (oder None)
+    - suggestions: "Meintest du"-Vorschläge, falls kein Produkt eindeutig erkannt wurde
+    """
+    product: Optional[CatalogProduct]
+    suggestions: Tuple[str, ...] = ()
+
+
+class ProductSearchIndex:
+    """
+    Tippfehlertolerante Produktsuche über alle aktiven Produkte.
+    - Vergleich auf normalisierten Namen (Umlaute ausgeschrieben, ohne Leerzeichen)
+    - BK-Baum auf Damerau-Levenshtein-Distanz; die erlaubte Distanz wächst mit der Namenslänge
+    - Wird nur neu aufgebaut, wenn sich die Version des ProductCatalog ändert
+    Beispiel:
+        match = product_search.match("brotchen")
+        match.product.name -> "Brötchen"
+    """
+
+    def __init__(self, catalog: ProductCatalog, max_suggestions: int = 3):
+        self.catalog = catalog
+        self.max_suggestions = max_suggestions
+        self._lock = Lock()
+        self._built_version: Optional[int] = None
+        self._tree = _BKTree()
+        self._by_key: Dict[str, CatalogProduct] = {}
+
+    def match(self, name: str, session: Optional[Session] = None) -> ProductMatch:
+        """
+        Sucht das passende Produkt zu einer (evtl. falsch geschriebenen) Eingabe.
+        Ein Produkt wird nur übernommen, wenn der nächste Treffer eindeutig ist;
+        sonst enthält das Ergebnis die nächstgelegenen Produkte als Vorschläge.
+        """
+        exact = self.catalog.resolve(name, session)
+        if exact:
+            return ProductMatch(product=exact)
+
+        tree, by_key = self._ensure_built(session)
+        key = _search_key(name)
+        if key in by_key:
+            return ProductMatch(product=by_key[key])
+        if not key:
+            return ProductMatch(product=None)
+
+        # Eine Suche mit großzügigerer Distanz liefert Treffer und Vorschläge zugleich
+        allowed = _allowed_distance(key)
+        nearby = tree.search(key, allowed + 2)
+        candidates = [(distance, product) for distance, product in nearby if distance <= allowed]
+        if candidates:
+            best_distance = candidates[0][0]
+            best = [product for distance, product in candidates if distance == best_distance]
+            if len(best) == 1:
+                return ProductMatch(product=best[0])
+            return ProductMatch(product=None, suggestions=self._names(best))
+
+        # Nichts in Reichweite: die nächstgelegenen Produkte als Vorschlag
+        return ProductMatch(product=None, suggestions=self._names([product for _, product in nearby]))
+
+    def _names(self, products: List[CatalogProduct]) -> Tuple[str, ...]:
+        names: List[str] = []
+        for product in products:
+            if product.name not in names:
+                names.append(product.name)
+        return tuple(names[:self.max_suggestions])
+
+    def _ensure_built(self, session: Optional[Session]) -> Tuple[_BKTree, Dict[str, CatalogProduct]]:
+        # Zuerst den Katalog abfragen: er lädt nach Ablauf seiner TTL neu und erhöht bei Änderungen die Version
+        products = self.catalog.active_products(session)
+        version = self.catalog.version
+        with self._lock:
+            if self._built_version == version:
+                return self._tree, self._by_key
+
+        tree = _BKTree()
+        by_key: Dict[str, CatalogProduct] = {}
+        for product in products:
+            key = _search_key(product.name)
+            tree.add(key, product)
+            by_key.setdefault(key, product)
+
+        with self._lock:
+            # Nur übernehmen, wenn der Katalog zwischenzeitlich nicht invalidiert wurde
+            if self.catalog.version == version:
+                self._tree, self._by_key, self._built_version = tree, by_key, version
+        return tree, by_key
+
+
+def _allowed_distance(key: str) -> int:
+    """Erlaubte Tippfehler je nach Länge: bis 4 Zeichen 0, bis 8 Zeichen 1, sonst 2."""
+    if len(key) <= 4:
+        return 0
+    if len(key) <= 8:
+        return 1
+    return 2
+
+
+# Globale Instanz für das gesamte Projekt
+product_search = ProductSearchIndex(product_catalog)
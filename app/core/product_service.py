@@ -5,6 +5,8 @@
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.models import Product
+from app.core.product_catalog import CatalogProduct, product_catalog
+from app.utils.db.database import run_after_commit
 from app.utils.constants.error_types import ValidationError
 
 
@@ -30,11 +32,22 @@ class ProductService:
 
         product = Product(name=name, description=description)
         self.session.add(product)
+        self._invalidate_catalog()
         return product
 
-    def get_active_products(self) -> List[Product]:
+    def get_active_products(self) -> List[CatalogProduct]:
         """
         Gibt alle aktiven Produkte zurück.
-        :return: Liste der aktiven Produkt-Objekte
+        Kommt aus dem ProductCatalog und braucht daher nur nach einer Produktänderung eine DB-Abfrage.
+        :return: Liste der aktiven Produkte (mit name und description)
         """
-        return self.session.query(Product).filter_by(active=True).all()
\ No newline at end of file
+        return product_catalog.active_products(self.session)
+
+    def _invalidate_catalog(self) -> None:
+        """
+        Invalidiert den ProductCatalog - sofort und nochmals nach dem Commit.
+        Muss von jeder Methode aufgerufen werden, die Produkte anlegt, umbenennt,
+        aktiviert oder deaktiviert.
+        """
+        product_catalog.invalidate()
+        run_after_commit(self.session, product_catalog.invalidate)
\ No newline at end of file
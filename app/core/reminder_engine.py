@@ -0,0 +1,403 @@
+#==========================
+# app/core/reminder_engine.py
+#==========================
+
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import case, exists, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Select
+from app.core.order_period import OrderPeriod, get_current_period
+from app.models import Reminder, User, WeeklyTotal
+from app.utils.db.database import db_session
+from app.utils.logging.log_config import setup_logger
+from app.utils.message_blocks.messages import create_reminder_blocks
+from app.utils.metrics.metrics import metrics
+from app.utils.slack.delivery import OutboundMessage, SlackDelivery
+from config.app_config import settings
+
+logger = setup_logger(__name__)
+
+# Schlüssel eines Buckets: (Wochentag 0 = Montag, Minute des Tages)
+BucketKey = Tuple[int, int]
+
+ALL_WEEKDAYS = frozenset(range(7))
+
+_WEEKDAY_NAMES = {
+    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6,
+    'mo': 0, 'di': 1, 'mi': 2, 'do': 3, 'fr': 4, 'sa': 5, 'so': 6,
+    'montag': 0, 'dienstag': 1, 'mittwoch': 2, 'donnerstag': 3, 'freitag': 4, 'samstag': 5, 'sonntag': 6,
+}
+
+
+def parse_weekdays(text: Optional[str]) -> Set[int]:
+    """
+    Liest die Wochentage einer Erinnerung (0 = Montag ... 6 = Sonntag).
+    Erlaubt Zahlen, deutsche und englische Kürzel sowie Bereiche, getrennt durch Komma oder Leerzeichen.
+    Beispiel: parse_weekdays("mo-fr") -> {0, 1, 2, 3, 4}, parse_weekdays("1,3") -> {1, 3}
+    Leerer Text ergibt eine leere Menge; unbekannte Angaben lösen ValueError aus.
+    """
+    days: Set[int] = set()
+    for token in re.split(r'[,;\s]+', (text or '').strip().lower()):
+        if not token:
+            continue
+        start, _, end = token.partition('-')
+        first = _weekday(start)
+        last = _weekday(end) if end else first
+        day = first
+        while True:
+            days.add(day)
+            if day == last:
+                break
+            day = (day + 1) % 7
+    return days
+
+
+def _weekday(token: str) -> int:
+    if token.isdigit() and int(token) < 7:
+        return int(token)
+    if token in _WEEKDAY_NAMES:
+        return _WEEKDAY_NAMES[token]
+    raise ValueError(f"Unbekannter Wochentag: {token}")
+
+
+def reminder_buckets(reminder_type: str, weekdays: Optional[str],
+                     reminder_time: Optional[dt_time]) -> Set[BucketKey]:
+    """
+    Berechnet die Buckets (Wochentag, Minute), in denen eine Erinnerung fällig ist.
+    - daily: an den angegebenen Wochentagen, ohne Angabe täglich
+    - weekly: nur an den angegebenen Wochentagen (Pflicht)
+    - Ohne Uhrzeit gilt die globale Erinnerungszeit (REMINDER_HOUR:REMINDER_MINUTE)
+    """
+    days = parse_weekdays(weekdays)
+    if reminder_type == 'daily':
+        days = days or set(ALL_WEEKDAYS)
+    elif reminder_type == 'weekly':
+        if not days:
+            raise ValueError("Wöchentliche Erinnerung ohne Wochentag")
+    else:
+        raise ValueError(f"Unbekannter Erinnerungstyp: {reminder_type}")
+
+    if reminder_time is None:
+        minute = settings.REMINDER_HOUR * 60 + settings.REMINDER_MINUTE
+    else:
+        minute = reminder_time.hour * 60 + reminder_time.minute
+    return {(day, minute) for day in days}
+
+
+def has_ordered(period: OrderPeriod) -> ColumnElement:
+    """
+    EXISTS-Bedingung: Der User hat in der Bestellwoche etwas bestellt (Summe > 0 in weekly_totals,
+    d.h. komplett wieder entfernte Bestellungen zählen nicht). Nutzt den Primärschlüssel
+    (period_start, user_id, product_id) von weekly_totals.
+    """
+    return exists().where(
+        WeeklyTotal.period_start == period.start,
+        WeeklyTotal.user_id == User.user_id,
+        WeeklyTotal.quantity > 0
+    )
+
+
+def has_own_reminders() -> ColumnElement:
+    """
+    EXISTS-Bedingung: Der User verwaltet seine Erinnerungen selbst (mindestens ein Eintrag in reminders).
+    Aktive Einträge verschickt die ReminderEngine, nur inaktive bedeuten: Erinnerungen abgeschaltet.
+    """
+    return exists().where(Reminder.user_id == User.user_id)
+
+
+def daily_reminder_recipients(period: OrderPeriod) -> Select:
+    """
+    Empfänger der globalen täglichen Erinnerung als ein Anti-Join:
+    nicht abwesend, ohne Bestellung in der Bestellwoche und ohne eigene Erinnerungen.
+    """
+    return select(User.slack_id).where(
+        User.is_away.is_(False),
+        ~has_ordered(period),
+        ~has_own_reminders()
+    )
+
+
+@dataclass
+class ReminderRunStats:
+    """Statistik eines Laufs der täglichen Erinnerung."""
+    recipients: int = 0
+    skipped_away: int = 0
+    skipped_ordered: int = 0
+    skipped_own_reminders: int = 0
+    query_seconds: float = 0.0
+
+    @property
+    def skipped(self) -> int:
+        return self.skipped_away + self.skipped_ordered + self.skipped_own_reminders
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'recipients': self.recipients,
+            'skipped': self.skipped,
+            'skipped_away': self.skipped_away,
+            'skipped_ordered': self.skipped_ordered,
+            'skipped_own_reminders': self.skipped_own_reminders,
+            'query_ms': round(self.query_seconds * 1000, 1),
+        }
+
+
+def stream_daily_reminder_recipients(stats: ReminderRunStats, period: Optional[OrderPeriod] = None,
+                                     chunk_size: int = 500) -> Iterator[str]:
+    """
+    Liefert die Slack-IDs der Empfänger der täglichen Erinnerung, blockweise vom Server gelesen
+    (yield_per), damit der Versand schon mit dem ersten Block beginnen kann.
+    Die Session bleibt nur offen, bis alle Zeilen gelesen sind; SlackDelivery.deliver() liest den
+    Generator vollständig, bevor es auf die Zustellungen wartet.
+    Vorher werden die übersprungenen User mit einer Zählabfrage nach Grund erfasst.
+    - stats: wird während des Lesens befüllt (Empfänger, übersprungene User, Abfragezeit)
+    """
+    period = period or get_current_period()
+    with db_session(readonly=True) as session:
+        started = time.monotonic()
+        _count_skipped(session, period, stats)
+        result = session.execute(
+            daily_reminder_recipients(period), execution_options={'yield_per': chunk_size}
+        ).scalars()
+        chunks = result.partitions()
+        stats.query_seconds += time.monotonic() - started
+
+        while True:
+            started = time.monotonic()
+            chunk = next(chunks, None)
+            stats.query_seconds += time.monotonic() - started
+            if chunk is None:
+                break
+            for slack_id in chunk:
+                stats.recipients += 1
+                yield slack_id
+
+
+def _count_skipped(session: Session, period: OrderPeriod, stats: ReminderRunStats) -> None:
+    """Zählt die übersprungenen User nach Grund (abwesend vor bestellt vor eigene Erinnerungen)."""
+    ordered = has_ordered(period)
+    own = has_own_reminders()
+    away = User.is_away.is_(True)
+    row = session.execute(select(
+        func.count(case((away, 1))),
+        func.count(case((~away & ordered, 1))),
+        func.count(case((~away & ~ordered & own, 1)))
+    )).one()
+    stats.skipped_away, stats.skipped_ordered, stats.skipped_own_reminders = (int(n) for n in row)
+
+
+class ReminderIndex:
+    """
+    Zeitindex aller aktiven Erinnerungen: (Wochentag, Minute) -> Erinnerungen.
+    Einzelne Erinnerungen können jederzeit ersetzt oder entfernt werden (apply/remove),
+    ohne den Index neu aufzubauen.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._buckets: Dict[BucketKey, Set[int]] = {}
+        self._reminders: Dict[int, Tuple[str, str, Set[BucketKey]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._reminders)
+
+    def apply(self, reminder_id: int, slack_id: str, name: str, keys: Set[BucketKey]) -> None:
+        """Fügt eine Erinnerung hinzu oder ersetzt ihre bisherigen Buckets."""
+        with self._lock:
+            self._remove(reminder_id)
+            self._reminders[reminder_id] = (slack_id, name, keys)
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(reminder_id)
+
+    def remove(self, reminder_id: int) -> None:
+        with self._lock:
+            self._remove(reminder_id)
+
+    def _remove(self, reminder_id: int) -> None:
+        entry = self._reminders.pop(reminder_id, None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(reminder_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def ids(self) -> Set[int]:
+        """IDs aller Erinnerungen im Index."""
+        with self._lock:
+            return set(self._reminders)
+
+    def recipients(self, key: BucketKey) -> Dict[str, List[str]]:
+        """Slack-ID -> Namen der fälligen Erinnerungen im Bucket."""
+        with self._lock:
+            recipients: Dict[str, List[str]] = {}
+            for reminder_id in self._buckets.get(key, ()):
+                slack_id, name, _ = self._reminders[reminder_id]
+                recipients.setdefault(slack_id, []).append(name)
+            return recipients
+
+
+class ReminderEngine:
+    """
+    Persönliche Erinnerungen aus der Tabelle reminders.
+    - Beim ersten Lauf werden alle aktiven Erinnerungen in den ReminderIndex geladen
+    - Danach werden pro Minute nur geänderte Erinnerungen nachgeladen (updated_at/created_at
+      seit dem letzten Abgleich). Gelöschte Zeilen (auch per CASCADE mit ihrem User) hinterlassen
+      keine Änderung; sie werden über einen Abgleich der aktiven IDs aus dem Index entfernt
+    - Vollständiges Neuladen alle REMINDER_FULL_RELOAD_MINUTES oder nach invalidate()
+    - tick() schaut pro Minute genau einen Bucket nach und verschickt dessen Erinnerungen
+      gesammelt über SlackDelivery (gemeinsamer Token-Bucket für chat.postMessage);
+      abwesende User und User mit Bestellung in der aktuellen Bestellwoche werden übersprungen
+    Wird minütlich vom Scheduler-Leader aufgerufen (siehe app/scheduled_jobs.py).
+    """
+
+    # Überlappung beim Nachladen, damit Änderungen aus noch offenen Transaktionen nicht verloren gehen
+    _WATERMARK_OVERLAP = timedelta(minutes=1)
+    # So viele verpasste Minuten werden höchstens nachgeholt (z.B. nach einem verspäteten Lauf)
+    _MAX_CATCH_UP_MINUTES = 10
+
+    def __init__(self):
+        self.index = ReminderIndex()
+        self._lock = Lock()
+        self._watermark: Optional[datetime] = None
+        self._loaded_at: Optional[datetime] = None
+        self._last_minute: Optional[datetime] = None
+
+    def invalidate(self) -> None:
+        """Erzwingt beim nächsten tick() ein vollständiges Neuladen."""
+        with self._lock:
+            self._loaded_at = None
+
+    def tick(self, client, now: Optional[datetime] = None) -> int:
+        """
+        Verschickt alle seit dem letzten Aufruf fälligen Erinnerungen.
+        - client: Slack WebClient
+        - Rückgabe: Anzahl der verschickten Erinnerungen
+        """
+        now = (now or datetime.now()).replace(second=0, microsecond=0)
+        self.refresh(now)
+
+        with self._lock:
+            last = self._last_minute
+            self._last_minute = now
+        if last is None or now - last > timedelta(minutes=self._MAX_CATCH_UP_MINUTES):
+            last = now - timedelta(minutes=1)
+
+        sent = 0
+        minute = last + timedelta(minutes=1)
+        while minute <= now:
+            sent += self._dispatch(client, (minute.weekday(), minute.hour * 60 + minute.minute))
+            minute += timedelta(minutes=1)
+        return sent
+
+    def refresh(self, now: Optional[datetime] = None) -> None:
+        """Lädt den Index vollständig oder nur die geänderten Erinnerungen nach."""
+        now = now or datetime.now()
+        with self._lock:
+            full = (
+                self._loaded_at is None
+                or now - self._loaded_at >= timedelta(minutes=settings.REMINDER_FULL_RELOAD_MINUTES)
+            )
+            watermark = self._watermark
+        # Zeitstempel der Erinnerungen werden in UTC gespeichert (siehe Reminder-Modell)
+        polled_at = datetime.utcnow()
+
+        with db_session(readonly=True) as session:
+            if full:
+                self._load_all(session)
+            else:
+                self._load_changed(session, watermark - self._WATERMARK_OVERLAP)
+
+        with self._lock:
+            self._watermark = polled_at
+            if full:
+                self._loaded_at = now
+
+    def _load_all(self, session: Session) -> None:
+        index = ReminderIndex()
+        for reminder, slack_id in self._query(session):
+            self._apply(index, reminder, slack_id)
+        self.index = index
+        metrics.set_gauge('reminders.indexed', len(index))
+        logger.info(f"Reminder index loaded: {len(index)} active reminder(s)")
+
+    def _load_changed(self, session: Session, since: datetime) -> None:
+        changed = self._query(
+            session,
+            func.coalesce(Reminder.updated_at, Reminder.created_at) >= since,
+            active_only=False
+        )
+        for reminder, slack_id in changed:
+            if reminder.is_active:
+                self._apply(self.index, reminder, slack_id)
+            else:
+                self.index.remove(reminder.reminder_id)
+
+        # Gelöschte Erinnerungen: alle aus dem Index entfernen, die nicht mehr aktiv in der Tabelle stehen
+        active_ids = set(session.execute(
+            select(Reminder.reminder_id)
+            .join(User, User.user_id == Reminder.user_id)
+            .where(Reminder.is_active.is_(True))
+        ).scalars())
+        deleted = self.index.ids() - active_ids
+        for reminder_id in deleted:
+            self.index.remove(reminder_id)
+        if deleted:
+            metrics.increment('reminders.deleted', len(deleted))
+        metrics.set_gauge('reminders.indexed', len(self.index))
+
+    def _query(self, session: Session, *criteria, active_only: bool = True) -> Iterable[Tuple[Reminder, str]]:
+        query = select(Reminder, User.slack_id).join(User, User.user_id == Reminder.user_id).where(*criteria)
+        if active_only:
+            query = query.where(Reminder.is_active.is_(True))
+        return session.execute(query).all()
+
+    def _apply(self, index: ReminderIndex, reminder: Reminder, slack_id: str) -> None:
+        try:
+            keys = reminder_buckets(reminder.reminder_type, reminder.weekdays, reminder.reminder_time)
+        except ValueError as e:
+            logger.warning(f"Reminder {reminder.reminder_id} skipped: {str(e)}")
+            index.remove(reminder.reminder_id)
+            return
+        index.apply(reminder.reminder_id, slack_id, reminder.reminder_name, keys)
+
+    def _dispatch(self, client, key: BucketKey) -> int:
+        recipients = self.index.recipients(key)
+        if not recipients:
+            return 0
+
+        # Abwesende User und User, die diese Woche schon bestellt haben, mit einer Abfrage pro Bucket herausfiltern
+        with db_session(readonly=True) as session:
+            eligible = set(session.execute(
+                select(User.slack_id).where(
+                    User.slack_id.in_(list(recipients)),
+                    User.is_away.is_(False),
+                    ~has_ordered(get_current_period())
+                )
+            ).scalars())
+        metrics.increment('reminders.skipped', len(recipients) - len(eligible))
+
+        messages = []
+        for slack_id, names in recipients.items():
+            if slack_id not in eligible:
+                continue
+            blocks = create_reminder_blocks(sorted(set(names)))
+            messages.append(OutboundMessage('chat_postMessage', {
+                'channel': slack_id,
+                'text': blocks[0]['text']['text'],
+                'blocks': blocks
+            }))
+        if not messages:
+            return 0
+        report = SlackDelivery(client).deliver('reminders', messages)
+        return report.sent
+
+
+# Globale Instanz für die persönlichen Erinnerungen
+reminder_engine = ReminderEngine()
@@ -4,7 +4,8 @@
 
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from app.models import SavedOrder, User
+from app.models import SavedOrder
+from app.core.user_directory import user_directory
 from app.utils.constants.error_types import OrderError
 
 
@@ -25,12 +26,12 @@ class SavedOrderService:
         - name: Name der Vorlage (eindeutig pro User)
         - order_string: String-Repräsentation der Bestellung (z.B. 'brot 2, kuchen 1')
         Ablauf:
-        1. User anhand Slack-ID suchen
+        1. User anhand Slack-ID auflösen (über den UserDirectory-Cache)
         2. Prüfen, ob bereits eine Vorlage mit diesem Namen existiert
         3. Neue SavedOrder anlegen und speichern
         4. Gibt das SavedOrder-Objekt zurück
         """
-        user = self.session.query(User).filter_by(slack_id=user_id).first()
+        user = user_directory.get(user_id, self.session)
         if not user:
             raise OrderError("Benutzer nicht gefunden")
 
@@ -58,11 +59,11 @@ class SavedOrderService:
         - name: Name der Vorlage
         - Rückgabe: SavedOrder-Objekt oder None
         Ablauf:
-        1. User anhand Slack-ID suchen
+        1. User anhand Slack-ID auflösen (über den UserDirectory-Cache)
         2. SavedOrder anhand user_id und name suchen
         3. Gibt das SavedOrder-Objekt zurück (oder None)
         """
-        user = self.session.query(User).filter_by(slack_id=user_id).first()
+        user = user_directory.get(user_id, self.session)
         if not user:
             return None
 
@@ -77,7 +78,7 @@ class SavedOrderService:
         - user_id: Slack-ID
         - Rückgabe: Liste von SavedOrder-Objekten
         """
-        user = self.session.query(User).filter_by(slack_id=user_id).first()
+        user = user_directory.get(user_id, self.session)
         if not user:
             return []
         return self.session.query(SavedOrder).filter_by(user_id=user.user_id).all()
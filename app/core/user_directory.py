@@ -0,0 +1,116 @@
+#==========================
+# app/core/user_directory.py
+#==========================
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional, Tuple, Any
+from sqlalchemy.orm import Session
+from app.models import User
+from app.utils.db.database import db_session
+from config.app_config import settings
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    """
+    Schlanke, von der Session losgelöste Kopie der Identitätsdaten eines Users.
+    Hat die gleichen Attributnamen wie das User-Modell und kann daher überall dort
+    verwendet werden, wo nur gelesen wird (z.B. create_home_view).
+    """
+    user_id: int
+    slack_id: str
+    name: Optional[str]
+    is_admin: bool
+    is_away: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> 'UserIdentity':
+        return cls(
+            user_id=user.user_id,
+            slack_id=user.slack_id,
+            name=user.name,
+            is_admin=bool(user.is_admin),
+            is_away=bool(user.is_away)
+        )
+
+
+class UserDirectory:
+    """
+    Prozessweiter Cache für User-Identitäten, Schlüssel ist die Slack-ID.
+    Erspart pro Slack-Command die wiederholten `filter_by(slack_id=...)`-Abfragen in
+    Registrierungsprüfung, Handler und Services.
+    - Einträge verfallen nach ttl_seconds
+    - Nicht registrierte User werden nicht gemerkt: nach /user register (ggf. bei einem
+      anderen Worker) wird der User beim nächsten Zugriff sofort gefunden
+    - UserService invalidiert Einträge bei Registrierung und Namensänderung
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Optional[UserIdentity]]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, slack_id: str, session: Optional[Session] = None) -> Optional[UserIdentity]:
+        """
+        Liefert die Identität zu einer Slack-ID (oder None, falls nicht registriert).
+        - session: Optional eine bereits offene Session; sonst wird nur bei einem
+          Cache-Miss eine eigene Session geöffnet.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(slack_id)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        if session is not None:
+            identity = self._load(session, slack_id)
+        else:
+            with db_session() as own_session:
+                identity = self._load(own_session, slack_id)
+
+        if identity is not None:
+            with self._lock:
+                self._entries[slack_id] = (now + self.ttl_seconds, identity)
+        return identity
+
+    def is_registered(self, slack_id: str, session: Optional[Session] = None) -> bool:
+        """Prüft über den Cache, ob ein User registriert ist."""
+        return self.get(slack_id, session) is not None
+
+    def invalidate(self, slack_id: Optional[str] = None) -> None:
+        """
+        Entfernt einen Eintrag aus dem Cache (oder alle, wenn keine Slack-ID angegeben ist).
+        """
+        with self._lock:
+            if slack_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(slack_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gibt die Cache-Zähler zurück (Treffer, Fehlzugriffe, Trefferquote, Anzahl Einträge).
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else 0.0,
+                'size': len(self._entries)
+            }
+
+    @staticmethod
+    def _load(session: Session, slack_id: str) -> Optional[UserIdentity]:
+        user = session.query(User).filter_by(slack_id=slack_id).first()
+        return UserIdentity.from_user(user) if user else None
+
+
+# Globale Instanz für das gesamte Projekt
+user_directory = UserDirectory(ttl_seconds=settings.USER_CACHE_TTL)
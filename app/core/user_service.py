@@ -5,6 +5,9 @@
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.models import User
+from app.core.user_directory import user_directory
+from app.core.home_view_cache import home_view_cache
+from app.utils.db.database import run_after_commit
 from app.utils.constants.error_types import ValidationError
 
 
@@ -28,6 +31,7 @@ class UserService:
 
         user = User(slack_id=slack_id, name=name)
         self.session.add(user)
+        self._invalidate_identity(slack_id)
         return user
 
     def get_user(self, slack_id: str) -> Optional[User]:
@@ -47,6 +51,7 @@ class UserService:
             raise ValidationError("Benutzer nicht gefunden")
 
         user.name = new_name
+        self._invalidate_identity(slack_id)
         return user
 
     def get_user_name(self, slack_id: str) -> Optional[str]:
@@ -55,3 +60,17 @@ class UserService:
         """
         user = self.get_user(slack_id)
         return user.name if user else None
+
+    def _invalidate_identity(self, slack_id: str) -> None:
+        """
+        Entfernt den gecachten Eintrag im UserDirectory - sofort und nochmals nach dem Commit,
+        damit keine parallele Anfrage den alten Stand bis zum Ablauf der TTL festhält.
+        Die Home-View des Users wird nach dem Commit als veraltet markiert.
+        """
+        user_directory.invalidate(slack_id)
+
+        def after_commit():
+            user_directory.invalidate(slack_id)
+            home_view_cache.bump(slack_id)
+
+        run_after_commit(self.session, after_commit)
@@ -0,0 +1,168 @@
+#==========================
+# app/core/weekly_totals_service.py
+#==========================
+
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import Order, OrderItem, Product, User, WeeklyTotal
+from app.core.order_period import OrderPeriod
+
+
+class WeeklyTotalsService:
+    """
+    Service-Klasse für die vorberechneten Wochensummen (Tabelle weekly_totals).
+    - apply(): Mengenänderungen einer Bestellung/Entfernung einbuchen (gleiche Transaktion)
+    - get_user_totals() / get_period_rows(): Lesezugriffe für Home-View, Vorschau und Wochenübersicht
+    - rebuild(): Wochensummen aus den Rohdaten (orders/orderItem) neu aufbauen
+    - backfill(): rebuild(), falls für die Woche Bestellungen, aber noch keine Summen existieren
+    """
+    def __init__(self, session: Session):
+        # SQLAlchemy-Session für alle DB-Operationen
+        self.session = session
+
+    def apply(self, period_start: datetime, user_id: int, deltas: Dict[int, int]) -> None:
+        """
+        Bucht Mengenänderungen für einen User in einer Bestellwoche ein.
+        - deltas: product_id -> Mengenänderung (positiv beim Bestellen, negativ beim Entfernen)
+        Positive Änderungen werden per Upsert eingebucht, damit zwei gleichzeitige erste
+        Bestellungen desselben Produkts nicht am Primärschlüssel scheitern.
+        Zeilen, deren Menge auf 0 fällt, werden gelöscht.
+        """
+        for product_id, delta in deltas.items():
+            if not delta:
+                continue
+            if delta > 0:
+                self._upsert(period_start, user_id, product_id, delta)
+                continue
+            key = (
+                WeeklyTotal.period_start == period_start,
+                WeeklyTotal.user_id == user_id,
+                WeeklyTotal.product_id == product_id
+            )
+            self.session.execute(
+                update(WeeklyTotal)
+                .where(*key)
+                .values(quantity=WeeklyTotal.quantity + delta)
+            )
+            self.session.execute(delete(WeeklyTotal).where(*key, WeeklyTotal.quantity <= 0))
+
+    def _upsert(self, period_start: datetime, user_id: int, product_id: int, delta: int) -> None:
+        """Erhöht die Summe oder legt sie an (ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE)."""
+        values = dict(period_start=period_start, user_id=user_id, product_id=product_id, quantity=delta)
+        dialect = self.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            stmt = mysql.insert(WeeklyTotal).values(**values)
+            stmt = stmt.on_duplicate_key_update(quantity=WeeklyTotal.quantity + stmt.inserted.quantity)
+        elif dialect in ('postgresql', 'sqlite'):
+            stmt = (postgresql if dialect == 'postgresql' else sqlite).insert(WeeklyTotal).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['period_start', 'user_id', 'product_id'],
+                set_={'quantity': WeeklyTotal.quantity + stmt.excluded.quantity}
+            )
+        else:
+            # Andere Datenbanken: UPDATE, sonst INSERT; verliert das INSERT das Rennen, erneut UPDATE
+            key = (
+                WeeklyTotal.period_start == period_start,
+                WeeklyTotal.user_id == user_id,
+                WeeklyTotal.product_id == product_id
+            )
+            increment = update(WeeklyTotal).where(*key).values(quantity=WeeklyTotal.quantity + delta)
+            if self.session.execute(increment).rowcount:
+                return
+            try:
+                with self.session.begin_nested():
+                    self.session.execute(insert(WeeklyTotal).values(**values))
+            except IntegrityError:
+                self.session.execute(increment)
+            return
+        self.session.execute(stmt)
+
+    def get_user_totals(self, period_start: datetime, user_id: int) -> Dict[str, int]:
+        """
+        Gibt die Summen eines Users in einer Bestellwoche zurück.
+        - Rückgabe: Dict Produktname -> Menge
+        """
+        rows = self.session.execute(
+            select(Product.name, WeeklyTotal.quantity)
+            .join(Product, Product.product_id == WeeklyTotal.product_id)
+            .where(
+                WeeklyTotal.period_start == period_start,
+                WeeklyTotal.user_id == user_id,
+                WeeklyTotal.quantity > 0
+            )
+        ).all()
+        totals: Dict[str, int] = {}
+        for name, quantity in rows:
+            totals[name] = totals.get(name, 0) + quantity
+        return totals
+
+    def get_period_rows(self, period_start: datetime) -> List[Tuple[str, str, int]]:
+        """
+        Gibt alle Summen einer Bestellwoche zurück.
+        - Rückgabe: Liste von (Produktname, User-Name, Menge)
+        """
+        return [
+            (product_name, user_name, quantity)
+            for product_name, user_name, quantity in self.session.execute(
+                select(Product.name, User.name, WeeklyTotal.quantity)
+                .join(Product, Product.product_id == WeeklyTotal.product_id)
+                .join(User, User.user_id == WeeklyTotal.user_id)
+                .where(WeeklyTotal.period_start == period_start, WeeklyTotal.quantity > 0)
+            ).all()
+        ]
+
+    def rebuild(self, period: OrderPeriod) -> int:
+        """
+        Baut die Wochensummen einer Bestellwoche aus den Rohdaten neu auf.
+        Ablauf:
+        1. Alle Summen der Woche löschen
+        2. Orders und OrderItems der Woche per GROUP BY (User, Produkt) aggregieren
+        3. Ergebnis als neue Summen speichern
+        - Rückgabe: Anzahl der geschriebenen Zeilen
+        """
+        self.session.execute(delete(WeeklyTotal).where(WeeklyTotal.period_start == period.start))
+        rows = self.session.execute(
+            select(Order.user_id, OrderItem.product_id, func.sum(OrderItem.quantity))
+            .join(OrderItem, OrderItem.order_id == Order.order_id)
+            .where(period.covers(Order.order_date))
+            .group_by(Order.user_id, OrderItem.product_id)
+        ).all()
+        values = [
+            {
+                'period_start': period.start,
+                'user_id': user_id,
+                'product_id': product_id,
+                'quantity': int(quantity)
+            }
+            for user_id, product_id, quantity in rows
+            if quantity and quantity > 0
+        ]
+        if values:
+            self.session.execute(insert(WeeklyTotal).values(values))
+        return len(values)
+
+    def backfill(self, period: OrderPeriod) -> int:
+        """
+        Baut die Wochensummen einer Bestellwoche nur dann auf, wenn es Bestellpositionen,
+        aber noch keine Summen gibt (z.B. Bestellungen von vor der Einführung von weekly_totals).
+        Wird beim Wechsel auf den Scheduler-Leader aufgerufen; sonst genügt eine Abfrage.
+        - Rückgabe: Anzahl der geschriebenen Zeilen (0, wenn nichts nachzutragen war)
+        """
+        has_totals = self.session.execute(
+            select(WeeklyTotal.period_start).where(WeeklyTotal.period_start == period.start).limit(1)
+        ).first()
+        if has_totals is not None:
+            return 0
+        has_items = self.session.execute(
+            select(OrderItem.order_id)
+            .join(Order, Order.order_id == OrderItem.order_id)
+            .where(period.covers(Order.order_date), OrderItem.quantity > 0)
+            .limit(1)
+        ).first()
+        if has_items is None:
+            return 0
+        return self.rebuild(period)
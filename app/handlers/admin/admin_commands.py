@@ -2,12 +2,14 @@
 # app/handlers/admin/admin_commands.py
 #==========================
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 from app.utils.logging.log_config import setup_logger
-from app.utils.db.database import db_session
+from app.utils.db.database import call_after_commit, db_session
 from app.core.product_service import ProductService
-from app.models import User
+from app.core.weekly_totals_service import WeeklyTotalsService
+from app.core.order_period import get_current_period
+from app.core.user_directory import user_directory
 from app.utils.message_blocks.messages import create_admin_help_blocks, create_product_list_blocks
 
 logger = setup_logger(__name__)
@@ -37,45 +39,55 @@ class AdminHandler:
             user_id = body.get('user_id')
             command = body.get('text', '').strip()
 
-            # Datenbank-Session öffnen und Adminrechte prüfen
-            with db_session() as session:
-                user = session.query(User).filter_by(slack_id=user_id, is_admin=True).first()
-                if not user:
-                    self._send_message(user_id, "❌ Keine Admin-Berechtigung")
-                    return
+            # Adminrechte über den UserDirectory-Cache prüfen
+            user = user_directory.get(user_id)
+            if not user or not user.is_admin:
+                self._send_message(user_id, "❌ Keine Admin-Berechtigung")
+                return
 
-                # Wenn kein Sub-Command angegeben, Hilfe anzeigen
-                if not command:
-                    self._show_admin_help(user_id)
-                    return
+            # Wenn kein Sub-Command angegeben, Hilfe anzeigen
+            if not command:
+                self._show_admin_help(user_id)
+                return
 
-                parts = command.split()
-                action = parts[0]
+            parts = command.split()
+            action = parts[0]
 
+            # Datenbank-Session nur für die eigentlichen Admin-Aktionen öffnen.
+            # Die Antwort wird als reine Daten zurückgegeben und erst nach dem
+            # Schließen der Session (und damit nach dem Commit) gesendet.
+            with db_session() as session:
                 # Produkt-Kommandos weiterleiten
                 if action == 'product':
-                    self._handle_product_command(session, user_id, parts[1:])
+                    reply = self._handle_product_command(session, parts[1:])
+                # Wochensummen-Kommandos weiterleiten
+                elif action == 'totals':
+                    reply = self._handle_totals_command(session, parts[1:])
                 else:
-                    self._show_admin_help(user_id)
+                    reply = None
+
+            if reply is None:
+                self._show_admin_help(user_id)
+            else:
+                self._send_message(user_id, **reply)
 
         except Exception as e:
             logger.error(f"Admin error: {str(e)}")
             self._send_message(user_id, f"❌ Fehler: {str(e)}")
 
-    def _handle_product_command(self, session, user_id: str, args: List[str]) -> None:
+    def _handle_product_command(self, session, args: List[str]) -> Optional[Dict[str, Any]]:
         """
         Verarbeitet Produkt-bezogene Admin-Kommandos wie Hinzufügen und Listen von Produkten.
         session: Aktive DB-Session
-        user_id: Slack-ID des Admins
         args: Argumente nach 'product' (z.B. ['add', 'Brötchen'])
+        Rückgabe: Antwort als Dict (text/blocks) oder None, wenn die Hilfe angezeigt werden soll
         Ablauf:
         1. Prüft, ob ein Subkommando (add/list) angegeben ist
         2. Leitet an die jeweilige Produktfunktion weiter
         3. Zeigt Hilfe bei ungültigen Kommandos
         """
         if not args:
-            self._send_message(user_id, "❌ Ungültiges Produktkommando")
-            return
+            return {'text': "❌ Ungültiges Produktkommando"}
 
         service = ProductService(session)
         action = args[0]
@@ -88,15 +100,35 @@ class AdminHandler:
                 # Nimm den Rest des Strings als Beschreibung, falls vorhanden
                 description = ' '.join(args[2:]) if len(args) > 2 else None
                 product = service.add_product(name, description)
-                self._send_message(user_id, f"✅ Produkt '{product.name}' wurde hinzugefügt")
+                return {'text': f"✅ Produkt '{product.name}' wurde hinzugefügt"}
             # Produktliste anzeigen: /admin product list
             elif action == 'list':
                 products = service.get_active_products()
-                self._send_product_list(user_id, products)
-            else:
-                self._show_admin_help(user_id)
+                # Direkter Aufruf ohne benanntes Argument
+                return {'blocks': create_product_list_blocks(products)}
+            return None
         except Exception as e:
-            self._send_message(user_id, f"❌ Fehler: {str(e)}")
+            return {'text': f"❌ Fehler: {str(e)}"}
+
+    def _handle_totals_command(self, session, args: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Verarbeitet Kommandos für die vorberechneten Wochensummen (weekly_totals).
+        session: Aktive DB-Session
+        args: Argumente nach 'totals' (z.B. ['rebuild'])
+        Rückgabe: Antwort als Dict (text/blocks) oder None, wenn die Hilfe angezeigt werden soll
+        Ablauf:
+        1. Bei 'rebuild' die Summen der aktuellen Woche aus den Rohdaten neu aufbauen
+        2. Zeigt Hilfe bei ungültigen Kommandos
+        """
+        if args[:1] != ['rebuild']:
+            return None
+
+        try:
+            # Wochensummen neu aufbauen: /admin totals rebuild
+            rows = WeeklyTotalsService(session).rebuild(get_current_period())
+            return {'text': f"✅ Wochensummen neu aufgebaut ({rows} Einträge)"}
+        except Exception as e:
+            return {'text': f"❌ Fehler: {str(e)}"}
 
     def _send_message(self, user_id: str, text: str = None, blocks: List = None) -> None:
         """
@@ -110,25 +142,21 @@ class AdminHandler:
             logger.error("Slack app not initialized")
             return
 
-        try:
-            # Fallback-Text: Nutze Text, sonst generischen Hinweis
-            fallback_text = text if text else "Neue Admin-Nachricht"
-            self.slack_app.client.chat_postMessage(
-                channel=user_id,
-                text=fallback_text,
-                blocks=blocks
-            )
-        except Exception as e:
-            logger.error(f"Failed to send message to {user_id}: {str(e)}")
-
-    def _send_product_list(self, user_id: str, products: List) -> None:
-        """
-        Sendet eine formatierte Produktliste an den Admin.
-        Nutzt die Message-Block-Funktion für die Produktübersicht.
-        """
-        # Direkter Aufruf ohne benanntes Argument
-        blocks = create_product_list_blocks(products)
-        self._send_message(user_id, blocks=blocks)
+        # Fallback-Text: Nutze Text, sonst generischen Hinweis
+        fallback_text = text if text else "Neue Admin-Nachricht"
+
+        def post():
+            try:
+                self.slack_app.client.chat_postMessage(
+                    channel=user_id,
+                    text=fallback_text,
+                    blocks=blocks
+                )
+            except Exception as e:
+                logger.error(f"Failed to send message to {user_id}: {str(e)}")
+
+        # Erst nach dem Commit des Requests senden (ohne gehaltene DB-Verbindung)
+        call_after_commit(post)
 
     def _show_admin_help(self, user_id: str) -> None:
         """
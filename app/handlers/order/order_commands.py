@@ -5,13 +5,22 @@
 from typing import Dict, Any, List
 import logging
 from sqlalchemy import func
-from app.utils.db.database import db_session
+from app.utils.db.database import call_after_commit, db_session
 from app.utils.logging.log_config import setup_logger
 from app.core.order_service import OrderService
+from app.core.outbox_service import OutboxService
 from app.core.saved_order_service import SavedOrderService
 from app.core.product_service import ProductService
+from app.core.order_period import get_current_period
+from app.core.order_grammar import format_items, parse_items, strip_sub_command
+from app.core.user_directory import user_directory
+from app.core.home_view_cache import home_view_cache
+from app.core.reminder_engine import ReminderRunStats, stream_daily_reminder_recipients
+from app.utils.workers.timeout_scheduler import timeout_scheduler
+from app.utils.metrics.metrics import metrics
+from app.utils.slack.delivery import OutboundMessage, SlackDelivery
 from app.utils.constants.error_types import OrderError
-from app.models import Order, User
+from config.app_config import settings
 from app.utils.message_blocks.messages import (
     create_order_help_blocks,
     create_order_list_blocks,
@@ -22,43 +31,25 @@ from app.utils.message_blocks.messages import (
     create_product_row_block,
     create_weekly_summary_blocks
 )
-from datetime import datetime, timedelta, time
 import json
-from threading import Timer
 
 logger = setup_logger(__name__)
 
-# ==========================
-# Hilfsfunktion zum Parsen von /order add Kommandos
-# ==========================
-# Diese Funktion wandelt den Text eines /order add Kommandos in eine Liste von Produkt-Dictionaries um.
-# Beispiel: "add broetchen 2, vollkorn 1" -> [{name: broetchen, quantity: 2}, ...]
-def _parse_order_command(text: str) -> List[Dict[str, Any]]:
-    """
-    Parst den Bestelltext in eine Liste von Produkten und Mengen.
-    Erwartet das Format: 'add [produkt] [anzahl], ...'
-    Gibt eine Liste von Dicts mit Produktnamen und Mengen zurück.
-    """
-    if not text.startswith('add '):
-        raise OrderError("Ungültiges Bestellformat. Verwende: /order add [produkt] [anzahl]")
+# Gültigkeit der /order remove Vorschau in Sekunden
+REMOVE_PREVIEW_TIMEOUT = 30.0
 
-    items = []
-    parts = text[4:].split(',')
 
-    for part in parts:
-        try:
-            name, quantity = part.strip().split()
-            quantity = int(quantity)
-            if quantity <= 0:
-                raise OrderError(f"Ungültige Menge für {name}: {quantity}")
-            items.append({
-                'name': name.lower(),
-                'quantity': quantity
-            })
-        except ValueError:
-            raise OrderError(f"Ungültiges Format bei: {part}. Verwende: [produkt] [anzahl]")
+def remove_preview_key(channel: str, ts: str) -> str:
+    """
+    Gemeinsamer Outbox-dedup_key für den Abschluss einer /order remove Vorschau.
+    Bestätigen, Abbrechen und Zeitüberschreitung tragen ihr chat_update unter diesem Schlüssel
+    ein; nur das erste Ergebnis wird übernommen, auch wenn die Klicks bei einem anderen
+    Worker ankommen als die Vorschau (deren Timeout nur im eigenen Prozess läuft).
+    """
+    return f"remove_preview:{channel}:{ts}"
 
-    return items
+# Das Parsen von add/remove/save (inkl. gespeicherter Bestellungen) übernimmt
+# app/core/order_grammar.py, z.B. "add Vollkorn 2, 3x Laugen Stange"
 
 class OrderHandler:
     """
@@ -81,11 +72,9 @@ class OrderHandler:
             user_id = command.get('user_id')
 
             # Prüfe, ob der User existiert (sonst Registrierung fordern)
-            with db_session() as session:
-                user = session.query(User).filter_by(slack_id=user_id).first()
-                if not user:
-                    self._send_message(user_id, "Bitte registriere dich zuerst mit dem `/user register` Befehl.")
-                    return
+            if not user_directory.is_registered(user_id):
+                self._send_message(user_id, "Bitte registriere dich zuerst mit dem `/user register` Befehl.")
+                return
 
             # Wenn kein Sub-Command angegeben, Hilfe anzeigen
             if not command.get('text'):
@@ -97,15 +86,6 @@ class OrderHandler:
 
             # Routing zu den jeweiligen Methoden je nach Sub-Command
             if sub_command == 'add':
-                # Prüfen ob gespeicherte Bestellung geladen werden soll
-                if len(command_parts) == 2:
-                    with db_session() as session:
-                        service = SavedOrderService(session)
-                        saved = service.get_saved_order(user_id, command_parts[1])
-                        if saved:
-                            # Originalen add Befehl ausführen
-                            command['text'] = f"add {saved.order_string}"
-
                 self._handle_add_order(command)
             elif sub_command == 'save':
                 self._handle_save_order(command)
@@ -130,18 +110,27 @@ class OrderHandler:
         Verarbeitet eine neue Bestellung und bestätigt sie dem User.
         """
         try:
-            items = _parse_order_command(command.get('text', ''))
+            items_text = strip_sub_command(command.get('text', ''), 'add')
             user_id = command['user_id']
 
             with db_session() as session:
+                # Nur ein Name angegeben: gespeicherte Bestellung laden
+                if items_text and ' ' not in items_text:
+                    saved = SavedOrderService(session).get_saved_order(user_id, items_text)
+                    if saved:
+                        items_text = saved.order_string
+
+                # Positionen parsen und gegen den ProductCatalog auflösen
+                items = parse_items(items_text, session)
                 service = OrderService(session)
-                order = service.add_order(user_id, items)
-                session.flush()
-                session.commit()
-                session.refresh(order)
-                # Verwende die neue Block-Funktion für die Bestellbestätigung
-                blocks = create_order_confirmation_blocks(order)
-                self._send_message(user_id, blocks=blocks)
+                confirmation = service.add_order(user_id, items)
+
+                # Bestätigung in derselben Transaktion in die Outbox schreiben;
+                # zugestellt wird sie nach dem Commit vom OutboxDispatcher
+                self._enqueue_confirmation(session, user_id, confirmation)
+
+            if self.slack_app:
+                home_view_cache.refresh_async(self.slack_app.client, user_id)
 
         except OrderError as e:
             self._send_message(command['user_id'], f"Bestellungsfehler: {str(e)}")
@@ -149,48 +138,53 @@ class OrderHandler:
             logger.error(f"Unexpected error in handle_add_order: {str(e)}")
             self._send_message(command['user_id'], "Ein unerwarteter Fehler ist aufgetreten.")
 
+    def _enqueue_confirmation(self, session, user_id: str, confirmation: Dict[str, Any]) -> None:
+        """
+        Trägt die Bestellbestätigung in die Outbox ein.
+        Liegt die letzte Bestätigung des Users höchstens ORDER_CONFIRMATION_COALESCE_SECONDS zurück,
+        wird diese per chat_update mit den Summen der aktuellen Bestellwoche aktualisiert,
+        statt eine weitere Nachricht zu posten.
+        """
+        outbox = OutboxService(session)
+        target = outbox.coalescing_target(
+            user_id, 'order_confirmation', settings.ORDER_CONFIRMATION_COALESCE_SECONDS
+        )
+        if target is None:
+            blocks = create_order_confirmation_blocks(confirmation)
+            method = 'chat_postMessage'
+        else:
+            overview = OrderService(session).get_order_overview(user_id)
+            blocks = create_order_confirmation_blocks(confirmation, overview['product_totals'])
+            method = 'chat_update'
+            metrics.increment('orders.confirmations.coalesced')
+        outbox.enqueue(
+            method, user_id,
+            dedup_key=f"order:{confirmation['order_id']}:confirmation",
+            kind='order_confirmation',
+            update_of=target,
+            text=self._get_fallback_text(blocks),
+            blocks=blocks
+        )
+
     def _handle_list_orders(self, user_id: str) -> None:
         """
         Zeigt die Bestellungen der aktuellen Woche für den User an.
-        Berechnet den Zeitraum von Mittwoch 10:00 bis Mittwoch 09:59 der Folgewoche.
+        Der Zeitraum (Mittwoch 10:00 bis Mittwoch 09:59 der Folgewoche) kommt aus get_current_period().
         """
         try:
-            with db_session() as session:
-                now = datetime.now()
-                current_weekday = now.weekday()
-                days_since_wednesday = (current_weekday - 2) % 7
-                last_wednesday = now - timedelta(days=days_since_wednesday)
-                period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-
-                if current_weekday == 2 and now.hour < 10:
-                    period_start = period_start - timedelta(days=7)
-
-                period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
+            period = get_current_period()
+            # Übersicht als reine Daten laden; gesendet wird erst nach dem Schließen der Session
+            with db_session(readonly=True) as session:
+                overview = OrderService(session).get_order_overview(user_id, period)
 
-                user = session.query(User).filter_by(slack_id=user_id).first()
-                if not user:
-                    self._send_message(user_id, "Benutzer nicht gefunden")
-                    return
+            if overview is None:
+                self._send_message(user_id, "Benutzer nicht gefunden")
+                return
 
-                orders = session.query(Order) \
-                    .filter(
-                    Order.user_id == user.user_id,
-                    Order.order_date.between(period_start, period_end)
-                ) \
-                    .order_by(Order.order_date.asc()) \
-                    .all()
-
-                latest_order = session.query(Order) \
-                    .filter(
-                    Order.user_id == user.user_id,
-                    Order.order_date.between(period_start, period_end)
-                ) \
-                    .order_by(Order.order_date.desc()) \
-                    .first()
-
-                # Verwende die neue Block-Funktion für die Bestellübersicht
-                blocks = create_order_list_blocks(orders, period_start, period_end, latest_order)
-                self._send_message(user_id, blocks=blocks)
+            blocks = create_order_list_blocks(
+                overview['product_totals'], period.start, period.end, overview['latest_order_date']
+            )
+            self._send_message(user_id, blocks=blocks)
 
         except Exception as e:
             logger.error(f"Error listing orders: {str(e)}")
@@ -213,18 +207,22 @@ class OrderHandler:
             logger.error("Slack app not initialized")
             return
 
-        try:
-            # Fallback-Text für verschiedene Nachrichtentypen
-            fallback_text = text or self._get_fallback_text(blocks, attachments)
+        # Fallback-Text für verschiedene Nachrichtentypen
+        fallback_text = text or self._get_fallback_text(blocks, attachments)
 
-            self.slack_app.client.chat_postMessage(
-                channel=user_id,
-                text=fallback_text,  # Immer einen Fallback-Text angeben
-                blocks=blocks,
-                attachments=attachments
-            )
-        except Exception as e:
-            logger.error(f"Failed to send message to {user_id}: {str(e)}")
+        def post():
+            try:
+                self.slack_app.client.chat_postMessage(
+                    channel=user_id,
+                    text=fallback_text,  # Immer einen Fallback-Text angeben
+                    blocks=blocks,
+                    attachments=attachments
+                )
+            except Exception as e:
+                logger.error(f"Failed to send message to {user_id}: {str(e)}")
+
+        # Erst nach dem Commit des Requests senden (ohne gehaltene DB-Verbindung)
+        call_after_commit(post)
 
     def _get_fallback_text(self, blocks: List = None, attachments: List = None) -> str:
         """
@@ -243,7 +241,10 @@ class OrderHandler:
 
     def send_daily_reminder(self) -> None:
         """
-        Sendet tägliche Erinnerungen an alle aktiven Benutzer.
+        Sendet die tägliche Erinnerung an alle User, die noch nicht bestellt haben.
+        Übersprungen werden abwesende User, User mit Bestellung in der aktuellen Bestellwoche
+        und User mit eigenen Erinnerungen (siehe app/core/reminder_engine.py).
+        Die Empfänger werden per Anti-Join ermittelt und direkt in den Versand gestreamt.
         Wird vom Scheduler aufgerufen.
         """
         if not self.slack_app:
@@ -252,18 +253,23 @@ class OrderHandler:
 
         logger.info("Sending daily reminder")
         try:
-            with db_session() as session:
-                users = session.query(User).filter_by(is_away=False).all()
-                blocks = create_daily_reminder_blocks()
-
-                for user in users:
-                    try:
-                        self.slack_app.client.chat_postMessage(
-                            channel=user.slack_id,
-                            blocks=blocks
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to send reminder to user {user.slack_id}: {str(e)}")
+            stats = ReminderRunStats()
+            blocks = create_daily_reminder_blocks()
+            messages = (
+                OutboundMessage('chat_postMessage', {
+                    'channel': slack_id,
+                    'text': self._get_fallback_text(blocks),
+                    'blocks': blocks
+                })
+                for slack_id in stream_daily_reminder_recipients(stats)
+            )
+            SlackDelivery(self.slack_app.client).deliver('daily_reminder', messages)
+
+            metrics.set_gauge('reminders.daily.recipients', stats.recipients)
+            metrics.set_gauge('reminders.daily.skipped', stats.skipped)
+            metrics.set_gauge('reminders.daily.skipped_ordered', stats.skipped_ordered)
+            metrics.observe('reminders.daily.query_ms', stats.query_seconds * 1000)
+            logger.info(f"Daily reminder recipients: {stats.as_dict()}")
 
         except Exception as e:
             logger.error(f"Failed to send daily reminders: {str(e)}")
@@ -284,14 +290,16 @@ class OrderHandler:
             name, order = parts
 
             with db_session() as session:
+                # Bestellung schon beim Speichern prüfen und kanonisch ablegen
+                items = parse_items(order, session)
                 service = SavedOrderService(session)
-                saved = service.save_order(command['user_id'], name, order)
-                session.commit()
+                saved = service.save_order(command['user_id'], name, format_items(items))
+                saved_name = saved.name
 
-                self._send_message(
-                    command['user_id'],
-                    text=f"✅ Bestellung '{saved.name}' wurde gespeichert"
-                )
+            self._send_message(
+                command['user_id'],
+                text=f"✅ Bestellung '{saved_name}' wurde gespeichert"
+            )
 
         except Exception as e:
             logger.error(f"Save order error: {str(e)}")
@@ -302,171 +310,50 @@ class OrderHandler:
         Zeigt alle gespeicherten Bestellvorlagen des Users an.
         """
         try:
-            with db_session() as session:
+            with db_session(readonly=True) as session:
                 service = SavedOrderService(session)
-                saved_orders = service.list_saved_orders(user_id)
-
-                if not saved_orders:
-                    self._send_message(user_id, "Keine gespeicherten Bestellungen gefunden")
-                    return
-
                 # Format: "- Name: Bestellung"
-                order_list = "\n".join([
+                order_lines = [
                     f"- *{order.name}*: {order.order_string}"
-                    for order in saved_orders
-                ])
+                    for order in service.list_saved_orders(user_id)
+                ]
 
-                self._send_message(
-                    user_id,
-                    text=f"📋 Gespeicherte Bestellungen:\n{order_list}"
-                )
+            if not order_lines:
+                self._send_message(user_id, "Keine gespeicherten Bestellungen gefunden")
+                return
+
+            order_list = "\n".join(order_lines)
+            self._send_message(
+                user_id,
+                text=f"📋 Gespeicherte Bestellungen:\n{order_list}"
+            )
 
         except Exception as e:
             logger.error(f"List saved orders error: {str(e)}")
             self._send_message(user_id, f"Fehler: {str(e)}")
 
-    def _parse_remove_command(self, command_text: str) -> List[Dict[str, Any]]:
-        """
-        Parst den Remove-Command und normalisiert die Produktnamen.
-        Erwartet das Format: 'remove [produkt] [anzahl], ...'
-        Gibt eine Liste von Dicts mit Produktnamen und Mengen zurück.
-        """
-        if not command_text.startswith('remove '):
-            raise OrderError("Ungültiges Format. Verwende: /order remove [produkt] [anzahl], ...")
-
-        # Entferne das "remove " am Anfang
-        items_text = command_text[7:].strip()
-        if not items_text:
-            raise OrderError("Keine Produkte angegeben")
-
-        items = []
-        parts = items_text.split(',')
-
-        for part in parts:
-            item_parts = part.strip().split()
-            if len(item_parts) < 2:
-                raise OrderError(f"Ungültiges Format bei: {part}. Verwende: [produkt] [anzahl]")
-
-            try:
-                # Extrahiere Menge als letztes Element
-                quantity = int(item_parts[-1])
-                if quantity <= 0:
-                    raise OrderError(f"Ungültige Menge für {' '.join(item_parts[:-1])}: {quantity}")
-
-                # Produktname ist alles davor
-                product_name = ' '.join(item_parts[:-1])
-
-                items.append({
-                    'name': product_name.title(),  # Normalisiere Groß-/Kleinschreibung
-                    'quantity': quantity
-                })
-            except ValueError:
-                raise OrderError(f"Ungültige Menge bei: {part}")
-
-        return items
-
     def _handle_remove_order(self, command: Dict[str, Any]) -> None:
         """
         Verarbeitet das Entfernen von Produkten aus der Bestellung.
         Zeigt eine Vorschau und setzt einen Timeout für die Bestätigung.
         """
         try:
-            if not command.get('text', '').startswith('remove '):
-                raise OrderError("Ungültiges Format. Verwende: /order remove [produkt] [anzahl]")
-
-            items = self._parse_remove_command(command['text'])
+            items_text = strip_sub_command(command.get('text', ''), 'remove')
             user_id = command['user_id']
 
+            period = get_current_period()
             with db_session() as session:
-                now = datetime.now()
-                current_weekday = now.weekday()
-                days_since_wednesday = (current_weekday - 2) % 7
-                last_wednesday = now - timedelta(days=days_since_wednesday)
-                period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-
-                if current_weekday == 2 and now.hour < 10:
-                    period_start = period_start - timedelta(days=7)
-
-                period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
+                items = parse_items(items_text, session)
 
-                # Aktuelle Bestellung finden
+                # Vorschau aus den vorberechneten Wochensummen berechnen
                 service = OrderService(session)
-                order = service.get_current_order(user_id, period_start, period_end)
-                session.refresh(order)
-
-                # Erst die aktuelle Gesamtbestellung berechnen
-                preview_items = {}
-                orders = session.query(Order).filter(
-                    Order.user_id == order.user_id,
-                    Order.order_date.between(period_start, period_end)
-                ).all()
-
-                for current_order in orders:
-                    for item in current_order.items:
-                        name = item.product.name
-                        if name in preview_items:
-                            preview_items[name] += item.quantity
-                        else:
-                            preview_items[name] = item.quantity
-
-                # Dann die zu entfernenden Items abziehen
-                for item in items:
-                    name = item['name']
-                    if name in preview_items:
-                        if preview_items[name] < item['quantity']:
-                            raise OrderError(f"Nicht genügend {name} zum Entfernen vorhanden")
-                        preview_items[name] -= item['quantity']
-                        if preview_items[name] <= 0:
-                            del preview_items[name]
+                items, preview_items = service.remove_items_preview(user_id, items)
 
                 # Vorschau-Blocks erstellen
-                blocks = create_remove_preview_blocks(order, items, preview_items, period_start, period_end)
-
-                # Metadaten vorbereiten
-                metadata = {
-                    "type": "remove_order",
-                    "data": {
-                        "items": items,
-                        "user_id": user_id
-                    }
-                }
-
-                # Nachricht mit Timer senden
-                result = self.slack_app.client.chat_postMessage(
-                    channel=user_id,
-                    blocks=blocks,
-                    text="Bestellung ändern?",
-                    metadata=metadata  # Metadaten direkt als Dictionary übergeben
-                )
+                blocks = create_remove_preview_blocks(user_id, items, preview_items, period.start, period.end)
 
-                # Timer für das Aktualisieren der Nachricht nach 30 Sekunden
-                def timeout_callback():
-                    try:
-                        # Buttons entfernen und Timeout-Nachricht hinzufügen
-                        blocks_timeout = blocks[:-2]  # Entferne Timer-Info und Action-Block
-                        blocks_timeout.append({
-                            "type": "context",
-                            "elements": [
-                                {
-                                    "type": "mrkdwn",
-                                    "text": "⏰ Zeitüberschreitung - Der Vorgang wurde automatisch abgebrochen. Die Bestellung bleibt unverändert."
-                            }
-                            ]
-                        })
-
-                        # Nachricht aktualisieren
-                        self.slack_app.client.chat_update(
-                            channel=result['channel'],
-                            ts=result['ts'],
-                            blocks=blocks_timeout,
-                            text="Vorgang abgebrochen (Zeitüberschreitung)"
-                        )
-                    except Exception as e:
-                        logger.error(f"Error handling timeout: {str(e)}")
-
-                # Timer starten
-                timer = Timer(30.0, timeout_callback)
-                timer.start()
+            # Vorschau erst nach dem Commit des Requests senden (ohne gehaltene DB-Verbindung)
+            call_after_commit(lambda: self._post_remove_preview(user_id, items, blocks))
 
         except OrderError as e:
             logger.error(f"Remove order error: {str(e)}")
@@ -475,21 +362,83 @@ class OrderHandler:
             logger.error(f"Unexpected error in handle_remove_order: {str(e)}")
             self._send_message(command['user_id'], "Ein unerwarteter Fehler ist aufgetreten")
 
+    def _post_remove_preview(self, user_id: str, items: List[Dict[str, Any]], blocks: List[Dict]) -> None:
+        """
+        Sendet die Vorschau für /order remove und plant den Timeout für die Bestätigung ein.
+        """
+        try:
+            # Metadaten vorbereiten
+            metadata = {
+                "type": "remove_order",
+                "data": {
+                    "items": items,
+                    "user_id": user_id
+                }
+            }
+
+            # Nachricht mit Timer senden
+            result = self.slack_app.client.chat_postMessage(
+                channel=user_id,
+                blocks=blocks,
+                text="Bestellung ändern?",
+                metadata=metadata  # Metadaten direkt als Dictionary übergeben
+            )
+
+            # Timeout im gemeinsamen Scheduler einplanen; Bestätigen/Abbrechen am selben Worker entfernt ihn
+            # wieder, an anderen Workern verhindert der gemeinsame dedup_key das veraltete Update
+            timeout_scheduler.schedule(
+                (result['channel'], result['ts']),
+                REMOVE_PREVIEW_TIMEOUT,
+                lambda: self._expire_remove_preview(result['channel'], result['ts'], blocks)
+            )
+        except Exception as e:
+            logger.error(f"Error sending remove preview: {str(e)}")
+
+    def _expire_remove_preview(self, channel: str, ts: str, blocks: List[Dict[str, Any]]) -> bool:
+        """
+        Schließt eine /order remove Vorschau nach Ablauf von REMOVE_PREVIEW_TIMEOUT ab.
+        Das chat_update läuft über die Outbox mit remove_preview_key(); wurde die Vorschau
+        schon bestätigt oder abgebrochen (egal an welchem Worker), entfällt es.
+        Rückgabe: True, wenn die Zeitüberschreitung eingetragen wurde
+        """
+        try:
+            # Buttons entfernen und Timeout-Nachricht hinzufügen
+            blocks_timeout = blocks[:-2]  # Entferne Timer-Info und Action-Block
+            blocks_timeout.append({
+                "type": "context",
+                "elements": [
+                    {
+                        "type": "mrkdwn",
+                        "text": "⏰ Zeitüberschreitung - Der Vorgang wurde automatisch abgebrochen. Die Bestellung bleibt unverändert."
+                    }
+                ]
+            })
+            with db_session() as session:
+                expired = OutboxService(session).enqueue(
+                    'chat_update', channel,
+                    dedup_key=remove_preview_key(channel, ts),
+                    ts=ts,
+                    blocks=blocks_timeout,
+                    text="Vorgang abgebrochen (Zeitüberschreitung)"
+                )
+            return expired is not None
+        except Exception as e:
+            logger.error(f"Error handling timeout: {str(e)}")
+            return False
+
     def _handle_product_list(self, user_id: str) -> None:
         """
         Zeigt eine Liste aller aktiven Produkte an.
         """
         try:
             with db_session() as session:
-                # ProductService verwenden um aktive Produkte zu holen
+                # ProductService verwenden um aktive Produkte zu holen (losgelöste CatalogProducts)
                 service = ProductService(session)
                 products = service.get_active_products()
 
-                # Blocks mit den Produkten erstellen
-                blocks = create_product_list_blocks(products)
-
-                # Nachricht senden
-                self._send_message(user_id, blocks=blocks)
+            # Blocks mit den Produkten erstellen und nach dem Schließen der Session senden
+            blocks = create_product_list_blocks(products)
+            self._send_message(user_id, blocks=blocks)
 
         except Exception as e:
             logger.error(f"Error listing products: {str(e)}")
@@ -506,7 +455,8 @@ class OrderHandler:
 
         logger.info("Sending weekly order summary")
         try:
-            with db_session() as session:
+            # Reiner Lesezugriff, läuft bei konfigurierten Replicas nicht gegen die Primärdatenbank
+            with db_session(readonly=True) as session:
                 service = OrderService(session)
                 users, summary = service.send_weekly_summary()
 
@@ -514,35 +464,27 @@ class OrderHandler:
                     logger.info("No orders to send or no users to receive summary")
                     return
 
-                # Zeitraum für die Überschrift bestimmen
-                now = datetime.now()
-                days_since_wednesday = (now.weekday() - 2) % 7
-                last_wednesday = now - timedelta(days=days_since_wednesday)
-                period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-                period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
-
-                # --- NEU: Namen der Besteller ermitteln ---
-                # Alle User, die in der Woche bestellt haben
-                user_ids_with_orders = set()
-                orders = session.query(Order).filter(Order.order_date.between(period_start, period_end)).all()
-                for order in orders:
-                    if order.user and order.user.name:
-                        user_ids_with_orders.add(order.user.name)
-                user_names = sorted(user_ids_with_orders)
-                # ---
-
-                # Blocks erstellen und an alle berechtigten Benutzer senden
-                blocks = create_weekly_summary_blocks(summary, period_start, period_end, user_names)
-
-                for user in users:
-                    try:
-                        self.slack_app.client.chat_postMessage(
-                            channel=user.slack_id,
-                            text="Wochenbestellung",
-                            blocks=blocks
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to send weekly summary to user {user.slack_id}: {str(e)}")
+                # Zeitraum für die Überschrift bestimmen (inkl. Korrektur "Mittwoch vor Stichzeit")
+                period = get_current_period()
+
+                # Namen der Besteller direkt aus der Zusammenfassung ermitteln
+                user_names = sorted({
+                    user['name'] for item in summary for user in item['users']
+                })
+
+                # Blocks erstellen; versendet wird nach dem Schließen der Session
+                blocks = create_weekly_summary_blocks(summary, period.start, period.end, user_names)
+                recipients = [user.slack_id for user in users]
+
+            messages = (
+                OutboundMessage('chat_postMessage', {
+                    'channel': slack_id,
+                    'text': "Wochenbestellung",
+                    'blocks': blocks
+                })
+                for slack_id in recipients
+            )
+            SlackDelivery(self.slack_app.client).deliver('weekly_summary', messages)
 
         except Exception as e:
             logger.error(f"Failed to send weekly summaries: {str(e)}")
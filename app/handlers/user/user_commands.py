@@ -4,9 +4,10 @@
 
 from typing import Dict, Any, List
 import logging
-from app.utils.db.database import db_session
+from app.utils.db.database import call_after_commit, db_session
 from app.utils.logging.log_config import setup_logger
 from app.core.user_service import UserService
+from app.core.home_view_cache import home_view_cache
 from app.utils.constants.error_types import ValidationError
 from app.utils.message_blocks.messages import create_name_blocks, create_registration_blocks, create_user_help_blocks
 
@@ -80,21 +81,23 @@ class UserHandler:
             with db_session() as session:
                 service = UserService(session)
                 user = service.register_user(user_id, name)
-                session.commit()
-
-                # Verbesserte Bestätigungsnachricht statt Registrierungsaufforderung
-                blocks = [
-                    {
-                        "type": "header",
-                        "text": {"type": "plain_text", "text": "✅ Registrierung erfolgreich"}
-                    },
-                    {"type": "divider"},
-                    {
-                        "type": "section",
-                        "text": {"type": "mrkdwn", "text": f"Willkommen, *{user.name}*! Du bist jetzt registriert."}
-                    }
-                ]
-                self._send_message(user_id, blocks=blocks)
+                user_name = user.name
+
+            # Verbesserte Bestätigungsnachricht statt Registrierungsaufforderung
+            # (wird erst nach dem Schließen der Session gesendet)
+            blocks = [
+                {
+                    "type": "header",
+                    "text": {"type": "plain_text", "text": "✅ Registrierung erfolgreich"}
+                },
+                {"type": "divider"},
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": f"Willkommen, *{user_name}*! Du bist jetzt registriert."}
+                }
+            ]
+            self._send_message(user_id, blocks=blocks)
+            self._refresh_home_view(user_id)
 
         except ValidationError as e:
             self._send_message(command['user_id'], f"❌ Registrierungsfehler: {str(e)}")
@@ -126,12 +129,12 @@ class UserHandler:
             with db_session() as session:
                 service = UserService(session)
                 old_name = service.get_user_name(user_id)
-                user = service.update_user_name(user_id, new_name)
-                session.commit()
+                service.update_user_name(user_id, new_name)
 
-                # Verwende Message-Blocks für die Bestätigung
-                blocks = create_name_blocks(old_name, new_name)
-                self._send_message(user_id, blocks=blocks)
+            # Verwende Message-Blocks für die Bestätigung (nach dem Schließen der Session)
+            blocks = create_name_blocks(old_name, new_name)
+            self._send_message(user_id, blocks=blocks)
+            self._refresh_home_view(user_id)
 
         except ValidationError as e:
             self._send_message(command['user_id'], f"❌ Fehler: {str(e)}")
@@ -147,6 +150,11 @@ class UserHandler:
         blocks = create_user_help_blocks()
         self._send_message(user_id, blocks=blocks)
 
+    def _refresh_home_view(self, user_id: str) -> None:
+        """Veröffentlicht die Home-View nach einer Änderung am User im Hintergrund neu."""
+        if self.slack_app:
+            home_view_cache.refresh_async(self.slack_app.client, user_id)
+
     def _send_message(self, user_id: str, text: str = None, blocks: List = None) -> None:
         """
         Sendet eine Nachricht an einen Benutzer (User).
@@ -175,11 +183,19 @@ class UserHandler:
                     fallback_text = blocks[0]["text"]["text"]
             if not fallback_text:
                 fallback_text = "Neue Nachricht vom BrotBot"
-
-            self.slack_app.client.chat_postMessage(
-                channel=user_id,
-                text=fallback_text,
-                blocks=blocks
-            )
         except Exception as e:
-            logger.error(f"Failed to send message to {user_id}: {str(e)}")
\ No newline at end of file
+            logger.error(f"Failed to send message to {user_id}: {str(e)}")
+            return
+
+        def post():
+            try:
+                self.slack_app.client.chat_postMessage(
+                    channel=user_id,
+                    text=fallback_text,
+                    blocks=blocks
+                )
+            except Exception as e:
+                logger.error(f"Failed to send message to {user_id}: {str(e)}")
+
+        # Erst nach dem Commit des Requests senden (ohne gehaltene DB-Verbindung)
+        call_after_commit(post)
@@ -1,3 +1,3 @@
-from app.models.data_models import Base, User, Product, Order, OrderItem, Reminder, SavedOrder
+from app.models.data_models import Base, User, Product, Order, OrderItem, Reminder, SavedOrder, WeeklyTotal, SchedulerLease, JobRun, ProcessedRequest, OutboxMessage
 
-__all__ = ['Base', 'User', 'Product', 'Order', 'OrderItem', 'Reminder', 'SavedOrder']
\ No newline at end of file
+__all__ = ['Base', 'User', 'Product', 'Order', 'OrderItem', 'Reminder', 'SavedOrder', 'WeeklyTotal', 'SchedulerLease', 'JobRun', 'ProcessedRequest', 'OutboxMessage']
\ No newline at end of file
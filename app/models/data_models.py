@@ -2,7 +2,7 @@
 # app/models/data_models.py
 #==========================
 
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Time
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Time, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -147,4 +147,131 @@ class SavedOrder(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
 
-    user = relationship("User", back_populates="saved_orders")
\ No newline at end of file
+    user = relationship("User", back_populates="saved_orders")
+
+class WeeklyTotal(Base):
+    """
+    Vorberechnete Summen pro Bestellwoche, User und Produkt.
+    Wird von OrderService.add_order und remove_items in derselben Transaktion gepflegt,
+    damit Wochenübersicht, Home-View und Entfernen-Vorschau nicht alle Orders und Items
+    der Woche neu aufsummieren müssen. Kann jederzeit aus den Rohdaten neu aufgebaut werden.
+    Attribute:
+        - period_start: Beginn der Bestellwoche (siehe app/core/order_period.py)
+        - user_id: Fremdschlüssel zu User
+        - product_id: Fremdschlüssel zu Product
+        - quantity: Gesamtmenge des Users für dieses Produkt in der Woche
+    """
+    __tablename__ = "weekly_totals"
+    period_start = Column(DateTime, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.product_id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    user = relationship("User")
+    product = relationship("Product")
+
+    __table_args__ = (
+        Index("idx_weekly_totals_user", "user_id", "period_start"),
+    )
+
+class SchedulerLease(Base):
+    """
+    Lease für die Leader-Wahl des Schedulers.
+    Nur der Prozess, der die Lease hält, führt die Cron-Jobs aus. Der Leader verlängert sie
+    regelmäßig; läuft sie ab (Prozess beendet oder hängt), übernimmt ein anderer Prozess.
+    Attribute:
+        - name: Name der Lease (z.B. 'scheduler')
+        - holder: Kennung des haltenden Prozesses (Host:PID:Zufall)
+        - acquired_at: Zeitpunkt der Übernahme durch den aktuellen Halter
+        - expires_at: Ablaufzeitpunkt der Lease
+    """
+    __tablename__ = "scheduler_leases"
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(100), nullable=False)
+    acquired_at = Column(DateTime, nullable=False, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False)
+
+class JobRun(Base):
+    """
+    Protokoll der Scheduler-Läufe (ein Eintrag pro Ausführung eines Cron-Jobs).
+    Attribute:
+        - run_id: Primärschlüssel
+        - job_name: Name des Jobs (z.B. 'daily_reminder')
+        - holder: Prozess, der den Job ausgeführt hat
+        - started_at / finished_at: Start und Ende der Ausführung
+        - duration_ms: Laufzeit in Millisekunden
+        - outcome: 'running', 'success' oder 'failed'
+        - error: Fehlermeldung bei outcome 'failed'
+    """
+    __tablename__ = "job_runs"
+    run_id = Column(Integer, primary_key=True, autoincrement=True)
+    job_name = Column(String(50), nullable=False)
+    holder = Column(String(100), nullable=False)
+    started_at = Column(DateTime, nullable=False, default=datetime.now)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    outcome = Column(String(20), nullable=False, default='running')
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("idx_job_runs_job", "job_name", "started_at"),
+    )
+
+class ProcessedRequest(Base):
+    """
+    Bereits angenommene Slack-Requests (geteilter Dedup-Speicher aller Worker).
+    Slack wiederholt langsam beantwortete Requests (Header X-Slack-Retry-Num); Wiederholungen
+    mit bereits vorhandenem Schlüssel werden nur bestätigt und nicht erneut verarbeitet.
+    Attribute:
+        - request_key: Schlüssel des Requests (event_id, trigger_id oder Hash des Bodys)
+        - received_at: Zeitpunkt der ersten Annahme (abgelaufene Einträge werden gelöscht)
+    """
+    __tablename__ = "processed_requests"
+    request_key = Column(String(128), primary_key=True)
+    received_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        Index("idx_processed_requests_received", "received_at"),
+    )
+
+class OutboxMessage(Base):
+    """
+    Transaktionale Outbox für Slack-Nachrichten.
+    Bestätigungen werden in derselben Transaktion wie die Änderung (z.B. Bestellung) geschrieben
+    und vom OutboxDispatcher im Hintergrund zugestellt (mindestens einmal, pro Channel in Reihenfolge).
+    Attribute:
+        - message_id: Primärschlüssel (bestimmt die Reihenfolge pro Channel)
+        - channel: Ziel-Channel bzw. Slack-ID des Users
+        - method: WebClient-Methode (z.B. 'chat_postMessage', 'chat_update')
+        - payload: Weitere Argumente des Aufrufs als JSON
+        - dedup_key: Optionaler Schlüssel; dieselbe Nachricht wird nur einmal eingetragen
+        - status: 'pending', 'sent', 'failed' oder 'superseded' (durch ein neueres chat_update ersetzt)
+        - attempts: Anzahl der Zustellversuche
+        - available_at: Frühester Zeitpunkt des nächsten Versuchs (Backoff)
+        - created_at / sent_at: Zeitpunkt des Eintrags bzw. der Zustellung
+        - last_error: Letzter Slack-Fehler
+        - kind: Optionale Art der Nachricht (z.B. 'order_confirmation') zum Zusammenfassen
+        - update_of: Bei chat_update: message_id der ursprünglichen Nachricht, deren ts beim Versand eingesetzt wird
+        - sent_ts: Slack-ts der zugestellten Nachricht (nur bei gesetztem kind)
+        - sent_channel: Channel aus der Slack-Antwort (bei DMs die D…-ID), nötig für chat_update
+    """
+    __tablename__ = "outbox"
+    message_id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String(50), nullable=False)
+    method = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)
+    dedup_key = Column(String(128), nullable=True, unique=True)
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.now)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    kind = Column(String(50), nullable=True)
+    update_of = Column(Integer, ForeignKey("outbox.message_id", ondelete="SET NULL"), nullable=True)
+    sent_ts = Column(String(32), nullable=True)
+    sent_channel = Column(String(50), nullable=True)
+
+    __table_args__ = (
+        Index("idx_outbox_status", "status", "message_id"),
+        Index("idx_outbox_channel", "channel", "kind", "message_id"),
+    )
@@ -2,38 +2,192 @@
 # app/scheduled_jobs.py
 #==========================
 
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from app.core.order_period import get_current_period
+from app.core.reminder_engine import reminder_engine
+from app.core.weekly_totals_service import WeeklyTotalsService
 from app.handlers.order.order_commands import OrderHandler
+from app.models import JobRun
+from app.utils.db.database import db_session, engine, track_queries
+from app.utils.metrics.metrics import metrics
+from app.utils.slack.outbox import outbox_dispatcher
+from app.utils.workers.leader_election import LeaderElection
 from app.slack_bot_init import app as slack_app
 from config.app_config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+_order_handler: Optional[OrderHandler] = None
+_election: Optional[LeaderElection] = None
+_scheduler: Optional[BackgroundScheduler] = None
+_scheduler_pid: Optional[int] = None
+_scheduler_lock = threading.Lock()
+
+
+def _get_order_handler() -> OrderHandler:
+    global _order_handler
+    if _order_handler is None:
+        _order_handler = OrderHandler(slack_app=slack_app)
+    return _order_handler
+
+
+def _run_job(name: str, job: Callable[[], None], record: bool = True) -> None:
+    """
+    Führt einen Cron-Job aus, sofern dieser Prozess (noch) Leader ist.
+    - Ordnet die SQL-Statements dem Job zu (z.B. job.daily_reminder)
+    - Protokolliert jeden Lauf mit Dauer und Ergebnis in der Tabelle job_runs
+      (record=False für minütliche Jobs, dort nur Metriken)
+    """
+    if _election is None or not _election.is_leader():
+        metrics.increment(f"jobs.{name}.skipped")
+        logger.warning(f"Job {name} skipped: not the scheduler leader")
+        return
+
+    run_id = None
+    if record:
+        with db_session() as session:
+            run = JobRun(job_name=name, holder=_election.holder, started_at=datetime.now())
+            session.add(run)
+            session.flush()
+            run_id = run.run_id
+
+    started = time.monotonic()
+    outcome, error = 'success', None
+    try:
+        with track_queries(f"job.{name}"):
+            job()
+    except Exception as e:
+        outcome, error = 'failed', str(e)
+        logger.error(f"Job {name} failed: {error}")
+    duration_ms = int((time.monotonic() - started) * 1000)
+    metrics.observe(f"jobs.{name}.duration_ms", duration_ms)
+    metrics.increment(f"jobs.{name}.{outcome}")
+    if run_id is None:
+        return
+
+    with db_session() as session:
+        run = session.get(JobRun, run_id)
+        run.finished_at = datetime.now()
+        run.duration_ms = duration_ms
+        run.outcome = outcome
+        run.error = error
+
+
+def run_daily_reminder() -> None:
+    """Cron-Job: tägliche Erinnerung (wird über den Job-Store per Name referenziert)."""
+    _run_job('daily_reminder', _get_order_handler().send_daily_reminder)
+
+
+def run_weekly_summary() -> None:
+    """Cron-Job: wöchentliche Bestellzusammenfassung."""
+    _run_job('weekly_summary', _get_order_handler().send_weekly_summary)
+
+
+def run_reminders() -> None:
+    """Cron-Job (minütlich): fällige persönliche Erinnerungen aus der Tabelle reminders."""
+    _run_job('reminders', lambda: reminder_engine.tick(slack_app.client), record=False)
+
+
+def _job_definitions():
+    """Job-ID, Funktion (als Textreferenz für den persistenten Job-Store) und Trigger."""
+    return [
+        ('daily_reminder', 'app.scheduled_jobs:run_daily_reminder',
+         CronTrigger(hour=settings.REMINDER_HOUR, minute=settings.REMINDER_MINUTE)),
+        ('weekly_summary', 'app.scheduled_jobs:run_weekly_summary',
+         CronTrigger(day_of_week=settings.WEEKLY_SUMMARY_DAY, hour=settings.WEEKLY_SUMMARY_HOUR,
+                     minute=settings.WEEKLY_SUMMARY_MINUTE)),
+        ('reminders', 'app.scheduled_jobs:run_reminders', CronTrigger(minute='*')),
+    ]
+
+
+def _backfill_weekly_totals() -> None:
+    """
+    Trägt die Wochensummen der aktuellen Woche nach, wenn weekly_totals dafür noch leer ist
+    (z.B. direkt nach dem Anlegen der Tabelle mit schon vorhandenen Bestellungen).
+    """
+    try:
+        with db_session() as session:
+            rows = WeeklyTotalsService(session).backfill(get_current_period())
+        if rows:
+            logger.info(f"Weekly totals backfilled for the current period ({rows} rows)")
+    except Exception as e:
+        logger.error(f"Weekly totals backfill failed: {str(e)}")
+
+
+def _sync_jobs(scheduler: BackgroundScheduler) -> None:
+    """
+    Legt fehlende Jobs im Job-Store an und passt geänderte Trigger an.
+    Bestehende Jobs behalten ihren nächsten Ausführungszeitpunkt, damit ein Lauf,
+    der während eines Leader-Wechsels fällig wurde, noch nachgeholt wird.
+    """
+    for job_id, func, trigger in _job_definitions():
+        job = scheduler.get_job(job_id)
+        if job is None:
+            scheduler.add_job(func, trigger, id=job_id, replace_existing=True)
+        elif str(job.trigger) != str(trigger):
+            scheduler.reschedule_job(job_id, trigger=trigger)
+
 
 def init_scheduler() -> BackgroundScheduler:
-    """Initialisiert und startet den Scheduler"""
-    scheduler = BackgroundScheduler()
-
-    order_handler = OrderHandler(slack_app=slack_app)
-
-    # Tägliche Erinnerung einrichten
-    scheduler.add_job(
-        order_handler.send_daily_reminder,
-        'cron',
-        hour=settings.REMINDER_HOUR,
-        minute=settings.REMINDER_MINUTE
-    )
-
-    # Wöchentliche Bestellzusammenfassung einrichten
-    scheduler.add_job(
-        order_handler.send_weekly_summary,
-        'cron',
-        day_of_week=settings.WEEKLY_SUMMARY_DAY,
-        hour=settings.WEEKLY_SUMMARY_HOUR,
-        minute=settings.WEEKLY_SUMMARY_MINUTE
-    )
-
-    scheduler.start()
-    logger.info("Scheduler started")
-    return scheduler
\ No newline at end of file
+    """
+    Initialisiert den Scheduler mit persistentem Job-Store (Tabelle apscheduler_jobs).
+    Jeder Prozess startet den Scheduler pausiert; nur der per Lease gewählte Leader
+    (siehe LeaderElection) setzt ihn fort. Stirbt der Leader, übernimmt ein anderer
+    Prozess nach Ablauf der Lease (SCHEDULER_LEASE_SECONDS).
+    Der Outbox-Dispatcher läuft in jedem Prozess mit, stellt aber nur beim Leader zu.
+    Beim Wechsel auf den Leader werden fehlende Wochensummen der aktuellen Woche nachgetragen.
+    Wird beim Start jedes Worker-Prozesses aufgerufen (create_app) und ist
+    idempotent; nach einem fork() (z.B. gunicorn --preload) startet der Kindprozess eigene Threads.
+    """
+    global _election, _scheduler, _scheduler_pid
+    with _scheduler_lock:
+        if _scheduler is not None and _scheduler_pid == os.getpid():
+            return _scheduler
+
+        scheduler = BackgroundScheduler(
+            jobstores={'default': SQLAlchemyJobStore(engine=engine, tablename='apscheduler_jobs')},
+            job_defaults={
+                'coalesce': True,                                        # verpasste Läufe nur einmal nachholen
+                'max_instances': 1,
+                'misfire_grace_time': settings.SCHEDULER_MISFIRE_GRACE_SECONDS
+            }
+        )
+        scheduler.start(paused=True)
+
+        def on_elected():
+            _backfill_weekly_totals()
+            _sync_jobs(scheduler)
+            scheduler.resume()
+
+        _election = LeaderElection(
+            'scheduler',
+            lease_seconds=settings.SCHEDULER_LEASE_SECONDS,
+            renew_seconds=settings.SCHEDULER_RENEW_SECONDS,
+            on_elected=on_elected,
+            on_demoted=scheduler.pause
+        )
+        _election.start()
+        outbox_dispatcher.start(slack_app.client, should_run=_election.is_leader)
+        _scheduler, _scheduler_pid = scheduler, os.getpid()
+        # Beim Beenden die Lease freigeben, damit ein Standby sofort übernimmt
+        atexit.register(_shutdown, _election, _scheduler_pid)
+
+    logger.info(f"Scheduler started (standby until elected, holder {_election.holder})")
+    return scheduler
+
+
+def _shutdown(election: LeaderElection, pid: int) -> None:
+    # Geerbte atexit-Handler eines Kindprozesses dürfen die Lease des Elternprozesses nicht freigeben
+    if pid != os.getpid():
+        return
+    election.stop()
+    outbox_dispatcher.stop()
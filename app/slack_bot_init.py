@@ -2,28 +2,40 @@
 # app/slack_bot_init.py
 # ==========================
 
-from slack_bolt import App
+from slack_bolt import App, BoltResponse
 from slack_bolt.adapter.flask import SlackRequestHandler
-from datetime import datetime, timedelta
 from config.app_config import settings
-from app.handlers.order.order_commands import OrderHandler
+from app.handlers.order.order_commands import OrderHandler, remove_preview_key
 from app.handlers.user.user_commands import UserHandler
 from app.handlers.admin.admin_commands import AdminHandler
 from app.utils.logging.log_config import setup_logger
-from app.utils.db.database import db_session
-from app.utils.message_blocks.home_view import create_home_view
-from app.utils.message_blocks.messages import create_user_help_blocks, create_feedback_message_blocks
+from app.utils.db.database import call_after_commit, db_session, request_scope, track_queries
+from app.utils.message_blocks.messages import create_user_help_blocks, create_feedback_message_blocks, create_registration_blocks
 from app.utils.message_blocks.modals import create_feedback_modal
 from app.core.user_service import UserService
-from app.models import User, Order
 from app.core.order_service import OrderService
+from app.core.outbox_service import OutboxService
+from app.core.home_view_cache import home_view_cache
+from app.core.user_directory import user_directory
+from app.utils.workers.command_pipeline import command_pipeline
+from app.utils.workers.timeout_scheduler import timeout_scheduler
+from app.utils.slack.clients import RateLimitedWebClient
+from app.utils.slack.rate_limits import rate_limiter
+from app.utils.slack.request_dedup import request_dedup, request_key
+from app.utils.metrics.metrics import metrics
+from app.utils.constants.error_types import OrderError
+import functools
 import json
 
 logger = setup_logger(__name__)
 
 # Slack App initialisieren
+# Der WebClient wird explizit erzeugt, damit die API-URL konfigurierbar ist (z.B. lokaler Fake-Server).
+# Direkte Aufrufe laufen in der Interactive-Lane der gemeinsamen Rate-Limits (Vorrang vor dem Massenversand).
 app = App(
-    token=settings.SLACK.BOT_TOKEN,
+    client=RateLimitedWebClient(
+        token=settings.SLACK.BOT_TOKEN, base_url=settings.SLACK.API_URL, limiter=rate_limiter
+    ),
     signing_secret=settings.SLACK.SIGNING_SECRET
 )
 
@@ -32,56 +44,67 @@ order_handler = OrderHandler(slack_app=app)
 user_handler = UserHandler(slack_app=app)
 admin_handler = AdminHandler(slack_app=app)
 
+@app.middleware
+def skip_duplicate_requests(request, body, next):
+    """
+    Bestätigt wiederholt zugestellte Slack-Requests (z.B. Retries nach langsamer Antwort)
+    sofort mit 200, ohne sie erneut zu verarbeiten. Läuft nach der Signaturprüfung.
+    Nur Wiederholungen (Header X-Slack-Retry-Num) fragen dabei die Datenbank ab.
+    """
+    key = request_key(body, request.raw_body)
+    if request_dedup.claim(key, retry=bool(request.headers.get('x-slack-retry-num'))):
+        return next()
+    log_duplicate_request(key, request.headers)
+    return BoltResponse(status=200, body="")
+
+def log_duplicate_request(key: str, headers: dict) -> None:
+    """Protokolliert einen übersprungenen Request mit Retry-Nummer und -Grund aus den Slack-Headern."""
+    retry_num = (headers.get('x-slack-retry-num') or ['-'])[0]
+    retry_reason = (headers.get('x-slack-retry-reason') or ['-'])[0]
+    metrics.increment('slack.requests.duplicates')
+    logger.info(f"Skipped duplicate Slack request {key} (retry {retry_num}, reason {retry_reason})")
+
 def check_user_registered(user_id: str) -> bool:
     """Prüft, ob ein User registriert ist"""
-    with db_session() as session:
-        return session.query(User).filter_by(slack_id=user_id).first() is not None
+    return user_directory.is_registered(user_id)
+
+def unit_of_work(listener):
+    """
+    Führt einen Bolt-Listener in einem request_scope() aus: eine Session und ein Commit
+    pro Slack-Request. Bolt ruft Listener nach dem Middleware-Durchlauf asynchron in
+    seinem eigenen Thread-Pool auf, deshalb wird der Scope direkt um den Listener gelegt.
+    """
+    @functools.wraps(listener)
+    def wrapper(*args, **kwargs):
+        with request_scope(_request_user_id(kwargs)):
+            return listener(*args, **kwargs)
+    return wrapper
+
+def _request_user_id(listener_args: dict):
+    """Slack-ID des auslösenden Users aus den Listener-Argumenten (Action-Body oder Event)."""
+    body = listener_args.get('body') or {}
+    if isinstance(body.get('user'), dict):
+        return body['user'].get('id')
+    event = listener_args.get('event') or body.get('event') or {}
+    return event.get('user')
 
 # Event- und Command-Handler für Slack
 
 @app.event("app_home_opened")
+@unit_of_work
 def handle_app_home_opened(client, event, logger):
     """Handler für das Öffnen der App Home Ansicht in Slack"""
     try:
         user_id = event["user"]
-        with db_session() as session:
-            user = session.query(User).filter_by(slack_id=user_id).first()
-
-            # Wenn User nicht registriert ist, zeige Registrierungsview
-            if not user:
-                view = create_home_view()  # Ohne User-Parameter für unregistrierte Ansicht
-                client.views_publish(user_id=user_id, view=view)
-                return
-
-            # Normale Home-View für registrierte User
-            now = datetime.now()
-            current_weekday = now.weekday()
-            days_since_wednesday = (current_weekday - 2) % 7
-            last_wednesday = now - timedelta(days=days_since_wednesday)
-            period_start = last_wednesday.replace(hour=10, minute=0, second=0, microsecond=0)
-
-            if current_weekday == 2 and now.hour < 10:
-                period_start = period_start - timedelta(days=7)
-
-            period_end = period_start + timedelta(days=7) - timedelta(minutes=1)
-
-            recent_orders = (
-                session.query(Order)
-                .filter(
-                    Order.user_id == user.user_id,
-                    Order.order_date.between(period_start, period_end)
-                )
-                .order_by(Order.order_date.desc())
-                .all()
-            )
-
-            view = create_home_view(user, recent_orders)
-            client.views_publish(user_id=user_id, view=view)
+        # Gecachte View verwenden; views_publish nur, wenn sich die Blocks geändert haben
+        with track_queries('event.app_home_opened'):
+            home_view_cache.publish(client, user_id)
 
     except Exception as e:
         logger.error(f"Error publishing home view: {str(e)}")
 
 @app.action("submit_registration")
+@unit_of_work
 def handle_registration_submit(ack, body, client):
     """Handler für den Registrierungsbutton im Home-View"""
     ack()
@@ -98,63 +121,97 @@ def handle_registration_submit(ack, body, client):
 
         with db_session() as session:
             service = UserService(session)
-            user = service.register_user(user_id, input_value)
-            session.commit()
-
-            # Aktualisiere Home-View nach erfolgreicher Registrierung
-            view = create_home_view(user)
-            client.views_publish(user_id=user_id, view=view)
-
-            client.chat_postMessage(
-                channel=user_id,
+            service.register_user(user_id, input_value)
+            # Bestätigung über die Outbox (gleiche Transaktion wie die Registrierung)
+            OutboxService(session).enqueue(
+                'chat_postMessage', user_id,
+                dedup_key=f"registration:{user_id}",
                 text=f"✅ Erfolgreich registriert als {input_value}!"
             )
 
+        # Aktualisiere Home-View nach erfolgreicher Registrierung (erst nach dem Commit)
+        home_view_cache.publish(client, user_id)
+
     except Exception as e:
         logger.error(f"Error handling registration: {str(e)}")
-        client.chat_postMessage(
+        error = str(e)
+        call_after_commit(lambda: client.chat_postMessage(
             channel=body["user"]["id"],
-            text=f"❌ Fehler bei der Registrierung: {str(e)}"
-        )
+            text=f"❌ Fehler bei der Registrierung: {error}"
+        ))
+
+# Antworttexte für die Backpressure im Command-Worker-Pool
+BUSY_TEXT = "⏳ BrotBot ist gerade ausgelastet - dein Befehl wird gleich erneut versucht."
+REJECTED_TEXT = "❌ BrotBot ist gerade überlastet. Bitte versuche es in ein paar Sekunden erneut."
+
+
+def dispatch_command(ack, body, process) -> None:
+    """
+    Bestätigt einen Slash-Command sofort und übergibt die Verarbeitung an den Worker-Pool.
+    Ist der Pool ausgelastet, erhält der User direkt im ack eine "ausgelastet"-Antwort,
+    während auf einen freien Platz gewartet wird.
+    """
+    busy_acked = []
+
+    def on_busy():
+        ack(text=BUSY_TEXT)
+        busy_acked.append(True)
+
+    # SQL-Statements der Verarbeitung dem Command zuordnen (z.B. command.order)
+    name = f"command.{body.get('command', '/unknown').lstrip('/')}"
+
+    def tracked_process():
+        # Eine Session und ein Commit für Registrierungsprüfung und Command (Unit of Work)
+        with track_queries(name), request_scope(body.get('user_id')):
+            process()
+
+    accepted = command_pipeline.submit(tracked_process, on_busy=on_busy)
+    if not busy_acked:
+        ack()
+    if not accepted:
+        app.client.chat_postMessage(channel=body['user_id'], text=REJECTED_TEXT)
+
+
+def _send_registration_request(user_id: str) -> None:
+    """Fordert einen nicht registrierten User zur Registrierung auf."""
+    blocks = create_registration_blocks()
+    app.client.chat_postMessage(
+        channel=user_id,
+        blocks=blocks
+    )
 
 @app.command("/user")
 def handle_user_command(ack, body, logger):
     """Handler für den /user Command"""
-    ack()
-    if not body.get('text', '').startswith('register') and not check_user_registered(body['user_id']):
-        blocks = create_registration_blocks()
-        app.client.chat_postMessage(
-            channel=body['user_id'],
-            blocks=blocks
-        )
-        return
-    user_handler.handle_user_command(body, logger)
+    def process():
+        if not body.get('text', '').startswith('register') and not check_user_registered(body['user_id']):
+            _send_registration_request(body['user_id'])
+            return
+        user_handler.handle_user_command(body, logger)
+
+    dispatch_command(ack, body, process)
 
 @app.command("/order")
 def handle_order_command(ack, body, logger):
     """Handler für den /order Command"""
-    ack()
-    if not check_user_registered(body['user_id']):
-        blocks = create_registration_blocks()
-        app.client.chat_postMessage(
-            channel=body['user_id'],
-            blocks=blocks
-        )
-        return
-    order_handler.handle_order(body, logger)
+    def process():
+        if not check_user_registered(body['user_id']):
+            _send_registration_request(body['user_id'])
+            return
+        order_handler.handle_order(body, logger)
+
+    dispatch_command(ack, body, process)
 
 @app.command("/admin")
 def handle_admin_command(ack, body, logger):
     """Handler für den /admin Command"""
-    ack()
-    if not check_user_registered(body['user_id']):
-        blocks = create_registration_blocks()
-        app.client.chat_postMessage(
-            channel=body['user_id'],
-            blocks=blocks
-        )
-        return
-    admin_handler.handle_admin(body, logger)
+    def process():
+        if not check_user_registered(body['user_id']):
+            _send_registration_request(body['user_id'])
+            return
+        admin_handler.handle_admin(body, logger)
+
+    dispatch_command(ack, body, process)
 
 
 @app.error
@@ -174,12 +231,15 @@ handler = SlackRequestHandler(app)
 # ==========================
 
 @app.action("remove_confirm")
+@unit_of_work
 def handle_remove_confirm(ack, body, client):
     """
     Handler für den Bestätigen-Button beim Entfernen von Produkten aus der Bestellung.
     Aktualisiert die Bestellung in der Datenbank und die Slack-Nachricht.
     """
     ack()
+    # Ausstehenden Timeout der Vorschau abbrechen, damit kein veraltetes chat_update mehr folgt
+    timeout_scheduler.cancel((body["container"]["channel_id"], body["container"]["message_ts"]))
     try:
         logger.debug(f"Received action body: {json.dumps(body)}")
         if not body.get("actions") or not body["actions"][0].get("value"):
@@ -194,10 +254,6 @@ def handle_remove_confirm(ack, body, client):
             raise ValueError("Unvollständige Daten")
         blocks = body["message"]["blocks"]
         blocks = blocks[:-2]  # Entferne Timer-Info und Action-Block
-        with db_session() as session:
-            service = OrderService(session)
-            service.remove_items(user_id, items)
-            session.commit()
         blocks.append({
             "type": "context",
             "elements": [
@@ -207,18 +263,29 @@ def handle_remove_confirm(ack, body, client):
                 }
             ]
         })
-        client.chat_update(
-            channel=body["container"]["channel_id"],
-            ts=body["container"]["message_ts"],
-            blocks=blocks,
-            text="Bestellung wurde aktualisiert"
-        )
+        with db_session() as session:
+            # Nachricht über die Outbox aktualisieren (gleiche Transaktion wie das Entfernen).
+            # Der gemeinsame dedup_key schließt die Vorschau; war sie an einem anderen Worker
+            # schon abgelaufen oder abgebrochen, wird nichts entfernt.
+            confirmed = OutboxService(session).enqueue(
+                'chat_update', body["container"]["channel_id"],
+                dedup_key=remove_preview_key(body["container"]["channel_id"], body["container"]["message_ts"]),
+                ts=body["container"]["message_ts"],
+                blocks=blocks,
+                text="Bestellung wurde aktualisiert"
+            )
+            if confirmed is None:
+                raise OrderError("Die Vorschau ist bereits abgelaufen oder wurde abgebrochen")
+            service = OrderService(session)
+            service.remove_items(user_id, items)
+        home_view_cache.refresh_async(client, user_id)
     except Exception as e:
         logger.error(f"Error confirming remove: {str(e)}")
-        client.chat_postMessage(
+        error = str(e)
+        call_after_commit(lambda: client.chat_postMessage(
             channel=body["container"]["channel_id"],
-            text=f"❌ Fehler beim Aktualisieren der Bestellung: {str(e)}"
-        )
+            text=f"❌ Fehler beim Aktualisieren der Bestellung: {error}"
+        ))
 
 
 @app.action("remove_cancel")
@@ -228,6 +295,7 @@ def handle_remove_cancel(ack, body, client):
     Bricht den Vorgang ab und aktualisiert die Slack-Nachricht.
     """
     ack()
+    timeout_scheduler.cancel((body["container"]["channel_id"], body["container"]["message_ts"]))
     try:
         blocks = body["message"]["blocks"]
         blocks = blocks[:-2]  # Entferne Timer-Info und Action-Block
@@ -240,12 +308,15 @@ def handle_remove_cancel(ack, body, client):
                 }
             ]
         })
-        client.chat_update(
-            channel=body["container"]["channel_id"],
-            ts=body["container"]["message_ts"],
-            blocks=blocks,
-            text="Vorgang abgebrochen"
-        )
+        # Über die Outbox mit dem gemeinsamen dedup_key: entfällt, wenn die Vorschau schon abgeschlossen ist
+        with db_session() as session:
+            OutboxService(session).enqueue(
+                'chat_update', body["container"]["channel_id"],
+                dedup_key=remove_preview_key(body["container"]["channel_id"], body["container"]["message_ts"]),
+                ts=body["container"]["message_ts"],
+                blocks=blocks,
+                text="Vorgang abgebrochen"
+            )
     except Exception as e:
         logger.error(f"Error handling cancel: {str(e)}")
         client.chat_postMessage(
@@ -255,6 +326,7 @@ def handle_remove_cancel(ack, body, client):
 
 
 @app.action("submit_feedback")
+@unit_of_work
 def handle_feedback_submission(ack, body, client):
     """
     Handler für Feedback-Einreichungen aus der Home-View.
@@ -266,28 +338,41 @@ def handle_feedback_submission(ack, body, client):
         feedback_title = home_view_values.get("feedback_title", {}).get("feedback_title_input", {}).get("value", "")
         feedback_text = home_view_values.get("feedback_text", {}).get("feedback_text_input", {}).get("value", "")
         user_id = body["user"]["id"]
-        with db_session() as session:
-            user = session.query(User).filter_by(slack_id=user_id).first()
-            if not user:
-                raise ValueError("Benutzer nicht gefunden")
-            blocks = create_feedback_message_blocks(
-                user_name=user.name,
-                slack_name=body['user']['name'],
-                feedback_title=feedback_title,
-                feedback_text=feedback_text
-            )
-            client.chat_postMessage(
-                channel="feedback",  # Der Channel-Name oder die Channel-ID
-                text=f"Neues Feedback von {user.name} (@{body['user']['name']})\n\nÜberschrift: {feedback_title}\n\nFeedback: {feedback_text}",
-                blocks=blocks
-            )
-            client.chat_postMessage(
-                channel=user_id,
-                text="✅ Vielen Dank für dein Feedback! Es wurde erfolgreich übermittelt."
-            )
+        user = user_directory.get(user_id)
+        if not user:
+            raise ValueError("Benutzer nicht gefunden")
+        blocks = create_feedback_message_blocks(
+            user_name=user.name,
+            slack_name=body['user']['name'],
+            feedback_title=feedback_title,
+            feedback_text=feedback_text
+        )
+
+        def send_feedback():
+            try:
+                client.chat_postMessage(
+                    channel="feedback",  # Der Channel-Name oder die Channel-ID
+                    text=f"Neues Feedback von {user.name} (@{body['user']['name']})\n\nÜberschrift: {feedback_title}\n\nFeedback: {feedback_text}",
+                    blocks=blocks
+                )
+                client.chat_postMessage(
+                    channel=user_id,
+                    text="✅ Vielen Dank für dein Feedback! Es wurde erfolgreich übermittelt."
+                )
+            except Exception as e:
+                logger.error(f"Error handling feedback submission: {str(e)}")
+                _send_feedback_error(client, user_id)
+
+        # Slack-Aufrufe erst nach dem Ende des Requests (ohne gehaltene DB-Verbindung)
+        call_after_commit(send_feedback)
     except Exception as e:
         logger.error(f"Error handling feedback submission: {str(e)}")
-        client.chat_postMessage(
-            channel=body["user"]["id"],
-            text="❌ Es gab einen Fehler beim Senden des Feedbacks. Bitte versuche es später erneut."
-        )
+        call_after_commit(lambda: _send_feedback_error(client, body["user"]["id"]))
+
+
+def _send_feedback_error(client, user_id: str) -> None:
+    """Meldet dem User, dass das Feedback nicht gesendet werden konnte."""
+    client.chat_postMessage(
+        channel=user_id,
+        text="❌ Es gab einen Fehler beim Senden des Feedbacks. Bitte versuche es später erneut."
+    )
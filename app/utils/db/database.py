@@ -2,25 +2,159 @@
 # app/utils/db/database.py
 #==========================
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+from app.utils.metrics.metrics import metrics
 from config.app_config import settings
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+
+def _create_engine(url: str) -> Engine:
+    """Erstellt eine Engine mit den Pool-Einstellungen aus der Konfiguration."""
+    return create_engine(
+        url,                             # Datenbank-URL (z.B. mysql+pymysql://...)
+        echo=settings.DATABASE.ECHO,     # SQL-Statements im Log ausgeben?
+        pool_size=settings.DATABASE.POOL_SIZE,           # Größe des Connection-Pools
+        max_overflow=settings.DATABASE.MAX_OVERFLOW,     # Zusätzliche Verbindungen über pool_size hinaus
+        pool_timeout=settings.DATABASE.POOL_TIMEOUT,     # Timeout für Pool-Verbindungen
+        pool_recycle=settings.DATABASE.POOL_RECYCLE,     # Zeit bis zur Wiederverwendung einer Verbindung
+        pool_pre_ping=settings.DATABASE.POOL_PRE_PING    # Verbindung vor Nutzung prüfen
+    )
+
+
 # Die Engine ist das zentrale Objekt für die Verbindung zur Datenbank.
 # Sie wird mit den Einstellungen aus der Konfiguration erstellt.
-engine = create_engine(
-    settings.DATABASE.URL,           # Datenbank-URL (z.B. mysql+pymysql://...)
-    echo=settings.DATABASE.ECHO,     # SQL-Statements im Log ausgeben?
-    pool_size=settings.DATABASE.POOL_SIZE,           # Größe des Connection-Pools
-    max_overflow=settings.DATABASE.MAX_OVERFLOW,     # Zusätzliche Verbindungen über pool_size hinaus
-    pool_timeout=settings.DATABASE.POOL_TIMEOUT,     # Timeout für Pool-Verbindungen
-    pool_recycle=settings.DATABASE.POOL_RECYCLE,     # Zeit bis zur Wiederverwendung einer Verbindung
-    pool_pre_ping=settings.DATABASE.POOL_PRE_PING    # Verbindung vor Nutzung prüfen
-)
+engine = _create_engine(settings.DATABASE.URL)
+
+
+def _instrument_pool(target: Engine, gauge: str) -> None:
+    """
+    Misst, wie lange eine Verbindung aus dem Pool gehalten wird (Checkout bis Checkin).
+    Lange Haltezeiten deuten auf Slack-Aufrufe innerhalb eines db_session()-Blocks hin.
+    - gauge: Name der Metrik für die aktuell ausgeliehenen Verbindungen
+    """
+    @event.listens_for(target, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        metrics.increment('db.pool.checkouts')
+        metrics.set_gauge(gauge, target.pool.checkedout())
+
+    @event.listens_for(target, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        if checked_out_at is not None:
+            metrics.observe('db.pool.hold_ms', (time.perf_counter() - checked_out_at) * 1000)
+        # Das Event feuert, bevor der Pool die Verbindung zurückbucht
+        metrics.set_gauge(gauge, max(target.pool.checkedout() - 1, 0))
+
+
+_instrument_pool(engine, 'db.pool.checked_out')
+
+
+@dataclass
+class QueryStats:
+    """
+    Anzahl und Dauer der SQL-Statements eines Slack-Commands oder Jobs.
+    Wird von track_queries() angelegt und von den Engine-Hooks fortgeschrieben.
+    """
+    name: str
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+# Statistik des gerade laufenden Commands/Jobs (pro Thread bzw. Kontext)
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Merkt sich den Startzeitpunkt jedes Statements."""
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Zählt das Statement global und für den aktuellen Command/Job."""
+    elapsed = time.perf_counter() - conn.info['query_started_at'].pop()
+    metrics.increment('db.statements')
+    metrics.observe('db.statement_ms', elapsed * 1000)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    """Fehlgeschlagene Statements aus der Startzeit-Liste entfernen."""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started_at'):
+        connection.info['query_started_at'].pop()
+    metrics.increment('db.errors')
+
+
+def _instrument_statements(target: Engine) -> None:
+    """Hängt die Statement-Zählung (track_queries, db.statements) an eine Engine."""
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+_instrument_statements(engine)
+
+
+@contextmanager
+def track_queries(name: str, budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    Ordnet alle SQL-Statements im with-Block dem angegebenen Command/Job zu.
+    Am Ende werden Anzahl und DB-Zeit geloggt und als Metriken (db.<name>.statements,
+    db.<name>.db_ms) erfasst. Wird das Budget überschritten, gibt es eine Warnung.
+    Verschachtelte Aufrufe werden zusätzlich dem äußeren Command/Job zugerechnet.
+    Beispiel:
+        with track_queries('command.order', budget=10):
+            ...
+    """
+    stats = QueryStats(name=name)
+    parent = _current_stats.get()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if parent is not None:
+            parent.statements += stats.statements
+            parent.db_seconds += stats.db_seconds
+
+        db_ms = stats.db_seconds * 1000
+        metrics.observe(f"db.{name}.statements", stats.statements)
+        metrics.observe(f"db.{name}.db_ms", db_ms)
+        limit = settings.QUERY_BUDGET if budget is None else budget
+        if stats.statements > limit:
+            metrics.increment(f"db.{name}.budget_exceeded")
+            logger.warning(f"{name}: {stats.statements} SQL statements (budget {limit}), {db_ms:.1f} ms DB")
+        else:
+            logger.info(f"{name}: {stats.statements} SQL statements, {db_ms:.1f} ms DB")
+
+
+@contextmanager
+def assert_max_queries(limit: int, name: str = 'test') -> Iterator[QueryStats]:
+    """
+    Test-Hilfe: schlägt mit AssertionError fehl, wenn im with-Block mehr als limit
+    SQL-Statements ausgeführt werden.
+    Beispiel:
+        with assert_max_queries(3):
+            OrderService(session).get_weekly_summary()
+    """
+    with track_queries(name, budget=limit) as stats:
+        yield stats
+    assert stats.statements <= limit, f"{name}: {stats.statements} SQL statements, budget is {limit}"
+
 
 # SessionLocal ist eine Factory für neue Session-Objekte.
 # Jede Session repräsentiert eine einzelne, unabhängige DB-Transaktion.
@@ -30,8 +164,214 @@ SessionLocal = sessionmaker(
     autoflush=False
 )
 
+
+@dataclass
+class _Replica:
+    """Eine Read-Replica mit eigener Engine und zuletzt gemessener Replikationsverzögerung."""
+    name: str
+    engine: Engine
+    session_factory: sessionmaker
+    lag: Optional[float] = None     # None = unbekannt oder nicht erreichbar
+    checked_at: float = 0.0
+
+
+class ReplicaRouter:
+    """
+    Verteilt Lesezugriffe (db_session(readonly=True)) auf die konfigurierten Read-Replicas.
+    - Replicas werden reihum genutzt, solange ihre Replikationsverzögerung <= max_lag ist
+    - Die Verzögerung wird höchstens alle check_interval Sekunden gemessen
+      (MySQL: SHOW REPLICA STATUS, andere Datenbanken: nur Erreichbarkeit)
+    - Ist keine Replica brauchbar, wird die Primärdatenbank genutzt
+    - Read-your-writes: Hat ein User in den letzten max_lag Sekunden geschrieben,
+      lesen seine Requests ebenfalls von der Primärdatenbank
+    Ohne konfigurierte Replicas liefert der Router immer SessionLocal.
+    """
+
+    def __init__(self, urls: List[str], max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next = 0
+        self._recent_writes: Dict[str, float] = {}
+        self._replicas: List[_Replica] = []
+        for index, url in enumerate(urls):
+            replica_engine = _create_engine(url)
+            _instrument_pool(replica_engine, f'db.replica.{index}.pool.checked_out')
+            _instrument_statements(replica_engine)
+            replica = _Replica(
+                name=make_url(url).render_as_string(hide_password=True),
+                engine=replica_engine,
+                session_factory=sessionmaker(bind=replica_engine, autocommit=False, autoflush=False)
+            )
+            self._watch_disconnects(replica)
+            self._replicas.append(replica)
+
+    def note_write(self, user_id: str) -> None:
+        """Merkt sich, dass ein User gerade geschrieben hat (Lesezugriffe vorerst auf die Primärdatenbank)."""
+        if not self._replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[user_id] = now
+            if len(self._recent_writes) > 1000:
+                # Abgelaufene Einträge gelegentlich aufräumen
+                self._recent_writes = {
+                    key: written_at for key, written_at in self._recent_writes.items()
+                    if now - written_at < self.max_lag
+                }
+
+    def session_factory(self, user_id: Optional[str] = None) -> sessionmaker:
+        """
+        Wählt die Session-Factory für einen Lesezugriff.
+        - user_id: Optional der Slack-User des Requests (für read-your-writes)
+        """
+        if not self._replicas:
+            return SessionLocal
+        now = time.monotonic()
+        if user_id is not None:
+            with self._lock:
+                written_at = self._recent_writes.get(user_id)
+            if written_at is not None and now - written_at < self.max_lag:
+                metrics.increment('db.replica.sticky_primary')
+                return SessionLocal
+
+        for _ in range(len(self._replicas)):
+            with self._lock:
+                replica = self._replicas[self._next % len(self._replicas)]
+                self._next += 1
+                # Nur ein Thread misst; die anderen nutzen bis dahin den letzten Messwert
+                stale = now - replica.checked_at >= self.check_interval
+                if stale:
+                    replica.checked_at = now
+            if stale:
+                replica.lag = self._measure_lag(replica)
+            if replica.lag is not None and replica.lag <= self.max_lag:
+                metrics.increment('db.replica.reads')
+                return replica.session_factory
+
+        metrics.increment('db.replica.fallback')
+        return SessionLocal
+
+    def _measure_lag(self, replica: _Replica) -> Optional[float]:
+        """Misst die Replikationsverzögerung in Sekunden (None = nicht nutzbar)."""
+        try:
+            with replica.engine.connect() as connection:
+                if connection.dialect.name != 'mysql':
+                    connection.exec_driver_sql("SELECT 1")
+                    return 0.0
+                try:
+                    status = connection.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+                except Exception:
+                    # MySQL < 8.0.22 kennt nur die alte Syntax
+                    status = connection.exec_driver_sql("SHOW SLAVE STATUS").mappings().first()
+                if status is None:
+                    # Kein Replikations-Status (z.B. lokale Test-Datenbank): wie aktuell behandeln
+                    return 0.0
+                lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+                if lag is None:
+                    logger.warning(f"Replica {replica.name}: replication not running")
+                    return None
+                metrics.set_gauge(f'db.replica.{self._replicas.index(replica)}.lag_seconds', float(lag))
+                return float(lag)
+        except Exception as e:
+            logger.warning(f"Replica {replica.name} unavailable: {str(e)}")
+            return None
+
+    def _watch_disconnects(self, replica: _Replica) -> None:
+        """Bei Verbindungsabbrüchen die Replica bis zur nächsten Messung nicht mehr nutzen."""
+        @event.listens_for(replica.engine, "handle_error")
+        def _on_error(exception_context):
+            if exception_context.is_disconnect:
+                replica.lag = None
+                replica.checked_at = time.monotonic()
+
+
+# Globaler Router für Lesezugriffe (ohne DATABASE_REPLICA_URLS immer die Primärdatenbank)
+replica_router = ReplicaRouter(
+    settings.DATABASE.REPLICA_URLS,
+    max_lag=settings.DATABASE.REPLICA_MAX_LAG,
+    check_interval=settings.DATABASE.REPLICA_CHECK_INTERVAL
+)
+
+@dataclass
+class _RequestScope:
+    """Gemeinsame Session und aufgeschobene Aktionen eines Slack-Requests (Unit of Work)."""
+    user_id: Optional[str] = None
+    session: Optional[Session] = None
+    readonly_session: Optional[Session] = None
+    after_commit: List[Callable[[], None]] = field(default_factory=list)
+
+
+# Unit of Work des gerade laufenden Slack-Requests (pro Thread bzw. Kontext)
+_current_scope: ContextVar[Optional[_RequestScope]] = ContextVar('request_scope', default=None)
+
+
+@contextmanager
+def request_scope(user_id: Optional[str] = None) -> Iterator[None]:
+    """
+    Unit of Work für einen Slack-Request (Command, Action oder Event).
+    - Alle db_session()-Blöcke innerhalb des Requests teilen sich eine Session
+      (Registrierungsprüfung, Handler und Services in derselben Transaktion)
+    - Am Ende wird genau einmal committet und die Session geschlossen
+    - Mit call_after_commit() aufgeschobene Aktionen (z.B. Slack-Nachrichten) laufen erst
+      danach, also ohne gehaltene Pool-Verbindung und nur bei erfolgreichem Commit
+    - db_session(readonly=True) nutzt eine eigene Session auf einer Read-Replica, außer der
+      Request hat bereits die Primär-Session geöffnet
+    - user_id: Slack-User des Requests; hat der Request geschrieben, lesen dessen
+      Folge-Requests vorerst von der Primärdatenbank (siehe ReplicaRouter)
+    Verschachtelte Aufrufe schließen sich dem äußeren Request an.
+    Beispiel:
+        with request_scope(user_id):
+            order_handler.handle_order(body, logger)
+    """
+    if _current_scope.get() is not None:
+        yield
+        return
+
+    scope = _RequestScope(user_id=user_id)
+    token = _current_scope.set(scope)
+    try:
+        yield
+        if scope.session is not None:
+            if user_id is not None:
+                # Vor dem Commit merken, damit kein paralleler Request die Replica erwischt
+                replica_router.note_write(user_id)
+            scope.session.commit()
+    except Exception as e:
+        logger.error(f"Database error: {str(e)}")
+        if scope.session is not None:
+            scope.session.rollback()
+        raise
+    finally:
+        _current_scope.reset(token)
+        if scope.session is not None:
+            scope.session.close()
+        if scope.readonly_session is not None:
+            scope.readonly_session.close()
+
+    for callback in scope.after_commit:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Error in after-commit callback: {str(e)}")
+
+
+def call_after_commit(callback: Callable[[], None]) -> None:
+    """
+    Führt callback nach dem Commit des aktuellen Requests aus (siehe request_scope()).
+    Außerhalb eines Requests (z.B. in Scheduler-Jobs) wird callback sofort ausgeführt.
+    Beispiel:
+        call_after_commit(lambda: client.chat_postMessage(channel=user_id, text="✅"))
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        callback()
+    else:
+        scope.after_commit.append(callback)
+
+
 @contextmanager
-def db_session() -> Session:
+def db_session(readonly: bool = False, user_id: Optional[str] = None) -> Session:
     """
     Context Manager für Datenbank-Sessions.
     Erzeugt eine neue Session, gibt sie an den Aufrufer weiter und sorgt für sauberes Commit/Rollback.
@@ -41,10 +381,52 @@ def db_session() -> Session:
     3. Bei Erfolg: Commit
     4. Bei Fehler: Rollback und Fehlerausgabe
     5. Immer: Session schließen
+    Innerhalb eines request_scope() wird stattdessen die Session des Requests verwendet;
+    am Blockende wird nur geflusht, Commit und Schließen übernimmt der Request.
+    - readonly: Reiner Lesezugriff, wird über den ReplicaRouter ggf. auf eine Read-Replica
+      geleitet; es wird nicht committet (Änderungen gehen verloren)
+    - user_id: Slack-User für read-your-writes (im request_scope() automatisch gesetzt)
     Beispiel:
         with db_session() as session:
             ... # Datenbankoperationen
+        with db_session(readonly=True) as session:
+            ... # Nur lesen
     """
+    scope = _current_scope.get()
+    if readonly:
+        if scope is not None:
+            if scope.session is not None:
+                # Der Request hat die Primär-Session schon offen: dort lesen (sieht eigene Änderungen)
+                yield scope.session
+                return
+            if scope.readonly_session is None:
+                scope.readonly_session = replica_router.session_factory(user_id or scope.user_id)()
+            yield scope.readonly_session
+            return
+
+        session = replica_router.session_factory(user_id)()
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Database error: {str(e)}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        return
+
+    if scope is not None:
+        if scope.session is None:
+            scope.session = SessionLocal()
+        try:
+            yield scope.session
+            scope.session.flush()
+        except Exception:
+            # Die gesamte Unit of Work verwerfen, wie bei einer eigenen Session
+            scope.session.rollback()
+            raise
+        return
+
     session = SessionLocal()
     try:
         yield session
@@ -54,4 +436,15 @@ def db_session() -> Session:
         session.rollback()
         raise
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+def run_after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """
+    Registriert einen Callback, der einmalig nach dem nächsten erfolgreichen Commit der Session läuft.
+    Wird z.B. genutzt, um In-Memory-Caches erst dann zu invalidieren, wenn die Änderung
+    für andere Sessions tatsächlich sichtbar ist.
+    Beispiel:
+        run_after_commit(session, lambda: user_directory.invalidate(slack_id))
+    """
+    event.listen(session, "after_commit", lambda _session: callback(), once=True)
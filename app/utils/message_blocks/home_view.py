@@ -2,9 +2,9 @@
 # app/utils/message_blocks/home_view.py
 #==========================
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any, Optional
 from datetime import datetime
-from app.models import User, Order
+from app.models import User
 from app.utils.message_blocks.constants import COLORS, EMOJIS, BLOCK_DEFAULTS
 
 def create_unregistered_home_view() -> Dict[str, Any]:
@@ -64,8 +64,13 @@ def create_unregistered_home_view() -> Dict[str, Any]:
         "blocks": blocks
     }
 
-def create_home_view(user: Optional[User] = None, recent_orders: List[Order] = None) -> Dict[str, Any]:
-    """Erstellt die Home-Ansicht für den Bot"""
+def create_home_view(user: Optional[User] = None, product_totals: Dict[str, int] = None,
+                     updated_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Erstellt die Home-Ansicht für den Bot
+    - product_totals: Produktname -> Menge der aktuellen Woche
+    - updated_at: Zeitpunkt der letzten Änderung (Standard: jetzt)
+    """
     if user is None:
         return create_unregistered_home_view()
 
@@ -151,17 +156,7 @@ def create_home_view(user: Optional[User] = None, recent_orders: List[Order] = N
     ]
 
     # Aktuelle Wochenbestellung anzeigen
-    if recent_orders:
-        # Alle Produkte über den gesamten Zeitraum summieren
-        product_totals = {}
-        for order in recent_orders:
-            for item in order.items:
-                name = item.product.name
-                if name in product_totals:
-                    product_totals[name] += item.quantity
-                else:
-                    product_totals[name] = item.quantity
-
+    if product_totals is not None:
         if product_totals:
             blocks.append({
                 "type": "section",
@@ -225,7 +220,7 @@ def create_home_view(user: Optional[User] = None, recent_orders: List[Order] = N
             ]
         },
         BLOCK_DEFAULTS["CONTEXT"](
-            f"Zuletzt aktualisiert: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+            f"Zuletzt aktualisiert: {(updated_at or datetime.now()).strftime('%d.%m.%Y %H:%M')}"
         ),
         BLOCK_DEFAULTS["DIVIDER"],
         {
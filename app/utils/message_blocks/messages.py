@@ -3,7 +3,7 @@
 #==========================
 
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
 
 from app.utils.message_blocks.constants import EMOJIS, BLOCK_DEFAULTS, COLORS
@@ -29,7 +29,9 @@ def create_admin_help_blocks() -> List[Dict]:
                 "text": (
                     "*Produkt-Verwaltung:*\n"
                     f"• `/admin product add [name]` {EMOJIS['NEW']} Neues Produkt hinzufügen\n"
-                    f"• `/admin product list` {EMOJIS['LIST']} Alle Produkte anzeigen"
+                    f"• `/admin product list` {EMOJIS['LIST']} Alle Produkte anzeigen\n\n"
+                    "*Wochensummen:*\n"
+                    f"• `/admin totals rebuild` {EMOJIS['SETTINGS']} Summen der aktuellen Woche neu berechnen"
                 )
             }
         }
@@ -101,27 +103,42 @@ def create_order_help_blocks() -> List[Dict]:
                 "text": (
                     "*Verfügbare Befehle:*\n"
                     f"• `/order add [produkt] [anzahl], ...` - {EMOJIS['NEW']} Neue Bestellung aufgeben\n"
+                    f"• `/order add [name]` - {EMOJIS['SAVE']} Gespeicherte Bestellung aufgeben\n"
                     f"• `/order remove [produkt] [anzahl], ...` - {EMOJIS['DELETE']} Produkt entfernen\n"
                     f"• `/order list` - {EMOJIS['LIST']} Aktuelle Bestellungen anzeigen\n"
                     f"• `/order save [name] [produkt] [anzahl], ...` - {EMOJIS['SAVE']} Bestellung speichern\n"
                     f"• `/order savelist` - {EMOJIS['LIST']} Gespeicherte Bestellungen anzeigen\n"
-                    f"• `/order products` - {EMOJIS['LIST']} Produktliste\n"
+                    f"• `/order products` - {EMOJIS['LIST']} Produktliste\n\n"
+                    "_Menge vorne oder hinten, auch mit x: `Vollkorn 2`, `2x Laugen Stange`_"
                 )
             }
         }
     ]
 
-def create_order_confirmation_blocks(order: Order) -> List[Dict]:
-    """Erstellt Message Blocks für eine Bestellbestätigung"""
+def create_order_confirmation_blocks(confirmation: Dict, period_totals: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """
+    Erstellt Message Blocks für eine Bestellbestätigung.
+    Erwartet die Bestätigungsdaten aus OrderService.add_order (order_date, items mit name/quantity).
+    Mit period_totals (Produktname -> Menge der aktuellen Bestellwoche) zeigt die Bestätigung
+    stattdessen die zusammengefassten Summen (für das Aktualisieren der letzten Bestätigung).
+    """
+    if period_totals is not None:
+        items = [{'name': name, 'quantity': quantity} for name, quantity in sorted(period_totals.items())]
+        date_text = f"Zuletzt bestellt am: {confirmation['order_date'].strftime('%d.%m.%Y %H:%M')}"
+        title = "*Deine Bestellung diese Woche:*"
+    else:
+        items = confirmation['items']
+        date_text = f"Bestellt am: {confirmation['order_date'].strftime('%d.%m.%Y %H:%M')}"
+        title = "*Bestelldetails:*"
     return [
         BLOCK_DEFAULTS["HEADER"](f"{EMOJIS['SUCCESS']} Bestellung bestätigt"),
-        BLOCK_DEFAULTS["CONTEXT"](f"Bestellt am: {order.order_date.strftime('%d.%m.%Y %H:%M')}"),
+        BLOCK_DEFAULTS["CONTEXT"](date_text),
         BLOCK_DEFAULTS["DIVIDER"],
         {
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": "*Bestelldetails:*"
+                "text": title
             }
         },
         {
@@ -142,34 +159,37 @@ def create_order_confirmation_blocks(order: Order) -> List[Dict]:
             "fields": [
                 {
                     "type": "mrkdwn",
-                    "text": f"{item.product.name}"
+                    "text": f"{item['name']}"
                 },
                 {
                     "type": "mrkdwn",
-                    "text": f"{item.quantity}x"
+                    "text": f"{item['quantity']}x"
                 }
             ]
-        } for item in order.items],
+        } for item in items],
         BLOCK_DEFAULTS["DIVIDER"],
         BLOCK_DEFAULTS["CONTEXT"](f"{EMOJIS['INFO']} Verwende `/order list` um deine gesamten Bestellungen anzuzeigen")
     ]
 
-def create_order_list_blocks(orders: List[Order], period_start: datetime, period_end: datetime, latest_order: Order = None) -> List[Dict]:
-    """Erstellt Message Blocks für die Bestellübersicht"""
+def create_order_list_blocks(product_totals: Dict[str, int], period_start: datetime, period_end: datetime, latest_order_date: datetime = None) -> List[Dict]:
+    """
+    Erstellt Message Blocks für die Bestellübersicht.
+    Erwartet die Daten aus OrderService.get_order_overview (product_totals: Produktname -> Menge).
+    """
     blocks = [
         BLOCK_DEFAULTS["HEADER"](f"{EMOJIS['LIST']} Bestellübersicht"),
         BLOCK_DEFAULTS["CONTEXT"](
-            f"Zeitraum: {EMOJIS['CALENDAR']} {period_start.strftime('%d.%m.%Y')} 10:00 - "
-            f"{period_end.strftime('%d.%m.%Y')} 09:59"
+            f"Zeitraum: {EMOJIS['CALENDAR']} {period_start.strftime('%d.%m.%Y %H:%M')} - "
+            f"{period_end.strftime('%d.%m.%Y %H:%M')}"
         ),
         BLOCK_DEFAULTS["CONTEXT"](
             f"Stand: {EMOJIS['TIME']} " +
-            (latest_order.order_date.strftime("%d.%m.%Y %H:%M") if latest_order else "Keine Bestellungen")
+            (latest_order_date.strftime("%d.%m.%Y %H:%M") if latest_order_date else "Keine Bestellungen")
         ),
         BLOCK_DEFAULTS["DIVIDER"]
     ]
 
-    if not orders:
+    if not product_totals:
         blocks.append({
             "type": "section",
             "text": {
@@ -179,16 +199,6 @@ def create_order_list_blocks(orders: List[Order], period_start: datetime, period
         })
         return blocks
 
-    # Alle Produkte über den gesamten Zeitraum summieren
-    product_totals = {}
-    for order in orders:
-        for item in order.items:
-            name = item.product.name
-            if name in product_totals:
-                product_totals[name] += item.quantity
-            else:
-                product_totals[name] = item.quantity
-
     # Header für die Tabelle
     blocks.append({
         "type": "section",
@@ -250,6 +260,27 @@ def create_daily_reminder_blocks() -> List[Dict]:
         }
     ]
 
+def create_reminder_blocks(reminder_names: List[str]) -> List[Dict]:
+    """
+    Erstellt die Blöcke für persönliche Erinnerungen (Tabelle reminders).
+    Mehrere gleichzeitig fällige Erinnerungen eines Users werden in einer Nachricht genannt.
+    """
+    title = ", ".join(reminder_names) if reminder_names else "Erinnerung"
+    return [
+        BLOCK_DEFAULTS["HEADER"](f"{EMOJIS['REMINDER']} {title}"),
+        BLOCK_DEFAULTS["DIVIDER"],
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": (
+                    f"{EMOJIS['INFO']} Vergiss nicht, deine Bestellung aufzugeben!\n"
+                    f"Verwende `/order add [produkt] [anzahl]` um eine neue Bestellung zu erstellen."
+                )
+            }
+        }
+    ]
+
 def create_name_blocks(current_name: str = None, new_name: str = None) -> List[Dict]:
     """
     Erstellt Message Blocks zur Anzeige oder Änderung des Benutzernamens.
@@ -310,14 +341,14 @@ def create_registration_blocks() -> List[Dict]:
         }
     ]
 
-def create_remove_preview_blocks(order: Order, items_to_remove: List[Dict], preview_items: Dict[str, int], period_start: datetime, period_end: datetime) -> List[Dict]:
+def create_remove_preview_blocks(user_slack_id: str, items_to_remove: List[Dict], preview_items: Dict[str, int], period_start: datetime, period_end: datetime) -> List[Dict]:
     """Erstellt Vorschau-Blöcke für das Entfernen von Produkten"""
     # Button-Value für die Metadaten
     button_value = json.dumps({
         "type": "remove_order",
         "data": {
             "items": items_to_remove,
-            "user_id": order.user.slack_id
+            "user_id": user_slack_id
         }
     })
 
@@ -561,8 +592,8 @@ def create_weekly_summary_blocks(orders_summary: List[Dict], period_start: datet
     blocks = [
         BLOCK_DEFAULTS["HEADER"](f"{EMOJIS['LIST']} Wochenbestellung"),
         BLOCK_DEFAULTS["CONTEXT"](
-            f"Zeitraum: {EMOJIS['CALENDAR']} {period_start.strftime('%d.%m.%Y')} 10:00 - "
-            f"{period_end.strftime('%d.%m.%Y')} 09:59"
+            f"Zeitraum: {EMOJIS['CALENDAR']} {period_start.strftime('%d.%m.%Y %H:%M')} - "
+            f"{period_end.strftime('%d.%m.%Y %H:%M')}"
         ),
         BLOCK_DEFAULTS["DIVIDER"]
     ]
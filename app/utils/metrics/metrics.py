@@ -0,0 +1,104 @@
+#==========================
+# app/utils/metrics/metrics.py
+#==========================
+
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict
+
+# Einfache prozessweite Metriken (Zähler, Gauges, Histogramme) ohne externe Abhängigkeit.
+# Werden über den /metrics-Endpunkt als JSON ausgegeben und können im Log verwendet werden.
+
+# Anzahl der zuletzt beobachteten Werte, aus denen die Perzentile berechnet werden
+HISTOGRAM_WINDOW = 1000
+
+
+class _Histogram:
+    """Sammelt Messwerte und berechnet Anzahl, Summe, Minimum, Maximum und Perzentile."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.recent: Deque[float] = deque(maxlen=HISTOGRAM_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.recent.append(value)
+
+    def summary(self) -> Dict[str, Any]:
+        values = sorted(self.recent)
+
+        def percentile(p: float) -> float:
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(p * len(values)))], 3)
+
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'min': self.min,
+            'max': self.max,
+            'avg': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99)
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-sichere Sammlung aller Metriken des Prozesses.
+    Beispiel:
+        metrics.increment('commands.busy')
+        metrics.set_gauge('commands.queue_depth', 3)
+        metrics.observe('commands.latency_ms', 12.5)
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Erhöht einen Zähler."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Setzt einen Momentanwert (z.B. Warteschlangenlänge)."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Fügt einem Histogramm einen Messwert hinzu (z.B. Latenz in ms)."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Gibt den aktuellen Stand aller Metriken als Dict zurück."""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'histograms': {name: h.summary() for name, h in self._histograms.items()}
+            }
+
+    def reset(self) -> None:
+        """Setzt alle Metriken zurück (z.B. für Tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Globale Instanz für das gesamte Projekt
+metrics = MetricsRegistry()
@@ -0,0 +1,35 @@
+#==========================
+# app/utils/slack/clients.py
+#==========================
+
+from typing import Optional
+from slack_sdk import WebClient
+from slack_sdk.web import SlackResponse
+from app.utils.slack.rate_limits import INTERACTIVE, RateLimiter, is_caller_limited
+
+
+class RateLimitedWebClient(WebClient):
+    """
+    Synchroner WebClient für Handler, Worker-Threads und Scheduler-Jobs.
+    - limiter: Direkte Aufrufe (z.B. Antworten der Handler) nehmen ein Token in der Interactive-Lane;
+      Aufrufe aus SlackDelivery und Outbox sind schon gedrosselt (caller_limited)
+    Beispiel:
+        client = RateLimitedWebClient(token=..., base_url=..., limiter=rate_limiter)
+    """
+
+    def __init__(self, *args, limiter: Optional[RateLimiter] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    def api_call(self, api_method: str, *, http_verb: str = "POST", files: dict = None, data: dict = None,
+                 params: dict = None, json: dict = None, headers: dict = None, auth: dict = None) -> SlackResponse:
+        self._acquire(api_method)
+        return super().api_call(api_method, http_verb=http_verb, files=files, data=data,
+                                params=params, json=json, headers=headers, auth=auth)
+
+    def _acquire(self, api_method: str) -> None:
+        """Drosselt direkte Aufrufe über den gemeinsamen Token-Bucket der Methode (Interactive-Lane)."""
+        method = api_method.replace('.', '_')
+        if self.limiter is None or is_caller_limited() or not self.limiter.has_limit(method):
+            return
+        self.limiter.bucket(method).acquire(lane=INTERACTIVE)
@@ -0,0 +1,153 @@
+#==========================
+# app/utils/slack/delivery.py
+#==========================
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+from slack_sdk.errors import SlackApiError
+from app.utils.logging.log_config import setup_logger
+from app.utils.metrics.metrics import metrics
+from app.utils.slack.rate_limits import BULK, RateLimiter, caller_limited, rate_limiter
+from config.app_config import settings
+
+logger = setup_logger(__name__)
+
+# Slack-Fehler, bei denen ein erneuter Versuch nichts ändert
+PERMANENT_ERRORS = {
+    'channel_not_found', 'user_not_found', 'not_in_channel', 'is_archived',
+    'invalid_blocks', 'msg_too_long', 'account_inactive', 'invalid_auth'
+}
+
+
+@dataclass
+class OutboundMessage:
+    """
+    Eine zu versendende Slack-Nachricht.
+    - method: Name der WebClient-Methode (z.B. 'chat_postMessage')
+    - kwargs: Argumente für den Aufruf (channel, text, blocks, ...)
+    """
+    method: str
+    kwargs: Dict[str, Any]
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class DeliveryReport:
+    """Statistik eines Versandlaufs (z.B. tägliche Erinnerung)."""
+    run: str
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    duration_seconds: float = 0.0
+    dead_letters: List[OutboundMessage] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'run': self.run,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'duration_seconds': round(self.duration_seconds, 3)
+        }
+
+
+class SlackDelivery:
+    """
+    Versand-Engine für viele Slack-Nachrichten auf einmal (Erinnerungen, Wochenübersicht).
+    - Mehrere Worker senden parallel
+    - Pro API-Methode begrenzt ein gemeinsamer Token-Bucket die Rate; gesendet wird in der
+      Bulk-Lane, die einen Teil jedes Buckets für interaktive Antworten frei lässt
+    - Bei 429 wird der Retry-After-Header respektiert und erneut versucht
+    - Nachrichten, die endgültig scheitern, landen in der Dead-Letter-Liste des Reports
+    Beispiel:
+        delivery = SlackDelivery(slack_app.client)
+        report = delivery.deliver('daily_reminder', messages)
+    """
+
+    def __init__(self, client, workers: int = None, max_attempts: int = None,
+                 limiter: RateLimiter = None, lane: str = BULK):
+        self.client = client
+        self.lane = lane
+        self.workers = workers or settings.SLACK_DELIVERY_WORKERS
+        self.max_attempts = max_attempts or settings.SLACK_DELIVERY_MAX_ATTEMPTS
+        self.limiter = limiter or rate_limiter
+
+    def deliver(self, run: str, messages: Iterable[OutboundMessage]) -> DeliveryReport:
+        """
+        Versendet alle Nachrichten und wartet, bis alle zugestellt oder endgültig gescheitert sind.
+        messages darf ein Generator sein; die Nachrichten werden beim Versand abgerufen.
+        """
+        report = DeliveryReport(run=run)
+        lock = Lock()
+        started_at = time.monotonic()
+
+        def send(message: OutboundMessage) -> None:
+            delivered = self._send_with_retry(message, report, lock)
+            with lock:
+                if delivered:
+                    report.sent += 1
+                else:
+                    report.failed += 1
+                    report.dead_letters.append(message)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"delivery-{run}") as executor:
+            for message in messages:
+                executor.submit(send, message)
+
+        report.duration_seconds = time.monotonic() - started_at
+        metrics.increment(f"delivery.{run}.sent", report.sent)
+        metrics.increment(f"delivery.{run}.failed", report.failed)
+        metrics.observe(f"delivery.{run}.duration_ms", report.duration_seconds * 1000)
+        logger.info(f"Delivery '{run}' finished: {report.as_dict()}")
+        for dead in report.dead_letters:
+            logger.error(f"Delivery '{run}' dead letter: {dead.method} {dead.kwargs.get('channel')} ({dead.error})")
+        return report
+
+    def _send_with_retry(self, message: OutboundMessage, report: DeliveryReport, lock: Lock) -> bool:
+        bucket = self.limiter.bucket(message.method)
+        while message.attempts < self.max_attempts:
+            message.attempts += 1
+            bucket.acquire(lane=self.lane)
+            try:
+                with caller_limited():
+                    getattr(self.client, message.method)(**message.kwargs)
+                return True
+            except SlackApiError as e:
+                response = e.response
+                message.error = response.get('error') if response is not None else str(e)
+                if response is not None and response.status_code == 429:
+                    retry_after = _retry_after_seconds(response.headers)
+                    # Gesamten Bucket pausieren, damit auch die anderen Worker warten
+                    bucket.pause(retry_after)
+                    with lock:
+                        report.rate_limited += 1
+                        report.retries += 1
+                    metrics.increment('delivery.rate_limited')
+                    continue
+                if message.error in PERMANENT_ERRORS:
+                    return False
+            except Exception as e:
+                message.error = str(e)
+
+            if message.attempts < self.max_attempts:
+                with lock:
+                    report.retries += 1
+                time.sleep(min(2 ** message.attempts, 30) * 0.5)
+        return False
+
+
+def _retry_after_seconds(headers: Dict[str, Any]) -> float:
+    """Liest den Retry-After-Header (in Sekunden) aus; Standard ist 1 Sekunde."""
+    for key, value in (headers or {}).items():
+        if key.lower() == 'retry-after':
+            try:
+                return max(float(value[0] if isinstance(value, list) else value), 0.0)
+            except (TypeError, ValueError):
+                break
+    return 1.0
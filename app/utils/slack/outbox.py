@@ -0,0 +1,320 @@
+#==========================
+# app/utils/slack/outbox.py
+#==========================
+
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from threading import Event, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+from slack_sdk.errors import SlackApiError
+from sqlalchemy import delete, exists, or_, select, update
+from sqlalchemy.orm import aliased
+from app.models import OutboxMessage
+from app.utils.db.database import db_session
+from app.utils.logging.log_config import setup_logger
+from app.utils.metrics.metrics import metrics
+from app.utils.slack.delivery import PERMANENT_ERRORS, _retry_after_seconds
+from app.utils.slack.rate_limits import INTERACTIVE, RateLimiter, caller_limited, rate_limiter
+from config.app_config import settings
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class _Result:
+    """Ergebnis eines Zustellversuchs; wird nach dem Versand gesammelt in die Outbox geschrieben."""
+    message_id: int
+    status: str
+    attempts: int
+    available_at: Optional[datetime] = None
+    error: Optional[str] = None
+    sent_ts: Optional[str] = None
+    sent_channel: Optional[str] = None
+    reposted: bool = False
+
+
+class OutboxDispatcher:
+    """
+    Stellt die Nachrichten aus der Tabelle outbox im Hintergrund zu.
+    - Ein Thread liest alle poll_seconds (oder sofort nach wake()) bis zu batch_size fällige Nachrichten;
+      Channels, deren älteste offene Nachricht noch im Backoff wartet, werden dabei übersprungen
+    - Pro Channel wird strikt in Reihenfolge (message_id) zugestellt; scheitert eine Nachricht
+      vorübergehend, warten die folgenden desselben Channels auf ihren nächsten Versuch
+    - Verschiedene Channels laufen parallel, alle über den gemeinsamen Token-Bucket (rate_limiter)
+      in der Interactive-Lane, also vor dem Massenversand
+    - Vorübergehende Fehler: exponentieller Backoff über available_at; nach max_attempts
+      oder bei dauerhaften Slack-Fehlern wird die Nachricht als 'failed' markiert
+    - Zustellung mindestens einmal: Der Status wird erst nach dem Versand geschrieben
+    - chat_update mit update_of: ts und DM-Channel (D…) der ursprünglichen Nachricht werden beim
+      Versand eingesetzt; wurde sie nie zugestellt oder schlägt das Update fehl, wird neu gepostet
+    Läuft nur, solange should_run() True liefert (Scheduler-Leader, siehe app/scheduled_jobs.py).
+    """
+
+    _PURGE_INTERVAL = 600.0
+
+    def __init__(self, poll_seconds: float, batch_size: int, max_attempts: int,
+                 workers: int = 4, limiter: RateLimiter = rate_limiter):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.workers = workers
+        self.limiter = limiter
+        self.client = None
+        self._should_run: Callable[[], bool] = lambda: True
+        self._wake = Event()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._pid: Optional[int] = None
+        self._next_purge = 0.0
+
+    def start(self, client, should_run: Optional[Callable[[], bool]] = None) -> None:
+        """Startet den Dispatcher-Thread. client: Slack WebClient für die Zustellung."""
+        self.client = client
+        if should_run is not None:
+            self._should_run = should_run
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        if self._pid is not None and self._pid != os.getpid():
+            # Nach fork() läuft der Thread des Elternprozesses hier nicht mehr
+            self._wake, self._stop = Event(), Event()
+        self._stop.clear()
+        self._pid = os.getpid()
+        self._thread = Thread(target=self._run, name='outbox-dispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        """Weckt den Dispatcher nach einem Commit mit neuen Outbox-Nachrichten."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            sent = 0
+            if self._should_run():
+                try:
+                    sent = self.drain()
+                    self._purge()
+                except Exception as e:
+                    logger.error(f"Outbox dispatch failed: {str(e)}")
+            # Volle Batches direkt weiter abarbeiten, sonst auf wake() oder das nächste Polling warten
+            if sent < self.batch_size:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def drain(self) -> int:
+        """
+        Ein Durchlauf: offene Nachrichten laden, zustellen und das Ergebnis speichern.
+        Während des Versands wird keine DB-Verbindung gehalten. Rückgabe: Anzahl zugestellter Nachrichten.
+        """
+        now = datetime.now()
+        waiting = aliased(OutboxMessage)
+        with db_session() as session:
+            # Nur fällige Nachrichten; vor ihnen darf im selben Channel keine im Backoff warten,
+            # sonst blockieren wartende Nachrichten den Batch und die Reihenfolge pro Channel bricht
+            pending = session.execute(
+                select(OutboxMessage)
+                .where(
+                    OutboxMessage.status == 'pending',
+                    OutboxMessage.available_at <= now,
+                    ~exists().where(
+                        waiting.channel == OutboxMessage.channel,
+                        waiting.status == 'pending',
+                        waiting.available_at > now,
+                        waiting.message_id < OutboxMessage.message_id
+                    )
+                )
+                .order_by(OutboxMessage.message_id)
+                .limit(self.batch_size)
+            ).scalars().all()
+            # ts und Channel der ursprünglichen Nachrichten für chat_update (sofern nicht im selben Batch)
+            root_ids = {message.update_of for message in pending if message.update_of is not None}
+            roots: Dict[int, Tuple[Optional[str], Optional[str]]] = {
+                message_id: (ts, channel)
+                for message_id, ts, channel in session.execute(
+                    select(OutboxMessage.message_id, OutboxMessage.sent_ts, OutboxMessage.sent_channel)
+                    .where(OutboxMessage.message_id.in_(root_ids))
+                )
+            } if root_ids else {}
+            session.expunge_all()
+        metrics.set_gauge('outbox.pending', len(pending))
+        if not pending:
+            return 0
+
+        channels: Dict[str, List[OutboxMessage]] = OrderedDict()
+        for message in pending:
+            channels.setdefault(message.channel, []).append(message)
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(channels)),
+                                thread_name_prefix='outbox-send') as executor:
+            results = [
+                result
+                for channel_results in executor.map(lambda messages: self._send_channel(messages, now, roots),
+                                                    channels.values())
+                for result in channel_results
+            ]
+        self._store(results)
+
+        sent = sum(1 for result in results if result.status == 'sent')
+        metrics.increment('outbox.sent', sent)
+        return sent
+
+    def _send_channel(self, messages: List[OutboxMessage], now: datetime,
+                      roots: Dict[int, Tuple[Optional[str], Optional[str]]]) -> List[_Result]:
+        """Stellt die Nachrichten eines Channels nacheinander zu; stoppt bei der ersten, die warten muss."""
+        results = []
+        roots = dict(roots)
+        for message in messages:
+            if message.available_at > now:
+                break
+            result = self._send(message, roots.get(message.update_of))
+            results.append(result)
+            if result.status == 'sent':
+                roots[message.message_id] = (result.sent_ts, result.sent_channel)
+            if result.status == 'pending':
+                break
+        return results
+
+    def _send(self, message: OutboxMessage,
+              root: Optional[Tuple[Optional[str], Optional[str]]] = None) -> _Result:
+        """
+        Ein Zustellversuch. root: (ts, Channel) der ursprünglichen Nachricht bei update_of.
+        chat_update braucht den DM-Channel (D…) aus der Antwort des Posts, nicht die User-ID.
+        """
+        attempts = message.attempts + 1
+        method = message.method
+        channel = message.channel
+        kwargs = json.loads(message.payload)
+        reposted = False
+        if message.update_of is not None:
+            if root is not None and root[0]:
+                kwargs['ts'] = root[0]
+                channel = root[1] or message.channel
+            else:
+                # Ursprüngliche Nachricht wurde nie zugestellt: neu posten
+                method = 'chat_postMessage'
+                reposted = True
+        bucket = self.limiter.bucket(method)
+        bucket.acquire(lane=INTERACTIVE)
+        try:
+            try:
+                with caller_limited():
+                    response = getattr(self.client, method)(channel=channel, **kwargs)
+            except SlackApiError as e:
+                if method != 'chat_update' or message.update_of is None or \
+                        (e.response is not None and e.response.status_code == 429):
+                    raise
+                # Update nicht möglich (z.B. Nachricht gelöscht): Bestätigung stattdessen neu posten
+                logger.warning(f"Outbox update {message.message_id} failed, reposting: {str(e)}")
+                metrics.increment('outbox.update_fallbacks')
+                kwargs.pop('ts', None)
+                bucket = self.limiter.bucket('chat_postMessage')
+                bucket.acquire(lane=INTERACTIVE)
+                with caller_limited():
+                    response = self.client.chat_postMessage(channel=message.channel, **kwargs)
+                reposted = True
+            metrics.observe('outbox.lag_ms', (datetime.now() - message.created_at).total_seconds() * 1000)
+            if response is None or not message.kind:
+                return _Result(message.message_id, 'sent', attempts)
+            return _Result(message.message_id, 'sent', attempts, sent_ts=response.get('ts'),
+                           sent_channel=response.get('channel'), reposted=reposted)
+        except SlackApiError as e:
+            response = e.response
+            error = response.get('error') if response is not None else str(e)
+            if response is not None and response.status_code == 429:
+                # Rate-Limit zählt nicht als Versuch; gesamten Bucket pausieren
+                retry_after = _retry_after_seconds(response.headers)
+                bucket.pause(retry_after)
+                metrics.increment('outbox.rate_limited')
+                return _Result(message.message_id, 'pending', message.attempts,
+                               datetime.now() + timedelta(seconds=retry_after), error)
+            if error in PERMANENT_ERRORS:
+                return self._failed(message, attempts, error)
+        except Exception as e:
+            error = str(e)
+
+        if attempts >= self.max_attempts:
+            return self._failed(message, attempts, error)
+        metrics.increment('outbox.retries')
+        backoff = min(2 ** attempts, 300)
+        return _Result(message.message_id, 'pending', attempts, datetime.now() + timedelta(seconds=backoff), error)
+
+    def _failed(self, message: OutboxMessage, attempts: int, error: str) -> _Result:
+        metrics.increment('outbox.failed')
+        logger.error(f"Outbox message {message.message_id} ({message.method} {message.channel}) failed: {error}")
+        return _Result(message.message_id, 'failed', attempts, error=error)
+
+    def _store(self, results: List[_Result]) -> None:
+        now = datetime.now()
+        sent_ids = [result.message_id for result in results if result.status == 'sent' and not result.sent_ts]
+        with db_session() as session:
+            if sent_ids:
+                session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.message_id.in_(sent_ids))
+                    .values(status='sent', sent_at=now, attempts=OutboxMessage.attempts + 1, last_error=None)
+                )
+            for result in results:
+                if result.status == 'sent' and not result.sent_ts:
+                    continue
+                values = {'status': result.status, 'attempts': result.attempts, 'last_error': result.error}
+                if result.status == 'sent':
+                    values.update(sent_at=now, sent_ts=result.sent_ts, sent_channel=result.sent_channel)
+                    if result.reposted:
+                        # Neu gepostet: folgende Updates beziehen sich auf diese Nachricht
+                        values['update_of'] = None
+                if result.available_at is not None:
+                    values['available_at'] = result.available_at
+                session.execute(
+                    update(OutboxMessage).where(OutboxMessage.message_id == result.message_id).values(**values)
+                )
+
+    def _purge(self) -> None:
+        """
+        Räumt die Outbox auf (höchstens alle 10 Minuten):
+        - zugestellte Nachrichten nach OUTBOX_RETENTION_HOURS
+        - gescheiterte und überholte Nachrichten nach OUTBOX_FAILED_RETENTION_HOURS
+        Nachrichten, auf die ein noch offenes Update verweist (update_of), bleiben stehen.
+        """
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self._PURGE_INTERVAL
+        sent_cutoff = datetime.now() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        failed_cutoff = datetime.now() - timedelta(hours=settings.OUTBOX_FAILED_RETENTION_HOURS)
+        with db_session() as session:
+            # Vorab lesen: MySQL erlaubt in DELETE keine Unterabfrage auf dieselbe Tabelle
+            referenced = session.execute(
+                select(OutboxMessage.update_of)
+                .where(OutboxMessage.status == 'pending', OutboxMessage.update_of.is_not(None))
+            ).scalars().all()
+            purged = session.execute(
+                delete(OutboxMessage).where(
+                    or_(
+                        (OutboxMessage.status == 'sent') & (OutboxMessage.sent_at < sent_cutoff),
+                        OutboxMessage.status.in_(('failed', 'superseded')) & (OutboxMessage.created_at < failed_cutoff)
+                    ),
+                    OutboxMessage.message_id.not_in(set(referenced))
+                ).execution_options(synchronize_session=False)
+            ).rowcount
+        if purged:
+            metrics.increment('outbox.purged', purged)
+
+
+# Globale Instanz; gestartet wird sie in jedem Worker zusammen mit dem Scheduler (init_scheduler)
+outbox_dispatcher = OutboxDispatcher(
+    poll_seconds=settings.OUTBOX_POLL_SECONDS,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    workers=settings.SLACK_DELIVERY_WORKERS
+)
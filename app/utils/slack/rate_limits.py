@@ -0,0 +1,144 @@
+#==========================
+# app/utils/slack/rate_limits.py
+#==========================
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Iterator, Tuple
+from app.utils.metrics.metrics import metrics
+from config.app_config import settings
+
+# Lanes für ausgehende Slack-Aufrufe:
+# - interactive: Antworten auf User-Aktionen (Commands, Buttons, Bestätigungen aus der Outbox)
+# - bulk: Massenversand (Erinnerungen, Wochenübersicht), darf die Reserve nicht antasten
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+_caller_limited: ContextVar[bool] = ContextVar('slack_caller_limited', default=False)
+
+
+class TokenBucket:
+    """
+    Klassischer Token-Bucket: füllt sich mit rate Tokens pro Sekunde bis maximal capacity.
+    Jeder API-Aufruf verbraucht ein Token; ist keines da, wird gewartet.
+    Die Bulk-Lane nimmt nur Tokens, solange danach noch reserve Tokens übrig bleiben. Die Reserve
+    steht damit immer der Interactive-Lane zur Verfügung, und nachfließende Tokens gehen zuerst
+    an interaktive Aufrufe, sobald diese die Reserve angebrochen haben.
+    """
+
+    def __init__(self, rate: float, capacity: float, reserve: float = 0.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, lane: str = INTERACTIVE) -> float:
+        """
+        Versucht ein Token zu nehmen.
+        Gibt 0 zurück, wenn das geklappt hat, sonst die Wartezeit bis zum nächsten Token.
+        """
+        needed = 1 + (self.reserve if lane == BULK else 0)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= needed:
+                self._tokens -= 1
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def acquire(self, timeout: float = None, lane: str = INTERACTIVE) -> bool:
+        """
+        Wartet (höchstens timeout Sekunden) auf ein Token. Gibt False bei Timeout zurück.
+        Die Wartezeit wird pro Lane als Metrik erfasst (slack.lanes.<lane>.wait_ms).
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        while True:
+            wait = self.try_acquire(lane)
+            if wait <= 0:
+                waited_ms = (time.monotonic() - started) * 1000
+                metrics.observe(f"slack.lanes.{lane}.wait_ms", waited_ms)
+                if waited_ms > 0:
+                    metrics.increment(f"slack.lanes.{lane}.throttled")
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                metrics.increment(f"slack.lanes.{lane}.timeouts")
+                return False
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Leert den Bucket für die angegebene Zeit (z.B. nach einem 429 mit Retry-After)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = -seconds * self.rate
+            self._updated_at = now
+
+
+# Standard-Limits pro Slack-API-Methode: (Tokens pro Sekunde, Burst)
+# Angelehnt an die Slack-Tiers: chat.postMessage ("special", ca. 1/s pro Channel),
+# chat.update (Tier 3, 50/min), views.publish (Tier 4, 100/min)
+DEFAULT_METHOD_LIMITS: Dict[str, Tuple[float, float]] = {
+    'chat_postMessage': (settings.SLACK_POST_RATE, settings.SLACK_POST_BURST),
+    'chat_update': (50 / 60, 5),
+    'views_publish': (100 / 60, 10)
+}
+FALLBACK_LIMIT: Tuple[float, float] = (20 / 60, 3)  # Tier 2
+
+
+class RateLimiter:
+    """
+    Verwaltet einen Token-Bucket pro Slack-API-Methode (prozessweit geteilt).
+    - interactive_reserve: Anteil jedes Buckets, der für die Interactive-Lane reserviert ist
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]] = None, interactive_reserve: float = None):
+        self._limits = dict(limits or DEFAULT_METHOD_LIMITS)
+        self.interactive_reserve = (
+            settings.SLACK_INTERACTIVE_RESERVE if interactive_reserve is None else interactive_reserve
+        )
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = Lock()
+
+    def bucket(self, method: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(method)
+            if bucket is None:
+                rate, capacity = self._limits.get(method, FALLBACK_LIMIT)
+                bucket = self._buckets[method] = TokenBucket(
+                    rate, capacity, reserve=capacity * self.interactive_reserve
+                )
+            return bucket
+
+    def has_limit(self, method: str) -> bool:
+        """True, wenn für die Methode ein eigenes Limit konfiguriert ist."""
+        return method in self._limits
+
+
+@contextmanager
+def caller_limited() -> Iterator[None]:
+    """
+    Markiert die Slack-Aufrufe im with-Block als bereits vom Aufrufer gedrosselt
+    (SlackDelivery, OutboxDispatcher), damit der gemeinsame Client kein zweites Token nimmt.
+    """
+    token = _caller_limited.set(True)
+    try:
+        yield
+    finally:
+        _caller_limited.reset(token)
+
+
+def is_caller_limited() -> bool:
+    return _caller_limited.get()
+
+
+# Globale Instanz, damit alle Versandwege dieselben Limits teilen
+rate_limiter = RateLimiter()
@@ -0,0 +1,152 @@
+#==========================
+# app/utils/slack/request_dedup.py
+#==========================
+
+import atexit
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, Optional
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from app.models import ProcessedRequest
+from app.utils.db.database import db_session
+from app.utils.logging.log_config import setup_logger
+from app.utils.metrics.metrics import metrics
+from config.app_config import settings
+
+logger = setup_logger(__name__)
+
+
+def request_key(body: Dict[str, Any], raw_body: Optional[str] = None) -> str:
+    """
+    Schlüssel eines Slack-Requests, der bei Wiederholungen (X-Slack-Retry-Num) gleich bleibt.
+    - Events: event_id
+    - Slash-Commands und Interaktionen: trigger_id
+    - Sonst: SHA-256 des Request-Bodys
+    """
+    if body.get('event_id'):
+        return f"event:{body['event_id']}"
+    if body.get('trigger_id'):
+        return f"trigger:{body['trigger_id']}"
+    return f"body:{hashlib.sha256((raw_body or '').encode('utf-8')).hexdigest()}"
+
+
+class RequestDeduplicator:
+    """
+    Erkennt wiederholt zugestellte Slack-Requests, bevor sie verarbeitet werden.
+    - Lokal: LRU mit TTL (max_entries Einträge pro Prozess), fängt Wiederholungen am selben Worker
+      ohne Datenbankzugriff ab
+    - Geteilt: Tabelle processed_requests; der erste Worker legt den Schlüssel an, alle weiteren
+      finden ihn vor (bei gleichzeitigem Anlegen entscheidet der Primärschlüssel)
+    - Erste Versuche prüfen nur lokal; der Schlüssel wird im Hintergrund eingetragen, damit der
+      3-Sekunden-Ack keinen DB-Zugriff abwartet. Nur Wiederholungen (retry=True, Header
+      X-Slack-Retry-Num) fragen die Tabelle synchron ab
+    - Abgelaufene Einträge werden höchstens einmal pro Minute gelöscht
+    Ist die Datenbank nicht erreichbar, wird der Request verarbeitet (lieber doppelt als gar nicht).
+    Beispiel:
+        if request_dedup.claim(request_key(body, raw_body), retry='x-slack-retry-num' in headers):
+            ... # erster Versuch: verarbeiten
+    """
+
+    _PURGE_INTERVAL = 60.0
+
+    def __init__(self, ttl_seconds: float, max_entries: int, shared: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: 'OrderedDict[str, float]' = OrderedDict()
+        self._lock = Lock()
+        self._next_purge = 0.0
+        self._recorder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dedup-record')
+
+    def claim(self, key: str, retry: bool = False) -> bool:
+        """
+        True, wenn der Request zum ersten Mal gesehen wird; False bei einer Wiederholung.
+        - retry: Slack hat den Request wiederholt (X-Slack-Retry-Num); nur dann wird die
+          geteilte Tabelle vor der Antwort abgefragt
+        """
+        now = time.monotonic()
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is not None and expires > now:
+                self._entries.move_to_end(key)
+                metrics.increment('slack.dedup.local_hits')
+                return False
+            self._entries[key] = now + self.ttl_seconds
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            purge = self.shared and now >= self._next_purge
+            if purge:
+                self._next_purge = now + self._PURGE_INTERVAL
+
+        if not self.shared:
+            return True
+        if not retry:
+            # Erster Versuch: für Wiederholungen an anderen Workern nach dem Ack eintragen
+            try:
+                self._recorder.submit(self._record, key, purge)
+            except RuntimeError:
+                # Beim Herunterfahren nimmt der Executor nichts mehr an
+                pass
+            return True
+        try:
+            if purge:
+                self._purge()
+            claimed = self._claim_shared(key)
+        except Exception as e:
+            logger.error(f"Request dedup unavailable, processing {key}: {str(e)}")
+            metrics.increment('slack.dedup.errors')
+            return True
+        if not claimed:
+            metrics.increment('slack.dedup.shared_hits')
+        return claimed
+
+    def _record(self, key: str, purge: bool) -> None:
+        try:
+            if purge:
+                self._purge()
+            self._claim_shared(key)
+        except Exception as e:
+            logger.error(f"Request dedup could not record {key}: {str(e)}")
+            metrics.increment('slack.dedup.errors')
+
+    def shutdown(self) -> None:
+        """Wartet, bis alle im Hintergrund einzutragenden Schlüssel geschrieben sind."""
+        self._recorder.shutdown(wait=True)
+
+    def _claim_shared(self, key: str) -> bool:
+        now = datetime.now()
+        try:
+            with db_session() as session:
+                entry = session.get(ProcessedRequest, key)
+                if entry is None:
+                    session.add(ProcessedRequest(request_key=key, received_at=now))
+                    return True
+                # Schlüssel existiert bereits: nur ein abgelaufener Eintrag darf neu vergeben werden
+                if entry.received_at < now - timedelta(seconds=self.ttl_seconds):
+                    entry.received_at = now
+                    return True
+                return False
+        except IntegrityError:
+            # Ein anderer Worker hat denselben Request gleichzeitig angelegt
+            return False
+
+    def _purge(self) -> None:
+        cutoff = datetime.now() - timedelta(seconds=self.ttl_seconds)
+        with db_session() as session:
+            session.execute(delete(ProcessedRequest).where(ProcessedRequest.received_at < cutoff))
+
+
+# Globale Instanz für alle Slack-Requests
+request_dedup = RequestDeduplicator(
+    ttl_seconds=settings.SLACK_DEDUP_TTL_SECONDS,
+    max_entries=settings.SLACK_DEDUP_MAX_ENTRIES
+)
+
+# Beim Beenden des Prozesses noch offene Einträge schreiben
+atexit.register(request_dedup.shutdown)
@@ -0,0 +1,130 @@
+#==========================
+# app/utils/workers/command_pipeline.py
+#==========================
+
+import atexit
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Condition
+from typing import Callable, Optional
+from app.utils.logging.log_config import setup_logger
+from app.utils.metrics.metrics import metrics
+from config.app_config import settings
+
+logger = setup_logger(__name__)
+
+
+class CommandPipeline:
+    """
+    Begrenzter Worker-Pool für die Verarbeitung von Slash-Commands.
+    Der Slack-Request wird sofort bestätigt (ack), die eigentliche Arbeit (DB, Slack-Nachrichten)
+    läuft anschließend in einem der Worker-Threads.
+    - max_workers: Anzahl gleichzeitig verarbeiteter Commands
+    - max_queue: Anzahl zusätzlich wartender Commands, bevor Backpressure greift
+    - busy_retry_seconds: So lange wird bei voller Warteschlange auf einen freien Platz gewartet
+    Metriken:
+    - commands.queue_depth (Gauge): angenommene, noch nicht fertige Commands
+    - commands.queue_wait_ms / commands.latency_ms (Histogramme)
+    - commands.busy / commands.rejected / commands.failed (Zähler)
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, busy_retry_seconds: float):
+        self.name = name
+        self.busy_retry_seconds = busy_retry_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = BoundedSemaphore(max_workers + max_queue)
+        self._pending = 0
+        self._idle = Condition()
+        self._accepting = True
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def submit(self, fn: Callable[[], None], on_busy: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Übergibt eine Aufgabe an den Worker-Pool.
+        Ist die Warteschlange voll, wird on_busy aufgerufen (z.B. "ausgelastet"-Antwort) und
+        bis zu busy_retry_seconds auf einen freien Platz gewartet.
+        Gibt False zurück, wenn die Aufgabe nicht angenommen wurde.
+        """
+        if not self._accepting:
+            metrics.increment(f"{self.name}.rejected")
+            return False
+
+        if not self._slots.acquire(blocking=False):
+            metrics.increment(f"{self.name}.busy")
+            if on_busy:
+                on_busy()
+            if not self._slots.acquire(timeout=self.busy_retry_seconds):
+                metrics.increment(f"{self.name}.rejected")
+                logger.warning(f"{self.name}: queue full, command rejected")
+                return False
+
+        with self._idle:
+            self._pending += 1
+            metrics.set_gauge(f"{self.name}.queue_depth", self._pending)
+
+        enqueued_at = time.monotonic()
+        try:
+            self._executor.submit(self._run, fn, enqueued_at)
+        except RuntimeError:
+            # Executor wurde bereits heruntergefahren
+            self._finish()
+            metrics.increment(f"{self.name}.rejected")
+            return False
+        return True
+
+    def _run(self, fn: Callable[[], None], enqueued_at: float) -> None:
+        started_at = time.monotonic()
+        metrics.observe(f"{self.name}.queue_wait_ms", (started_at - enqueued_at) * 1000)
+        try:
+            fn()
+        except Exception as e:
+            metrics.increment(f"{self.name}.failed")
+            logger.error(f"{self.name}: command failed: {str(e)}")
+        finally:
+            metrics.observe(f"{self.name}.latency_ms", (time.monotonic() - started_at) * 1000)
+            self._finish()
+
+    def _finish(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            metrics.set_gauge(f"{self.name}.queue_depth", self._pending)
+            self._idle.notify_all()
+        self._slots.release()
+
+    def shutdown(self, timeout: float = None) -> None:
+        """
+        Fährt den Pool geordnet herunter: nimmt keine neuen Commands mehr an und wartet,
+        bis alle angenommenen Commands abgearbeitet sind (höchstens timeout Sekunden).
+        """
+        if not self._accepting:
+            return
+        self._accepting = False
+        timeout = settings.COMMAND_DRAIN_TIMEOUT if timeout is None else timeout
+        if self._pending:
+            logger.info(f"{self.name}: draining {self._pending} pending command(s)")
+
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"{self.name}: drain timeout, {self._pending} command(s) dropped")
+                    break
+                self._idle.wait(remaining)
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Globale Instanz für alle Slash-Commands
+command_pipeline = CommandPipeline(
+    name='commands',
+    max_workers=settings.COMMAND_WORKERS,
+    max_queue=settings.COMMAND_QUEUE_SIZE,
+    busy_retry_seconds=settings.COMMAND_BUSY_RETRY_SECONDS
+)
+
+# Beim Beenden des Prozesses laufende Commands noch abarbeiten
+atexit.register(command_pipeline.shutdown)
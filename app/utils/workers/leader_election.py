@@ -0,0 +1,165 @@
+#==========================
+# app/utils/workers/leader_election.py
+#==========================
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+from sqlalchemy import func, insert, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import SchedulerLease
+from app.utils.db.database import db_session
+from app.utils.logging.log_config import setup_logger
+from app.utils.metrics.metrics import metrics
+
+logger = setup_logger(__name__)
+
+
+class LeaderElection:
+    """
+    Lease-basierte Leader-Wahl über eine Zeile in der Tabelle scheduler_leases.
+    - Alle renew_seconds versucht jeder Prozess, die Lease zu verlängern bzw. zu übernehmen
+    - Übernommen werden kann nur eine abgelaufene Lease (expires_at in der Vergangenheit)
+    - acquired_at/expires_at werden mit der Uhr der Datenbank berechnet und verglichen,
+      damit abweichende Uhren der Hosts weder zwei Leader noch eine verzögerte Übernahme bewirken
+    - Der Leader hält sich lokal nur bis lease_seconds - renew_seconds nach dem letzten
+      erfolgreichen Verlängern für Leader, also bevor ein anderer Prozess übernehmen darf
+    - on_elected / on_demoted werden beim Wechsel der Rolle aufgerufen
+    Beispiel:
+        election = LeaderElection('scheduler', 15, 5, on_elected=start_jobs, on_demoted=stop_jobs)
+        election.start()
+    """
+
+    def __init__(self, name: str, lease_seconds: float, renew_seconds: float,
+                 on_elected: Optional[Callable[[], None]] = None,
+                 on_demoted: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._valid_until = 0.0
+        self._leading = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_leader(self) -> bool:
+        """True, solange die zuletzt bestätigte Lease lokal noch als gültig gilt."""
+        return time.monotonic() < self._valid_until
+
+    def start(self) -> None:
+        """Startet den Heartbeat-Thread (erster Versuch sofort)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Beendet den Heartbeat und gibt die Lease frei, damit ein anderer Prozess sofort übernimmt."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.renew_seconds)
+        if self._leading:
+            self._release()
+            self._set_leading(False)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.heartbeat()
+            self._stop.wait(self.renew_seconds)
+
+    def heartbeat(self) -> None:
+        """Ein Verlängerungs-/Übernahmeversuch; aktualisiert die Rolle des Prozesses."""
+        attempted_at = time.monotonic()
+        try:
+            acquired = self._try_acquire()
+        except Exception as e:
+            logger.error(f"Leader election {self.name}: {str(e)}")
+            acquired = False
+
+        if acquired:
+            self._valid_until = attempted_at + self.lease_seconds - self.renew_seconds
+        self._set_leading(self.is_leader())
+
+    def _try_acquire(self) -> bool:
+        with db_session() as session:
+            now, expires_at = _db_time(session), _db_time(session, self.lease_seconds)
+            # 1. Eigene Lease verlängern
+            renewed = session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder)
+                .values(expires_at=expires_at)
+            ).rowcount
+            if renewed:
+                return True
+            # 2. Abgelaufene Lease übernehmen
+            taken = session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.expires_at < now)
+                .values(holder=self.holder, acquired_at=now, expires_at=expires_at)
+            ).rowcount
+            if taken:
+                return True
+            if session.get(SchedulerLease, self.name) is not None:
+                return False
+
+        # 3. Noch keine Lease vorhanden: anlegen (bei gleichzeitigem Anlegen gewinnt einer)
+        return self._create_lease()
+
+    def _create_lease(self) -> bool:
+        try:
+            with db_session() as session:
+                session.execute(insert(SchedulerLease).values(
+                    name=self.name,
+                    holder=self.holder,
+                    acquired_at=_db_time(session),
+                    expires_at=_db_time(session, self.lease_seconds)
+                ))
+            return True
+        except IntegrityError:
+            return False
+
+    def _release(self) -> None:
+        try:
+            with db_session() as session:
+                session.execute(
+                    update(SchedulerLease)
+                    .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder)
+                    .values(expires_at=_db_time(session))
+                )
+        except Exception as e:
+            logger.error(f"Leader election {self.name}: release failed: {str(e)}")
+        self._valid_until = 0.0
+
+    def _set_leading(self, leading: bool) -> None:
+        if leading == self._leading:
+            return
+        self._leading = leading
+        metrics.set_gauge(f"leader.{self.name}", 1 if leading else 0)
+        callback = self._on_elected if leading else self._on_demoted
+        logger.info(f"{self.holder} {'is now leader' if leading else 'lost leadership'} for {self.name}")
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Leader election {self.name}: role change failed: {str(e)}")
+
+
+def _db_time(session: Session, offset_seconds: float = 0.0):
+    """
+    SQL-Ausdruck für die aktuelle Zeit der Datenbank plus offset_seconds.
+    - SQLite: datetime('now', 'localtime', ...), Sekundengenauigkeit
+    - PostgreSQL: LOCALTIMESTAMP + make_interval(...)
+    - MySQL/MariaDB: TIMESTAMPADD(MICROSECOND, ..., NOW(6))
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return func.datetime('now', 'localtime', f"{offset_seconds:+.3f} seconds")
+    if dialect == 'postgresql':
+        return func.localtimestamp() + func.make_interval(0, 0, 0, 0, 0, 0, offset_seconds)
+    return func.timestampadd(text('MICROSECOND'), int(offset_seconds * 1_000_000), func.now(6))
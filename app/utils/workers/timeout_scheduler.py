@@ -0,0 +1,100 @@
+#==========================
+# app/utils/workers/timeout_scheduler.py
+#==========================
+
+import heapq
+import itertools
+import time
+from threading import Condition, Thread
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from app.utils.logging.log_config import setup_logger
+from app.utils.metrics.metrics import metrics
+
+logger = setup_logger(__name__)
+
+
+class TimeoutScheduler:
+    """
+    Gemeinsamer Scheduler für kurzlebige Timeouts (z.B. Ablauf der /order remove Vorschau).
+    Alle Timeouts laufen über einen einzigen Thread mit einem Heap, statt pro Vorschau
+    einen eigenen threading.Timer zu starten.
+    - Jeder Timeout hat einen Schlüssel (z.B. (channel, ts)) und kann darüber abgebrochen werden
+    - Ein erneutes schedule() mit gleichem Schlüssel ersetzt den alten Timeout
+    - Abgebrochene Timeouts werden nie ausgeführt
+    """
+
+    def __init__(self, name: str = 'timeouts'):
+        self.name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int, Callable[[], None]]] = {}
+        self._counter = itertools.count()
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], None]) -> None:
+        """Plant callback in delay Sekunden unter dem angegebenen Schlüssel ein."""
+        deadline = time.monotonic() + delay
+        with self._condition:
+            seq = next(self._counter)
+            self._entries[key] = (deadline, seq, callback)
+            heapq.heappush(self._heap, (deadline, seq, key))
+            metrics.set_gauge(f"{self.name}.pending", len(self._entries))
+            self._ensure_thread()
+            self._condition.notify()
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Bricht einen geplanten Timeout ab.
+        Gibt True zurück, wenn der Timeout noch ausstand (also jetzt nicht mehr ausgeführt wird).
+        """
+        with self._condition:
+            removed = self._entries.pop(key, None) is not None
+            metrics.set_gauge(f"{self.name}.pending", len(self._entries))
+        if removed:
+            metrics.increment(f"{self.name}.cancelled")
+        return removed
+
+    def pending(self) -> int:
+        """Anzahl der noch ausstehenden Timeouts."""
+        with self._condition:
+            return len(self._entries)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _next_due(self) -> Optional[Callable[[], None]]:
+        """Wartet auf den nächsten fälligen Timeout und gibt dessen Callback zurück."""
+        with self._condition:
+            while True:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                deadline, seq, key = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is None or entry[1] != seq:
+                    # Abgebrochen oder durch neueren Eintrag ersetzt
+                    heapq.heappop(self._heap)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                del self._entries[key]
+                metrics.set_gauge(f"{self.name}.pending", len(self._entries))
+                return entry[2]
+
+    def _run(self) -> None:
+        while True:
+            callback = self._next_due()
+            metrics.increment(f"{self.name}.fired")
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in timeout callback: {str(e)}")
+
+
+# Globale Instanz für alle Timeouts von interaktiven Nachrichten
+timeout_scheduler = TimeoutScheduler()
@@ -4,6 +4,7 @@
 
 from flask import Flask
 from app.api.slack_endpoints import slack_routes
+from app.api.metrics_endpoints import metrics_routes
 from app.utils.db.database import engine
 from app.utils.logging.log_config import setup_logger
 from app.models import Base
@@ -17,6 +18,9 @@ def create_app() -> Flask:
     """
     Erstellt und konfiguriert die Flask-Anwendung für den BrotBot.
     - Registriert die Slack-Routen (Blueprint)
+    - Registriert den Metriken-Endpunkt (/metrics)
+    - Startet Scheduler und Outbox-Dispatcher in jedem Worker-Prozess (auch unter gunicorn);
+      Cron-Jobs und Zustellung übernimmt nur der per Lease gewählte Leader
     - Kann um weitere Blueprints erweitert werden
     :return: Flask-App-Instanz
     """
@@ -24,17 +28,25 @@ def create_app() -> Flask:
 
     # Registriere die Slack-Routen mit dem korrekten URL-Präfix
     app.register_blueprint(slack_routes, url_prefix='')
+    app.register_blueprint(metrics_routes, url_prefix='')
+
+    init_scheduler()
+    # Nach einem fork() (gunicorn --preload) startet der erste Request die Threads im Worker neu
+    app.before_request(_ensure_scheduler)
 
     return app
 
+
+def _ensure_scheduler() -> None:
+    init_scheduler()
+
 if __name__ == "__main__":
     try:
         # Datenbank-Tabellen erstellen (nur falls noch nicht vorhanden)
         Base.metadata.create_all(bind=engine)
 
-        # Flask-App erstellen und Scheduler starten
+        # Flask-App erstellen (startet auch den Scheduler für Erinnerungen und Wochenübersicht)
         app = create_app()
-        scheduler = init_scheduler()  # Starte den Scheduler für Erinnerungen und Wochenübersicht
 
         logger.info("Starting BrotBot server...")
         app.run(
@@ -0,0 +1,62 @@
+#==========================
+# benchmarks/_setup.py
+#==========================
+
+import os
+import random
+import sys
+import tempfile
+from datetime import timedelta
+
+# Ohne eigene DATABASE_URL läuft der Benchmark gegen eine frische SQLite-Datei;
+# muss vor dem ersten Import von config gesetzt sein
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='brotbot-bench-'), 'bench.db')}")
+os.environ.setdefault('SLACK_BOT_TOKEN', 'xoxb-bench')
+os.environ.setdefault('SLACK_SIGNING_SECRET', 'bench')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app.models import Base, Order, OrderItem, Product, User
+from app.utils.db.database import db_session, engine
+from app.core.order_period import get_current_period
+from app.core.product_catalog import product_catalog
+from app.core.weekly_totals_service import WeeklyTotalsService
+
+PRODUCTS = ['Brötchen', 'Vollkorn', 'Laugen Stange', 'Croissant', 'Mohnbrötchen', 'Körnerstange']
+
+
+def reset_database(products=PRODUCTS) -> None:
+    """Legt alle Tabellen neu an und trägt die Produkte ein."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with db_session() as session:
+        session.add_all([Product(name=name, active=True) for name in products])
+    product_catalog.invalidate()
+
+
+def seed_orders(order_count: int, users_per_order: float = 0.2, seed: int = 1) -> None:
+    """
+    Erzeugt order_count Bestellungen mit je 1-3 Positionen in der aktuellen Bestellwoche
+    (ca. order_count * users_per_order User) und baut die Wochensummen neu auf.
+    """
+    rng = random.Random(seed)
+    period = get_current_period()
+    user_count = max(1, int(order_count * users_per_order))
+    with db_session() as session:
+        session.execute(insert(User), [
+            {'slack_id': f"U{i:05d}", 'name': f"User {i:05d}", 'gets_orders': i % 10 == 0}
+            for i in range(user_count)
+        ])
+        product_ids = [product.product_id for product in session.query(Product).all()]
+        span = int((period.next_start - period.start).total_seconds())
+        session.execute(insert(Order), [
+            {'order_id': i + 1, 'user_id': rng.randint(1, user_count),
+             'order_date': period.start + timedelta(seconds=rng.randrange(span))}
+            for i in range(order_count)
+        ])
+        session.execute(insert(OrderItem), [
+            {'order_id': order_id, 'product_id': product_id, 'quantity': rng.randint(1, 5)}
+            for order_id in range(1, order_count + 1)
+            for product_id in rng.sample(product_ids, rng.randint(1, 3))
+        ])
+        WeeklyTotalsService(session).rebuild(period)
@@ -0,0 +1,50 @@
+#==========================
+# benchmarks/bench_order_parsing.py
+#==========================
+"""
+Micro-Benchmark für die Bestell-Grammatik und die Produktsuche (ohne Datenbankzugriff,
+der Katalog ist nach dem ersten Aufruf warm).
+Start: python -m benchmarks.bench_order_parsing [--rounds 20000]
+"""
+
+import argparse
+import time
+from benchmarks._setup import PRODUCTS, reset_database
+from app.core.order_grammar import parse_items
+from app.core.product_search import product_search
+from app.utils.db.database import track_queries
+
+CASES = {
+    'exakt, 1 Position': 'vollkorn 2',
+    'exakt, 3 Positionen': 'vollkorn 2, 3x brötchen, laugen stange x1',
+    'Umlaut/Tippfehler, 3 Positionen': 'brotchen 2, vollkron 1, 2 croisant',
+    'Duplikate, 6 Positionen': 'vollkorn 1, vollkorn 2, 1x brötchen, brötchen x3, croissant 1, 2 croissant',
+}
+
+
+def _bench(label: str, rounds: int, call) -> None:
+    call()  # Katalog und Suchindex aufwärmen
+    with track_queries('bench.parse', budget=0) as stats:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            call()
+        elapsed = time.perf_counter() - started
+    print(f"{label:<36} {elapsed / rounds * 1e6:8.1f} µs/Aufruf  {stats.statements} SQL-Statements")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=20000)
+    args = parser.parse_args()
+
+    for extra in (0, 200):
+        # Kleiner Katalog wie in Produktion und ein großer Katalog für den Suchbaum
+        reset_database(PRODUCTS + [f"Spezial {i:03d}" for i in range(extra)])
+        print(f"\nKatalog mit {len(PRODUCTS) + extra} Produkten")
+        for label, text in CASES.items():
+            _bench(label, args.rounds, lambda: parse_items(text))
+        _bench('match() ohne Treffer (Vorschläge)', args.rounds, lambda: product_search.match('xyzzyq'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#==========================
+# benchmarks/bench_weekly_summary.py
+#==========================
+"""
+Benchmark der Wochenübersicht (OrderService.get_weekly_summary) gegen eine SQLite-Datenbank
+mit 100, 1.000 und 10.000 Bestellungen der aktuellen Woche.
+Verglichen werden:
+- legacy: ursprüngliche Umsetzung (alle Orders laden, user/items/product einzeln nachladen)
+- group_by: eine GROUP-BY-Abfrage über orders/orderItem (Umsetzung aus user-001)
+- weekly_totals: aktuelle Umsetzung über die vorberechneten Wochensummen
+Gemessen werden SQL-Statements (Round Trips) und Laufzeit; alle Varianten müssen dasselbe liefern.
+Start: python -m benchmarks.bench_weekly_summary [--sizes 100 1000 10000]
+"""
+
+import argparse
+import time
+from typing import Dict, List
+from sqlalchemy import func
+from benchmarks._setup import reset_database, seed_orders
+from app.models import Order, OrderItem, Product, User
+from app.core.order_period import get_current_period
+from app.core.order_service import OrderService
+from app.utils.db.database import db_session, track_queries
+
+
+def legacy_summary(session) -> List[Dict]:
+    """Ursprüngliche Umsetzung vor user-001 (N+1-Nachladen, lineare Suche pro Position)."""
+    period = get_current_period()
+    orders = session.query(Order).filter(period.covers(Order.order_date)).distinct().all()
+    product_totals, user_orders = {}, {}
+    for order in orders:
+        user_name = order.user.name or "Unbekannt"
+        for item in order.items:
+            name = item.product.name
+            product_totals[name] = product_totals.get(name, 0) + item.quantity
+            user_orders.setdefault(name, [])
+            if user_name not in [u['name'] for u in user_orders[name]]:
+                user_orders[name].append({'name': user_name, 'quantity': item.quantity})
+            else:
+                for user_order in user_orders[name]:
+                    if user_order['name'] == user_name:
+                        user_order['quantity'] += item.quantity
+    return [{
+        'name': name,
+        'quantity': quantity,
+        'users': sorted(user_orders[name], key=lambda x: x['name'])
+    } for name, quantity in sorted(product_totals.items())]
+
+
+def group_by_summary(session) -> List[Dict]:
+    """Umsetzung aus user-001: eine Aggregation nach (Produkt, User) über die Rohdaten."""
+    period = get_current_period()
+    rows = (
+        session.query(Product.name, User.name, func.sum(OrderItem.quantity))
+        .join(OrderItem.order)
+        .join(Order.user)
+        .join(OrderItem.product)
+        .filter(period.covers(Order.order_date))
+        .group_by(Product.product_id, Product.name, User.user_id, User.name)
+        .all()
+    )
+    product_totals: Dict[str, int] = {}
+    user_orders: Dict[str, Dict[str, int]] = {}
+    for product_name, user_name, quantity in rows:
+        user_name = user_name or "Unbekannt"
+        product_totals[product_name] = product_totals.get(product_name, 0) + int(quantity)
+        users = user_orders.setdefault(product_name, {})
+        users[user_name] = users.get(user_name, 0) + int(quantity)
+    return [{
+        'name': name,
+        'quantity': quantity,
+        'users': [{'name': n, 'quantity': q} for n, q in sorted(user_orders[name].items())]
+    } for name, quantity in sorted(product_totals.items())]
+
+
+VARIANTS = {
+    'legacy': legacy_summary,
+    'group_by': group_by_summary,
+    'weekly_totals': lambda session: OrderService(session).get_weekly_summary(),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'Orders':>7}  {'Variante':<14} {'Statements':>10} {'Zeit (ms)':>10}")
+    for size in args.sizes:
+        reset_database()
+        seed_orders(size)
+        results = {}
+        for name, variant in VARIANTS.items():
+            with db_session(readonly=True) as session:
+                with track_queries(f"bench.{name}", budget=1_000_000) as stats:
+                    started = time.perf_counter()
+                    results[name] = variant(session)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"{size:>7}  {name:<14} {stats.statements:>10} {elapsed_ms:>10.1f}")
+        assert results['legacy'] == results['group_by'] == results['weekly_totals'], "Ergebnisse weichen ab"
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@
 #==========================
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List, Optional
 from dotenv import load_dotenv
 import os
 
@@ -17,9 +17,11 @@ class SlackConfig:
     Wird automatisch aus Umgebungsvariablen geladen.
     - BOT_TOKEN: Slack Bot Token
     - SIGNING_SECRET: Slack Signing Secret
+    - API_URL: Basis-URL der Slack Web API (für Tests auf einen lokalen Fake-Server umstellbar)
     """
     BOT_TOKEN: str = os.getenv('SLACK_BOT_TOKEN', '')
     SIGNING_SECRET: str = os.getenv('SLACK_SIGNING_SECRET', '')
+    API_URL: str = os.getenv('SLACK_API_URL', 'https://slack.com/api/')
 
 @dataclass
 class DatabaseConfig:
@@ -33,6 +35,9 @@ class DatabaseConfig:
     - POOL_TIMEOUT: Timeout für Pool-Verbindungen
     - POOL_RECYCLE: Zeit bis zur Wiederverwendung einer Verbindung
     - POOL_PRE_PING: Verbindung vor Nutzung prüfen
+    - REPLICA_URLS: Optionale Read-Replicas (kommagetrennt in DATABASE_REPLICA_URLS)
+    - REPLICA_MAX_LAG: Maximale Replikationsverzögerung (Sekunden), bis zu der eine Replica genutzt wird
+    - REPLICA_CHECK_INTERVAL: Abstand (Sekunden) zwischen zwei Messungen der Verzögerung
     """
     URL: str = os.getenv('DATABASE_URL', '')
     ECHO: bool = False
@@ -41,6 +46,11 @@ class DatabaseConfig:
     POOL_TIMEOUT: int = 30
     POOL_RECYCLE: int = 3600
     POOL_PRE_PING: bool = True
+    REPLICA_URLS: List[str] = field(default_factory=lambda: [
+        url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+    ])
+    REPLICA_MAX_LAG: float = 5.0
+    REPLICA_CHECK_INTERVAL: float = 10.0
 
 @dataclass
 class Settings:
@@ -49,15 +59,70 @@ class Settings:
     - DEBUG: Debug-Modus (True/False)
     - REMINDER_HOUR: Stunde für tägliche Erinnerungen
     - REMINDER_MINUTE: Minute für tägliche Erinnerungen
+    - REMINDER_FULL_RELOAD_MINUTES: Abstand, in dem der Index der persönlichen Erinnerungen vollständig neu geladen wird
+    - ORDER_CUTOFF_WEEKDAY: Wochentag, an dem die Bestellwoche wechselt (0 = Montag, 2 = Mittwoch)
+    - ORDER_CUTOFF_HOUR: Stunde, zu der die Bestellwoche am Stichtag wechselt
+    - USER_CACHE_TTL: Gültigkeit (Sekunden) der gecachten User-Identitäten
+    - PRODUCT_CATALOG_TTL_SECONDS: Nach dieser Zeit lädt jeder Prozess den Produktkatalog neu
+    - HOME_VIEW_PUBLISH_TTL_SECONDS: So lange wird eine unveränderte Home-View nicht erneut veröffentlicht
+    - COMMAND_WORKERS: Anzahl Worker-Threads für Slash-Commands
+    - COMMAND_QUEUE_SIZE: Anzahl wartender Commands, bevor "ausgelastet" gemeldet wird
+    - COMMAND_BUSY_RETRY_SECONDS: Wartezeit auf einen freien Platz bei voller Warteschlange
+    - COMMAND_DRAIN_TIMEOUT: Maximale Wartezeit beim Herunterfahren für laufende Commands
+    - SLACK_POST_RATE / SLACK_POST_BURST: Token-Bucket für chat.postMessage (pro Sekunde / Burst)
+    - SLACK_DELIVERY_WORKERS: Parallele Worker beim Massenversand (Erinnerungen, Wochenübersicht)
+    - SLACK_INTERACTIVE_RESERVE: Anteil jedes Token-Buckets, den der Massenversand nicht nutzen darf
+      (reserviert für Antworten auf User-Aktionen)
+    - SLACK_DELIVERY_MAX_ATTEMPTS: Maximale Zustellversuche pro Nachricht
+    - QUERY_BUDGET: Maximale Anzahl SQL-Statements pro Command/Job, darüber wird gewarnt
+    - SCHEDULER_LEASE_SECONDS: Gültigkeit der Leader-Lease des Schedulers (Übernahmezeit bei Ausfall)
+    - SCHEDULER_RENEW_SECONDS: Abstand, in dem die Lease verlängert bzw. eine Übernahme versucht wird
+    - SCHEDULER_MISFIRE_GRACE_SECONDS: So lange wird ein verpasster Job-Lauf (z.B. bei Leader-Wechsel) nachgeholt
+    - SLACK_DEDUP_TTL_SECONDS: So lange werden Slack-Requests für die Erkennung von Wiederholungen gemerkt
+    - SLACK_DEDUP_MAX_ENTRIES: Maximale Anzahl lokal gemerkter Requests pro Prozess (LRU)
+    - OUTBOX_POLL_SECONDS: Abstand, in dem der Outbox-Dispatcher nach neuen Nachrichten schaut
+    - OUTBOX_BATCH_SIZE: Maximale Anzahl Nachrichten pro Durchlauf des Dispatchers
+    - OUTBOX_MAX_ATTEMPTS: Zustellversuche pro Outbox-Nachricht, danach Status 'failed'
+    - OUTBOX_RETENTION_HOURS: So lange bleiben zugestellte Outbox-Nachrichten in der Tabelle
+    - OUTBOX_FAILED_RETENTION_HOURS: So lange bleiben gescheiterte und überholte Outbox-Nachrichten in der Tabelle
+    - ORDER_CONFIRMATION_COALESCE_SECONDS: Innerhalb dieser Zeit nach der letzten Bestellbestätigung
+      wird diese aktualisiert statt eine neue Nachricht zu senden
     - SLACK: SlackConfig-Objekt
     - DATABASE: DatabaseConfig-Objekt
     """
     DEBUG: bool = True
     REMINDER_HOUR: int = 9
     REMINDER_MINUTE: int = 0
+    REMINDER_FULL_RELOAD_MINUTES: int = 60
     WEEKLY_SUMMARY_HOUR: int = 9
     WEEKLY_SUMMARY_MINUTE: int = 30
     WEEKLY_SUMMARY_DAY: str = 'wed'  # Wochentag für die Zusammenfassung
+    ORDER_CUTOFF_WEEKDAY: int = 2  # Bestellwoche beginnt mittwochs ...
+    ORDER_CUTOFF_HOUR: int = 10    # ... um 10:00 Uhr
+    USER_CACHE_TTL: int = 300      # Sekunden, die eine User-Identität im Cache bleibt
+    PRODUCT_CATALOG_TTL_SECONDS: int = 60
+    HOME_VIEW_PUBLISH_TTL_SECONDS: int = 60
+    COMMAND_WORKERS: int = 8
+    COMMAND_QUEUE_SIZE: int = 50
+    COMMAND_BUSY_RETRY_SECONDS: float = 5.0
+    COMMAND_DRAIN_TIMEOUT: float = 20.0
+    SLACK_POST_RATE: float = 10.0
+    SLACK_POST_BURST: float = 20.0
+    SLACK_DELIVERY_WORKERS: int = 4
+    SLACK_INTERACTIVE_RESERVE: float = 0.25
+    SLACK_DELIVERY_MAX_ATTEMPTS: int = 5
+    QUERY_BUDGET: int = 20
+    SCHEDULER_LEASE_SECONDS: int = 15
+    SCHEDULER_RENEW_SECONDS: int = 5
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = 600
+    SLACK_DEDUP_TTL_SECONDS: int = 900   # Slack wiederholt bis zu 3x innerhalb von ca. 5 Minuten
+    SLACK_DEDUP_MAX_ENTRIES: int = 10000
+    OUTBOX_POLL_SECONDS: float = 0.5
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETENTION_HOURS: int = 24
+    OUTBOX_FAILED_RETENTION_HOURS: int = 168
+    ORDER_CONFIRMATION_COALESCE_SECONDS: int = 120
     SLACK: SlackConfig = field(default_factory=SlackConfig)
     DATABASE: DatabaseConfig = field(default_factory=DatabaseConfig)
 
@@ -0,0 +1,36 @@
+#==========================
+# tests/conftest.py
+#==========================
+
+import os
+import tempfile
+
+# Eigene SQLite-Datenbank für die Tests; muss vor dem ersten Import von config gesetzt sein
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='brotbot-tests-'), 'test.db')}"
+os.environ.setdefault('SLACK_BOT_TOKEN', 'xoxb-test')
+os.environ.setdefault('SLACK_SIGNING_SECRET', 'test')
+
+import pytest
+from app.models import Base, Product, User
+from app.utils.db.database import db_session, engine
+from app.core.home_view_cache import home_view_cache
+from app.core.product_catalog import product_catalog
+from app.core.user_directory import user_directory
+
+PRODUCTS = ['Brötchen', 'Vollkorn', 'Laugen Stange', 'Croissant']
+
+
+@pytest.fixture
+def db():
+    """Leere Datenbank mit den Standardprodukten und einem registrierten User (U1, Anna)."""
+    Base.metadata.create_all(engine)
+    with db_session() as session:
+        session.add_all([Product(name=name, active=True) for name in PRODUCTS])
+        session.add(User(slack_id='U1', name='Anna'))
+    product_catalog.invalidate()
+    user_directory.invalidate()
+    yield
+    with home_view_cache._lock:
+        home_view_cache._entries.clear()
+        home_view_cache._published.clear()
+    Base.metadata.drop_all(engine)
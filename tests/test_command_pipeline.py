@@ -0,0 +1,87 @@
+#==========================
+# tests/test_command_pipeline.py
+#==========================
+
+import time
+from threading import Event
+from app.utils.workers.command_pipeline import CommandPipeline
+
+
+def _pipeline(max_workers=1, max_queue=1, busy_retry_seconds=0.05):
+    return CommandPipeline('test-commands', max_workers, max_queue, busy_retry_seconds)
+
+
+def test_full_queue_sends_busy_reply_and_rejects():
+    pipeline = _pipeline()
+    release = Event()
+    busy_replies = []
+    # Ein laufender und ein wartender Command belegen alle Plätze
+    assert pipeline.submit(release.wait)
+    assert pipeline.submit(lambda: None)
+    assert pipeline.queue_depth == 2
+
+    assert not pipeline.submit(lambda: None, on_busy=lambda: busy_replies.append('busy'))
+    assert busy_replies == ['busy']
+    release.set()
+    pipeline.shutdown(timeout=2)
+
+
+def test_busy_command_runs_when_a_slot_frees_up_in_time():
+    pipeline = _pipeline(busy_retry_seconds=2)
+    release = Event()
+    ran, busy_replies = Event(), []
+    pipeline.submit(release.wait)
+    pipeline.submit(lambda: None)
+
+    # Den ersten Command kurz nach der "ausgelastet"-Antwort freigeben
+    def on_busy():
+        busy_replies.append('busy')
+        release.set()
+
+    assert pipeline.submit(ran.set, on_busy=on_busy)
+    assert ran.wait(2)
+    assert busy_replies == ['busy']
+    pipeline.shutdown(timeout=2)
+
+
+def test_failing_command_frees_its_slot():
+    pipeline = _pipeline(max_queue=0, busy_retry_seconds=2)
+
+    def fail():
+        raise RuntimeError('boom')
+
+    assert pipeline.submit(fail)
+    done = Event()
+    # Wartet höchstens busy_retry_seconds auf den Platz des gescheiterten Commands
+    assert pipeline.submit(done.set)
+    assert done.wait(2)
+    pipeline.shutdown(timeout=2)
+    assert pipeline.queue_depth == 0
+
+
+def test_shutdown_drains_accepted_commands_and_rejects_new_ones():
+    pipeline = _pipeline(max_workers=2, max_queue=4)
+    finished = []
+
+    def slow(i):
+        time.sleep(0.05)
+        finished.append(i)
+
+    for i in range(5):
+        assert pipeline.submit(lambda i=i: slow(i))
+    pipeline.shutdown(timeout=5)
+
+    assert sorted(finished) == list(range(5))
+    assert pipeline.queue_depth == 0
+    assert not pipeline.submit(lambda: None)
+
+
+def test_shutdown_gives_up_after_timeout():
+    pipeline = _pipeline()
+    release = Event()
+    pipeline.submit(release.wait)
+    started = time.monotonic()
+    pipeline.shutdown(timeout=0.1)
+    assert time.monotonic() - started < 1
+    assert pipeline.queue_depth == 1
+    release.set()
@@ -0,0 +1,72 @@
+#==========================
+# tests/test_leader_election.py
+#==========================
+
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.models import SchedulerLease
+from app.utils.db.database import db_session
+from app.utils.workers.leader_election import LeaderElection
+
+
+def _election():
+    return LeaderElection('test', lease_seconds=30, renew_seconds=10)
+
+
+def _lease():
+    with db_session() as session:
+        lease = session.get(SchedulerLease, 'test')
+        return lease.holder, lease.expires_at
+
+
+def test_first_heartbeat_creates_lease_and_renews_it(db):
+    leader, standby = _election(), _election()
+    leader.heartbeat()
+    standby.heartbeat()
+    assert leader.is_leader() and not standby.is_leader()
+
+    # Ablauf künstlich vorziehen; das Verlängern setzt ihn wieder lease_seconds in die Zukunft
+    with db_session() as session:
+        session.execute(update(SchedulerLease).values(expires_at=datetime.now() + timedelta(seconds=5)))
+    leader.heartbeat()
+    holder, expires_at = _lease()
+    assert holder == leader.holder
+    assert expires_at > datetime.now() + timedelta(seconds=20)
+
+
+def test_standby_takes_over_expired_lease(db):
+    leader, standby = _election(), _election()
+    leader.heartbeat()
+    standby.heartbeat()
+    assert not standby.is_leader()
+
+    with db_session() as session:
+        session.execute(update(SchedulerLease).values(expires_at=datetime.now() - timedelta(seconds=5)))
+    standby.heartbeat()
+    assert standby.is_leader()
+    assert _lease()[0] == standby.holder
+
+
+def test_released_lease_is_taken_over(db):
+    leader, standby = _election(), _election()
+    leader.heartbeat()
+    leader.stop()
+    assert not leader.is_leader()
+    assert _lease()[1] <= datetime.now()
+
+    with db_session() as session:
+        # release() setzt den Ablauf auf "jetzt" (SQLite: sekundengenau); eine Sekunde später ist er vorbei
+        session.execute(update(SchedulerLease).values(expires_at=datetime.now() - timedelta(seconds=1)))
+    standby.heartbeat()
+    assert _lease()[0] == standby.holder
+
+
+def test_losing_concurrent_insert_does_not_elect(db):
+    winner, loser = _election(), _election()
+    # Beide sahen noch keine Lease; der Gewinner legt sie zuerst an
+    assert winner._create_lease()
+    assert not loser._create_lease()
+    assert _lease()[0] == winner.holder
+    loser.heartbeat()
+    assert not loser.is_leader()
+
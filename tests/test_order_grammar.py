@@ -0,0 +1,128 @@
+#==========================
+# tests/test_order_grammar.py
+#==========================
+
+import random
+import pytest
+from app.core.order_grammar import format_items, parse_items, strip_sub_command
+from app.core.product_search import damerau_levenshtein, product_search
+from app.utils.constants.error_types import OrderError
+from tests.conftest import PRODUCTS
+
+
+def _as_dict(items):
+    return {item['name']: item['quantity'] for item in items}
+
+
+@pytest.mark.parametrize('text', [
+    'vollkorn 2', '2 vollkorn', '2x vollkorn', '2 x vollkorn', 'vollkorn x2', 'vollkorn 2x', '2 * vollkorn',
+])
+def test_quantity_first_and_last(db, text):
+    assert parse_items(text) == [{'name': 'Vollkorn', 'quantity': 2}]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('brotchen 2', 'Brötchen'),
+    ('Broetchen 2', 'Brötchen'),
+    ('BRÖTCHEN 2', 'Brötchen'),
+    ('laugen stange 3', 'Laugen Stange'),
+    ('3x Laugenstange', 'Laugen Stange'),
+    ('vollkron 1', 'Vollkorn'),
+])
+def test_umlauts_multi_word_and_typos(db, text, expected):
+    assert _as_dict(parse_items(text)) == {expected: int(''.join(c for c in text if c.isdigit()))}
+
+
+def test_duplicates_are_merged(db):
+    items = parse_items('vollkorn 2, 1x Vollkorn; brötchen 1\nvollkorn x3')
+    assert _as_dict(items) == {'Vollkorn': 6, 'Brötchen': 1}
+
+
+def test_unknown_product_suggests_nearby(db):
+    with pytest.raises(OrderError) as error:
+        parse_items('croisan 2')
+    assert 'Meintest du: Croissant?' in str(error.value)
+
+
+def test_all_errors_are_reported_together(db):
+    with pytest.raises(OrderError) as error:
+        parse_items('vollkorn, 2 brötchen 3, xyzzyqq 1, croissant 0')
+    message = str(error.value)
+    assert 'Menge fehlt bei: vollkorn' in message
+    assert 'Ungültiges Format bei: 2 brötchen 3' in message
+    assert 'Produkt xyzzyqq nicht gefunden' in message
+    assert 'Ungültige Menge für croissant' in message
+
+
+def test_empty_input(db):
+    with pytest.raises(OrderError):
+        parse_items('  ,  ')
+
+
+def _spellings(name: str, rng: random.Random) -> str:
+    """Zufällige, gleichwertige Schreibweise eines Produktnamens."""
+    variant = rng.choice([
+        name,
+        name.lower(),
+        name.upper(),
+        name.replace('ö', 'oe'),
+        name.replace(' ', ''),
+        f"  {name}  ".replace(' ', '  '),
+    ])
+    return variant
+
+
+def _position(name: str, quantity: int, rng: random.Random) -> str:
+    return rng.choice([
+        f"{name} {quantity}",
+        f"{quantity} {name}",
+        f"{quantity}x {name}",
+        f"{quantity} x {name}",
+        f"{name} x{quantity}",
+        f"{name} {quantity}x",
+    ])
+
+
+def test_property_random_orders_parse_to_their_totals(db):
+    """Eigenschaft: beliebig geschriebene und gemischte Positionen ergeben genau die erwarteten Summen."""
+    rng = random.Random(20240117)
+    for _ in range(300):
+        positions, expected = [], {}
+        for _ in range(rng.randint(1, 6)):
+            name = rng.choice(PRODUCTS)
+            quantity = rng.randint(1, 25)
+            expected[name] = expected.get(name, 0) + quantity
+            positions.append(_position(_spellings(name, rng), quantity, rng))
+        text = rng.choice([', ', ',', '; ', '\n']).join(positions)
+        assert _as_dict(parse_items(text)) == expected, text
+
+
+def test_property_format_items_round_trip(db):
+    """Eigenschaft: die kanonische Schreibweise (gespeicherte Bestellungen) wird wieder gleich geparst."""
+    rng = random.Random(7)
+    for _ in range(100):
+        items = [{'name': name, 'quantity': rng.randint(1, 9)} for name in rng.sample(PRODUCTS, rng.randint(1, 4))]
+        assert parse_items(format_items(items)) == items
+
+
+def test_property_single_typo_still_matches(db):
+    """Eigenschaft: eine vertauschte Buchstabenfolge in einem langen Namen wird noch erkannt."""
+    rng = random.Random(3)
+    for name in ['Vollkorn', 'Croissant', 'Laugen Stange']:
+        for _ in range(20):
+            i = rng.randrange(1, len(name) - 2)
+            typo = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+            assert product_search.match(typo).product.name == name, typo
+
+
+def test_damerau_levenshtein():
+    assert damerau_levenshtein('vollkron', 'vollkorn') == 1
+    assert damerau_levenshtein('', 'abc') == 3
+    assert damerau_levenshtein('kitten', 'sitting') == 3
+    assert damerau_levenshtein('abc', 'abc') == 0
+
+
+def test_strip_sub_command():
+    assert strip_sub_command('add vollkorn 2', 'add') == 'vollkorn 2'
+    with pytest.raises(OrderError):
+        strip_sub_command('remove vollkorn 2', 'add')
@@ -0,0 +1,187 @@
+#==========================
+# tests/test_outbox.py
+#==========================
+
+import itertools
+from datetime import datetime, timedelta
+import pytest
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+from sqlalchemy import select, update
+from app.core.outbox_service import OutboxService
+from app.models import OutboxMessage
+from app.utils.db.database import db_session
+from app.utils.slack.outbox import OutboxDispatcher
+from app.utils.slack.rate_limits import RateLimiter
+
+
+def _response(data, status_code=200, headers=None):
+    return SlackResponse(client=None, http_verb='POST', api_url='', req_args={},
+                         data=data, headers=headers or {}, status_code=status_code)
+
+
+class FakeClient:
+    """Zeichnet alle Aufrufe auf; failures: Liste von Fehlern (Exception oder None), je Aufruf verbraucht."""
+
+    def __init__(self, failures=()):
+        self.calls = []
+        self.failures = list(failures)
+        self._ts = itertools.count(1)
+
+    def _call(self, method, channel, **kwargs):
+        self.calls.append((method, channel, kwargs))
+        failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            raise failure
+        # Slack antwortet bei einer DM an U… mit dem DM-Channel D…
+        return _response({'ok': True, 'ts': f"{next(self._ts)}.000", 'channel': 'D' + channel[1:]})
+
+    def chat_postMessage(self, channel, **kwargs):
+        return self._call('chat_postMessage', channel, **kwargs)
+
+    def chat_update(self, channel, **kwargs):
+        return self._call('chat_update', channel, **kwargs)
+
+
+def _slack_error(error, status_code=200, headers=None):
+    return SlackApiError(error, _response({'ok': False, 'error': error}, status_code, headers))
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = OutboxDispatcher(poll_seconds=0.1, batch_size=10, max_attempts=3, workers=2,
+                                  limiter=RateLimiter(limits={}))
+    dispatcher.client = FakeClient()
+    return dispatcher
+
+
+def _enqueue(channel='U1', text='hi', method='chat_postMessage', **kwargs):
+    with db_session() as session:
+        message = OutboxService(session).enqueue(method, channel, text=text, **kwargs)
+        session.flush()
+        return message.message_id
+
+
+def _message(message_id):
+    with db_session() as session:
+        message = session.get(OutboxMessage, message_id)
+        session.expunge(message)
+        return message
+
+
+def _delay(message_id, seconds):
+    with db_session() as session:
+        session.execute(
+            update(OutboxMessage).where(OutboxMessage.message_id == message_id)
+            .values(available_at=datetime.now() + timedelta(seconds=seconds))
+        )
+
+
+def test_drain_sends_in_order_per_channel(db, dispatcher):
+    ids = [_enqueue('U1', 'a'), _enqueue('U2', 'b'), _enqueue('U1', 'c')]
+    assert dispatcher.drain() == 3
+    sent = [(channel, kwargs['text']) for _, channel, kwargs in dispatcher.client.calls]
+    assert [text for channel, text in sent if channel == 'U1'] == ['a', 'c']
+    assert all(_message(message_id).status == 'sent' for message_id in ids)
+
+
+def test_backoff_on_one_channel_does_not_block_other_channels(db, dispatcher):
+    dispatcher.batch_size = 2
+    waiting = [_enqueue('U1', f"w{i}") for i in range(3)]
+    _delay(waiting[0], 60)
+    other = _enqueue('U2', 'other')
+
+    assert dispatcher.drain() == 1
+    assert [channel for _, channel, _ in dispatcher.client.calls] == ['U2']
+    assert _message(other).status == 'sent'
+    # Die Nachrichten hinter der wartenden bleiben in Reihenfolge zurück
+    assert [_message(message_id).status for message_id in waiting] == ['pending'] * 3
+
+
+def test_transient_error_backs_off_then_fails(db, dispatcher):
+    dispatcher.client.failures = [RuntimeError('timeout')] * 3
+    message_id = _enqueue()
+
+    assert dispatcher.drain() == 0
+    message = _message(message_id)
+    assert (message.status, message.attempts, message.last_error) == ('pending', 1, 'timeout')
+    assert message.available_at > datetime.now()
+    # Im Backoff wird die Nachricht nicht erneut geladen
+    assert dispatcher.drain() == 0
+    assert len(dispatcher.client.calls) == 1
+
+    for _ in range(2):
+        _delay(message_id, -1)
+        dispatcher.drain()
+    message = _message(message_id)
+    assert (message.status, message.attempts) == ('failed', 3)
+
+
+def test_permanent_error_fails_immediately(db, dispatcher):
+    dispatcher.client.failures = [_slack_error('channel_not_found')]
+    message_id = _enqueue()
+    dispatcher.drain()
+    assert _message(message_id).status == 'failed'
+
+
+def test_rate_limit_does_not_count_as_attempt(db, dispatcher):
+    dispatcher.client.failures = [_slack_error('ratelimited', 429, {'Retry-After': '0'})]
+    message_id = _enqueue()
+    dispatcher.drain()
+    message = _message(message_id)
+    assert (message.status, message.attempts) == ('pending', 0)
+
+
+def test_coalesced_update_uses_ts_and_dm_channel_of_root(db, dispatcher):
+    root = _enqueue('U1', 'first', kind='order_confirmation')
+    dispatcher.drain()
+    with db_session() as session:
+        target = OutboxService(session).coalescing_target('U1', 'order_confirmation', 120)
+    first_id = _enqueue('U1', 'second', 'chat_update', kind='order_confirmation', update_of=target)
+    _enqueue('U1', 'third', 'chat_update', kind='order_confirmation', update_of=root)
+
+    assert target == root
+    assert _message(first_id).status == 'superseded'
+    dispatcher.drain()
+    method, channel, kwargs = dispatcher.client.calls[-1]
+    assert (method, channel, kwargs['text']) == ('chat_update', 'D1', 'third')
+    assert kwargs['ts'] == _message(root).sent_ts
+
+
+def test_failed_update_is_reposted_and_becomes_root(db, dispatcher):
+    root = _enqueue('U1', 'first', kind='order_confirmation')
+    dispatcher.drain()
+    update_id = _enqueue('U1', 'second', 'chat_update', kind='order_confirmation', update_of=root)
+    dispatcher.client.failures = [_slack_error('message_not_found')]
+    dispatcher.drain()
+
+    assert [call[0] for call in dispatcher.client.calls[-2:]] == ['chat_update', 'chat_postMessage']
+    message = _message(update_id)
+    assert (message.status, message.update_of) == ('sent', None)
+
+
+def test_purge_removes_old_failed_and_superseded_but_keeps_referenced(db, dispatcher):
+    old = datetime.now() - timedelta(days=30)
+    referenced = _enqueue('U1', 'root', kind='order_confirmation')
+    failed = _enqueue('U2', 'failed')
+    superseded = _enqueue('U3', 'superseded')
+    recent = _enqueue('U4', 'recent failure')
+    with db_session() as session:
+        session.execute(
+            update(OutboxMessage).where(OutboxMessage.message_id.in_([referenced, failed]))
+            .values(status='failed', created_at=old)
+        )
+        session.execute(
+            update(OutboxMessage).where(OutboxMessage.message_id == superseded)
+            .values(status='superseded', created_at=old)
+        )
+        session.execute(update(OutboxMessage).where(OutboxMessage.message_id == recent).values(status='failed'))
+        # Ein offenes Update verweist noch auf die gescheiterte ursprüngliche Nachricht
+        session.add(OutboxMessage(channel='U1', method='chat_update', payload='{}', update_of=referenced,
+                                  available_at=datetime.now() + timedelta(hours=1)))
+
+    dispatcher._purge()
+    with db_session() as session:
+        remaining = set(session.execute(select(OutboxMessage.message_id)).scalars())
+    assert referenced in remaining and recent in remaining
+    assert failed not in remaining and superseded not in remaining
@@ -0,0 +1,51 @@
+#==========================
+# tests/test_query_budgets.py
+#==========================
+
+from app.core.home_view_cache import home_view_cache
+from app.core.order_service import OrderService
+from app.core.user_directory import user_directory
+from app.utils.db.database import assert_max_queries, db_session
+
+ITEMS = [{'name': 'Vollkorn', 'quantity': 2}, {'name': 'Brötchen', 'quantity': 3}]
+
+
+def _add_order(items=ITEMS):
+    with db_session() as session:
+        return OrderService(session).add_order('U1', items)
+
+
+def test_add_order_budget_cold_caches(db):
+    # User + Katalog laden, INSERT orders, INSERT orderItem (bulk), 1 Upsert je Produkt
+    with assert_max_queries(6, 'add_order'):
+        _add_order()
+
+
+def test_add_order_budget_grows_only_with_distinct_products(db):
+    _add_order()
+    items = [{'name': name, 'quantity': 1} for name in ('Vollkorn', 'Brötchen', 'Laugen Stange', 'Croissant')]
+    # Warme Caches: INSERT orders, INSERT orderItem (bulk), 4 Upserts
+    with assert_max_queries(2 + len(items), 'add_order'):
+        _add_order(items)
+
+
+def test_remove_items_budget(db):
+    _add_order()
+    _add_order()
+    # Orders der Woche, OrderItems des Produkts, DELETE + UPDATE der zwei betroffenen Items,
+    # UPDATE + DELETE weekly_totals
+    with assert_max_queries(6, 'remove_items'):
+        with db_session() as session:
+            OrderService(session).remove_items('U1', [{'name': 'Vollkorn', 'quantity': 3}])
+
+
+def test_home_view_render_budget(db):
+    _add_order()
+    user_directory.invalidate()
+    # Cache-Miss: User + Wochensummen
+    with assert_max_queries(2, 'home_view.render'):
+        home_view_cache.render('U1')
+    # Cache-Treffer: nur der Datenstand (Wochensummen), die Blocks werden nicht neu gebaut
+    with assert_max_queries(1, 'home_view.render'):
+        entry = home_view_cache.render('U1')
+    assert home_view_cache.render('U1') is entry
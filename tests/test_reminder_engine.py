@@ -0,0 +1,119 @@
+#==========================
+# tests/test_reminder_engine.py
+#==========================
+
+from datetime import datetime, time as dt_time, timedelta
+import pytest
+from sqlalchemy import delete, update
+from app.core.reminder_engine import ReminderEngine, ReminderIndex, parse_weekdays, reminder_buckets
+from app.models import Reminder, User
+from app.utils.db.database import db_session
+from config.app_config import settings
+
+# Mittwoch, 12:00 (Minute 720)
+NOON = datetime(2026, 10, 14, 12, 0)
+
+
+class FakeClient:
+    def __init__(self):
+        self.sent = []
+
+    def chat_postMessage(self, **kwargs):
+        self.sent.append(kwargs['channel'])
+        return {'ok': True}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('mo-fr', {0, 1, 2, 3, 4}),
+    ('fr-mo', {4, 5, 6, 0}),
+    ('1,3', {1, 3}),
+    ('Montag Mittwoch', {0, 2}),
+    ('', set()),
+])
+def test_parse_weekdays(text, expected):
+    assert parse_weekdays(text) == expected
+
+
+def test_daily_reminder_without_weekdays_fills_every_day_at_default_time():
+    minute = settings.REMINDER_HOUR * 60 + settings.REMINDER_MINUTE
+    assert reminder_buckets('daily', None, None) == {(day, minute) for day in range(7)}
+
+
+def test_weekly_reminder_uses_its_weekdays_and_time():
+    assert reminder_buckets('weekly', 'mi', dt_time(9, 30)) == {(2, 570)}
+
+
+@pytest.mark.parametrize('reminder_type, weekdays', [('weekly', None), ('monthly', 'mo'), ('daily', 'xx')])
+def test_invalid_reminders_raise(reminder_type, weekdays):
+    with pytest.raises(ValueError):
+        reminder_buckets(reminder_type, weekdays, None)
+
+
+def test_index_apply_replaces_buckets_and_remove_clears_them():
+    index = ReminderIndex()
+    index.apply(1, 'U1', 'Brötchen', {(2, 720), (3, 720)})
+    index.apply(2, 'U1', 'Kaffee', {(2, 720)})
+    assert sorted(index.recipients((2, 720))['U1']) == ['Brötchen', 'Kaffee']
+
+    index.apply(1, 'U1', 'Brötchen', {(4, 720)})
+    assert index.recipients((3, 720)) == {}
+    assert index.recipients((4, 720)) == {'U1': ['Brötchen']}
+
+    index.remove(1)
+    index.remove(1)
+    assert index.recipients((4, 720)) == {} and index.ids() == {2}
+
+
+def _add_reminder(slack_id='U1', name='Brötchen', weekdays='mi', at=dt_time(12, 0)):
+    with db_session() as session:
+        user_id = session.query(User.user_id).filter_by(slack_id=slack_id).scalar()
+        reminder = Reminder(user_id=user_id, reminder_name=name, reminder_type='weekly',
+                            weekdays=weekdays, reminder_time=at, is_active=True)
+        session.add(reminder)
+        session.flush()
+        return reminder.reminder_id
+
+
+def test_tick_sends_reminders_of_the_due_bucket(db):
+    _add_reminder()
+    _add_reminder(name='Kaffee', weekdays='do')
+    engine, client = ReminderEngine(), FakeClient()
+    assert engine.tick(client, NOON) == 1
+    assert client.sent == ['U1']
+
+
+def test_incremental_reload_picks_up_changes(db):
+    reminder_id = _add_reminder()
+    engine = ReminderEngine()
+    engine.refresh(NOON)
+    with db_session() as session:
+        session.execute(update(Reminder).where(Reminder.reminder_id == reminder_id).values(weekdays='do'))
+    engine.refresh(NOON + timedelta(minutes=1))
+    assert engine.index.recipients((2, 720)) == {}
+    assert engine.index.recipients((3, 720)) == {'U1': ['Brötchen']}
+
+
+def test_deleted_reminder_stops_firing_before_full_reload(db):
+    reminder_id = _add_reminder()
+    engine, client = ReminderEngine(), FakeClient()
+    engine.refresh(NOON - timedelta(minutes=5))
+    assert engine.index.ids() == {reminder_id}
+
+    with db_session() as session:
+        session.execute(delete(Reminder).where(Reminder.reminder_id == reminder_id))
+    # Nächster Lauf ist ein inkrementeller Abgleich, kein vollständiges Neuladen
+    assert engine.tick(client, NOON) == 0
+    assert client.sent == [] and engine.index.ids() == set()
+
+
+def test_reminders_of_deleted_user_are_dropped(db):
+    with db_session() as session:
+        session.add(User(slack_id='U2', name='Ben'))
+    _add_reminder('U2')
+    engine = ReminderEngine()
+    engine.refresh(NOON)
+    with db_session() as session:
+        # SQLite prüft Fremdschlüssel hier nicht; die Zeile bleibt wie nach einem fehlenden CASCADE stehen
+        session.execute(delete(User).where(User.slack_id == 'U2'))
+    engine.refresh(NOON + timedelta(minutes=1))
+    assert engine.index.ids() == set()
@@ -0,0 +1,101 @@
+#==========================
+# tests/test_replica_router.py
+#==========================
+
+import time
+import pytest
+import app.utils.db.database as database
+from app.models import User
+from app.utils.db.database import ReplicaRouter, SessionLocal, db_session, request_scope
+
+
+@pytest.fixture
+def router(tmp_path):
+    """Router mit zwei SQLite-"Replicas"; die Verzögerung wird im Test vorgegeben."""
+    urls = [f"sqlite:///{tmp_path / f'replica{index}.db'}" for index in range(2)]
+    return ReplicaRouter(urls, max_lag=5.0, check_interval=60.0)
+
+
+def _set_lag(monkeypatch, router, lags):
+    calls = []
+
+    def measure(replica):
+        calls.append(replica.name)
+        return lags[router._replicas.index(replica)]
+
+    monkeypatch.setattr(router, '_measure_lag', measure)
+    return calls
+
+
+def _is_replica(router, factory):
+    return any(factory is replica.session_factory for replica in router._replicas)
+
+
+def test_without_replicas_always_uses_primary():
+    router = ReplicaRouter([], max_lag=5.0, check_interval=60.0)
+    router.note_write('U1')
+    assert router.session_factory('U1') is SessionLocal
+    assert router.session_factory() is SessionLocal
+
+
+def test_reads_go_round_robin_to_healthy_replicas(monkeypatch, router):
+    _set_lag(monkeypatch, router, [0.0, 1.0])
+    first, second = router.session_factory(), router.session_factory()
+    assert _is_replica(router, first) and _is_replica(router, second)
+    assert first is not second
+
+
+def test_lagging_or_unreachable_replica_is_skipped(monkeypatch, router):
+    _set_lag(monkeypatch, router, [30.0, 0.0])
+    healthy = router._replicas[1].session_factory
+    assert router.session_factory() is healthy
+    assert router.session_factory() is healthy
+
+
+def test_falls_back_to_primary_when_lag_check_fails(monkeypatch, router):
+    _set_lag(monkeypatch, router, [None, 30.0])
+    assert router.session_factory() is SessionLocal
+
+
+def test_lag_is_measured_once_per_check_interval(monkeypatch, router):
+    calls = _set_lag(monkeypatch, router, [0.0, 0.0])
+    for _ in range(10):
+        router.session_factory()
+    assert len(calls) == 2
+
+
+def test_measure_lag_reports_unreachable_replica_as_unusable(tmp_path):
+    router = ReplicaRouter([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"], max_lag=5.0, check_interval=60.0)
+    assert router._measure_lag(router._replicas[0]) is None
+    assert router.session_factory() is SessionLocal
+
+
+def test_read_after_write_goes_to_primary(monkeypatch, router):
+    _set_lag(monkeypatch, router, [0.0, 0.0])
+    router.note_write('U1')
+    assert router.session_factory('U1') is SessionLocal
+    # Andere User lesen weiterhin von einer Replica
+    assert _is_replica(router, router.session_factory('U2'))
+
+
+def test_read_your_writes_expires_after_max_lag(monkeypatch, router):
+    _set_lag(monkeypatch, router, [0.0, 0.0])
+    router.max_lag = 0.05
+    router.note_write('U1')
+    time.sleep(0.1)
+    assert _is_replica(router, router.session_factory('U1'))
+
+
+def test_request_scope_write_routes_following_reads_to_primary(db, monkeypatch, router):
+    _set_lag(monkeypatch, router, [0.0, 0.0])
+    monkeypatch.setattr(database, 'replica_router', router)
+
+    with request_scope('U1'):
+        with db_session() as session:
+            session.add(User(slack_id='U2', name='Ben'))
+
+    with db_session(readonly=True, user_id='U1') as session:
+        assert session.get_bind() is database.engine
+        assert session.query(User).filter_by(slack_id='U2').one().name == 'Ben'
+    with db_session(readonly=True, user_id='U3') as session:
+        assert session.get_bind() is not database.engine
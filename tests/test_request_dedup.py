@@ -0,0 +1,66 @@
+#==========================
+# tests/test_request_dedup.py
+#==========================
+
+from contextlib import contextmanager
+import pytest
+import app.utils.slack.request_dedup as request_dedup_module
+from app.models import ProcessedRequest
+from app.utils.db.database import assert_max_queries, db_session
+from app.utils.metrics.metrics import metrics
+from app.utils.slack.request_dedup import RequestDeduplicator, request_key
+
+
+@pytest.fixture
+def workers():
+    """Zwei Deduplicator wie in zwei Worker-Prozessen (eigene LRU, gemeinsame Tabelle)."""
+    created = [RequestDeduplicator(ttl_seconds=900, max_entries=100) for _ in range(2)]
+    yield created
+    for dedup in created:
+        dedup.shutdown()
+
+
+def test_request_key_prefers_event_and_trigger_ids():
+    assert request_key({'event_id': 'Ev1', 'trigger_id': 't'}) == 'event:Ev1'
+    assert request_key({'trigger_id': 't1'}) == 'trigger:t1'
+    assert request_key({}, 'a=b') == request_key({}, 'a=b') != request_key({}, 'a=c')
+
+
+def test_first_attempt_does_not_touch_the_database_before_ack(db, workers):
+    first, _ = workers
+    with assert_max_queries(0, 'dedup.first_attempt'):
+        assert first.claim('trigger:t1')
+    first.shutdown()
+    with db_session() as session:
+        assert session.get(ProcessedRequest, 'trigger:t1') is not None
+
+
+def test_retry_on_same_worker_is_suppressed_locally(db, workers):
+    first, _ = workers
+    assert first.claim('trigger:t1')
+    with assert_max_queries(0, 'dedup.local_retry'):
+        assert not first.claim('trigger:t1', retry=True)
+
+
+def test_retry_on_other_worker_is_suppressed_via_shared_table(db, workers):
+    first, second = workers
+    assert first.claim('trigger:t1')
+    first.shutdown()
+    assert not second.claim('trigger:t1', retry=True)
+    # Ein anderer Request wird weiterhin verarbeitet
+    assert second.claim('trigger:t2', retry=True)
+
+
+def test_retry_fails_open_when_database_is_unavailable(db, workers, monkeypatch):
+    @contextmanager
+    def broken_session():
+        raise RuntimeError('database unavailable')
+        yield
+
+    monkeypatch.setattr(request_dedup_module, 'db_session', broken_session)
+    _, second = workers
+    errors = metrics.snapshot()['counters'].get('slack.dedup.errors', 0)
+    assert second.claim('trigger:t1', retry=True)
+    assert metrics.snapshot()['counters'].get('slack.dedup.errors', 0) == errors + 1
+    # Auch der Eintrag im Hintergrund scheitert still; der Request wird trotzdem verarbeitet
+    assert second.claim('trigger:t2')
@@ -0,0 +1,72 @@
+#==========================
+# tests/test_timeout_scheduler.py
+#==========================
+
+import json
+from threading import Event
+from sqlalchemy import select
+from app.core.outbox_service import OutboxService
+from app.handlers.order.order_commands import OrderHandler, remove_preview_key
+from app.models import OutboxMessage
+from app.utils.db.database import db_session
+from app.utils.workers.timeout_scheduler import TimeoutScheduler
+
+PREVIEW_BLOCKS = [{'type': 'section'}, {'type': 'context'}, {'type': 'actions'}]
+
+
+def test_timeout_fires_after_delay():
+    scheduler = TimeoutScheduler('test-timeouts')
+    fired = Event()
+    scheduler.schedule('a', 0.05, fired.set)
+    assert fired.wait(2)
+    assert scheduler.pending() == 0
+
+
+def test_cancelled_timeout_never_fires():
+    scheduler = TimeoutScheduler('test-timeouts')
+    fired, marker = Event(), Event()
+    scheduler.schedule('a', 0.1, fired.set)
+    scheduler.schedule('b', 0.2, marker.set)
+    assert scheduler.cancel('a')
+    assert not scheduler.cancel('a')
+    # 'b' ist später fällig als 'a'; ist 'b' gelaufen, wäre 'a' längst fällig gewesen
+    assert marker.wait(2)
+    assert not fired.is_set()
+
+
+def test_reschedule_replaces_previous_timeout():
+    scheduler = TimeoutScheduler('test-timeouts')
+    calls = []
+    done = Event()
+    scheduler.schedule('a', 0.05, lambda: calls.append('old'))
+    scheduler.schedule('a', 0.1, lambda: (calls.append('new'), done.set()))
+    assert done.wait(2)
+    assert calls == ['new']
+
+
+def _claim_preview(channel, ts, text):
+    with db_session() as session:
+        return OutboxService(session).enqueue(
+            'chat_update', channel, dedup_key=remove_preview_key(channel, ts), ts=ts, text=text
+        ) is not None
+
+
+def _updates(channel):
+    with db_session() as session:
+        return session.execute(
+            select(OutboxMessage.payload).where(OutboxMessage.channel == channel)
+        ).scalars().all()
+
+
+def test_timeout_after_confirm_on_other_worker_is_skipped(db):
+    # Bestätigt an einem anderen Worker: dessen Timeout-Heap kennt diese Vorschau nicht
+    assert _claim_preview('D1', '1.000', 'Bestellung wurde aktualisiert')
+    assert not OrderHandler()._expire_remove_preview('D1', '1.000', list(PREVIEW_BLOCKS))
+    assert len(_updates('D1')) == 1
+
+
+def test_confirm_after_timeout_is_rejected(db):
+    assert OrderHandler()._expire_remove_preview('D1', '1.000', list(PREVIEW_BLOCKS))
+    assert not _claim_preview('D1', '1.000', 'Bestellung wurde aktualisiert')
+    assert len(_updates('D1')) == 1
+    assert json.loads(_updates('D1')[0])['text'] == 'Vorgang abgebrochen (Zeitüberschreitung)'
@@ -0,0 +1,66 @@
+#==========================
+# tests/test_weekly_totals.py
+#==========================
+
+from datetime import datetime
+from app.core.order_period import get_current_period
+from app.core.order_service import OrderService
+from app.core.weekly_totals_service import WeeklyTotalsService
+from app.models import Order, OrderItem, Product, User
+from app.utils.db.database import db_session
+
+
+def _add_raw_order(quantity=2, product='Vollkorn'):
+    """Bestellung direkt in orders/orderItem, ohne weekly_totals (wie vor Einführung der Tabelle)."""
+    with db_session() as session:
+        user = session.query(User).filter_by(slack_id='U1').one()
+        product = session.query(Product).filter_by(name=product).one()
+        order = Order(user_id=user.user_id, order_date=datetime.now())
+        session.add(order)
+        session.flush()
+        session.add(OrderItem(order_id=order.order_id, product_id=product.product_id, quantity=quantity))
+
+
+def test_backfill_makes_existing_orders_visible_in_summary(db):
+    _add_raw_order()
+    with db_session() as session:
+        assert OrderService(session).get_weekly_summary() == []
+
+    with db_session() as session:
+        assert WeeklyTotalsService(session).backfill(get_current_period()) == 1
+
+    with db_session() as session:
+        assert OrderService(session).get_weekly_summary() == [
+            {'name': 'Vollkorn', 'quantity': 2, 'users': [{'name': 'Anna', 'quantity': 2}]}
+        ]
+
+
+def test_backfill_keeps_preview_and_remove_in_agreement(db):
+    _add_raw_order(quantity=3)
+    with db_session() as session:
+        WeeklyTotalsService(session).backfill(get_current_period())
+
+    remove = [{'name': 'Vollkorn', 'quantity': 1}]
+    with db_session() as session:
+        _, preview = OrderService(session).remove_items_preview('U1', remove)
+    assert preview == {'Vollkorn': 2}
+    with db_session() as session:
+        OrderService(session).remove_items('U1', remove)
+    with db_session() as session:
+        assert OrderService(session).get_order_overview('U1')['product_totals'] == preview
+
+
+def test_backfill_skips_periods_that_already_have_totals(db):
+    _add_raw_order()
+    with db_session() as session:
+        OrderService(session).add_order('U1', [{'name': 'Brötchen', 'quantity': 1}])
+
+    with db_session() as session:
+        assert WeeklyTotalsService(session).backfill(get_current_period()) == 0
+        # Die Rohbestellung bleibt bis zu einem expliziten rebuild() außen vor
+        assert OrderService(session).get_order_overview('U1')['product_totals'] == {'Brötchen': 1}
+
+
+def test_backfill_without_orders_writes_nothing(db):
+    with db_session() as session:
+        assert WeeklyTotalsService(session).backfill(get_current_period()) == 0